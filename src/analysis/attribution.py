@@ -0,0 +1,300 @@
+"""
+Day-over-day P&L attribution (Greeks explain) over stored snapshots.
+
+    python -m src.analysis.attribution --snapshots data/snapshots \\
+        --out reports/attribution --tickers AAPL MSFT
+
+Every contract in a snapshot is repriced by Black–Scholes at its own
+implied vol, and its Greeks are computed once, as one array batch per
+snapshot. The next snapshot's P&L is explained with those Greeks: no
+Greek is ever computed twice. For each contract quoted on both days,
+the full repricing change is split into delta, gamma, vega, theta and
+rho contributions and an unexplained residual. One report per day is
+written to <out>/date=<D>.<fmt>, with a daily summary in _summary.csv.
+"""
+
+import argparse
+import datetime
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.data.option_chain import OptionChain
+from src.data.snapshots import SnapshotProvider, list_snapshot_dates
+from src.data.storage import FORMATS, check_format, write_frame
+from src.models.black_scholes import price_and_greeks_batch
+from src.models.forwards import forward_carry, implied_forwards
+from src.models.implied_vol import option_chain_implied_vol
+
+
+COMPONENTS = ("delta", "gamma", "vega", "theta", "rho")
+
+STATE_COLUMNS = ["S", "T", "r", "iv", "price"] + list(COMPONENTS)
+
+
+# -----------------------------------
+# One snapshot, valued once
+# -----------------------------------
+def _contract_keys(frame):
+
+    if "contractSymbol" in frame.columns:
+        return frame["contractSymbol"].astype(str)
+
+    return (
+        frame["ticker"].astype(str) + "|" + frame["expiry"].astype(str) + "|"
+        + frame["optionType"].astype(str) + "|" + frame["strike"].astype(str)
+    )
+
+
+def load_snapshot(root, date, tickers=None) -> pd.DataFrame:
+    """
+    Every chain of one snapshot date as a single frame with ticker,
+    expiry, spot, T (from the snapshot date, not today), rate and carry
+    (q) columns. The carry is implied per expiry by put–call parity at
+    the snapshot rate; the stored dividend yield is read only for
+    tickers with an expiry parity cannot fit.
+    """
+
+    provider = SnapshotProvider(root, as_of=date)
+    as_of = datetime.date.fromisoformat(date)
+
+    r = provider.get_risk_free_rate()
+    frames = []
+
+    for ticker in (provider.tickers() if tickers is None else tickers):
+
+        S = provider.get_spot_price(ticker)
+        chains = []
+
+        for expiry in provider.get_expiry_dates(ticker):
+
+            chain = provider.get_option_chain(ticker, expiry)
+
+            days = (datetime.date.fromisoformat(expiry) - as_of).days
+
+            if days <= 0 or chain.empty:
+                continue
+
+            chains.append(chain.assign(
+                ticker=ticker, expiry=expiry, spot=S, T=days / 365, r=r
+            ))
+
+        if not chains:
+            continue
+
+        chains = pd.concat(chains, ignore_index=True)
+        chain = OptionChain.from_frame(chains)
+
+        rate, carry = forward_carry(
+            chain, implied_forwards(chain, r=r), r,
+            lambda: provider.get_dividend_yield(ticker)
+        )
+
+        # Same forward as parity gives, at the snapshot rate
+        frames.append(chains.assign(q=carry + r - rate))
+
+    if not frames:
+        return pd.DataFrame(columns=["ticker", "expiry", "strike", "optionType"])
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def value_snapshot(frame) -> pd.DataFrame:
+    """
+    Implied vol, model price and Greeks of every contract of a snapshot
+    frame, indexed by contract, in one vectorized pass. Contracts whose
+    quotes cannot be inverted are dropped.
+    """
+
+    chain = OptionChain.from_frame(frame)
+
+    r = frame["r"].to_numpy(dtype=np.float64)
+    q = frame["q"].to_numpy(dtype=np.float64)
+
+    iv = option_chain_implied_vol(chain, r, q)
+
+    values = price_and_greeks_batch(
+        chain.spot, chain.strike, chain.T, r, iv, q, chain.flag
+    )
+
+    state = pd.DataFrame(
+        {
+            "ticker": frame["ticker"].to_numpy(),
+            "expiry": frame["expiry"].to_numpy(),
+            "strike": chain.strike,
+            "optionType": frame["optionType"].to_numpy(),
+            "flag": chain.flag,
+            "q": q,
+            "S": chain.spot,
+            "T": chain.T,
+            "r": r,
+            "iv": iv,
+            **values
+        },
+        index=pd.Index(_contract_keys(frame).to_numpy(), name="contract")
+    )
+
+    state = state[np.isfinite(state["price"].to_numpy())]
+
+    return state[~state.index.duplicated()]
+
+
+# -----------------------------------
+# Greeks explain
+# -----------------------------------
+# With yesterday's Greeks and the moves dS, d(iv), dt and dr:
+#
+#   delta dS + 1/2 gamma dS^2 + vega d(iv) + theta dt + rho dr
+#
+# against the actual change of the repriced value. Everything is a
+# column operation over the contracts quoted on both days.
+def attribute(previous, current) -> pd.DataFrame:
+    """
+    Per-contract P&L attribution from `previous` to `current` (both from
+    value_snapshot). Returns one row per contract quoted on both days.
+    """
+
+    common = previous.index.intersection(current.index)
+
+    before = previous.loc[common]
+    after = current.loc[common]
+
+    dS = after["S"].to_numpy() - before["S"].to_numpy()
+    dt = before["T"].to_numpy() - after["T"].to_numpy()
+
+    explained = {
+        "delta": before["delta"].to_numpy() * dS,
+        "gamma": 0.5 * before["gamma"].to_numpy() * dS ** 2,
+        "vega": before["vega"].to_numpy() * (after["iv"].to_numpy() - before["iv"].to_numpy()),
+        "theta": before["theta"].to_numpy() * dt,
+        "rho": before["rho"].to_numpy() * (after["r"].to_numpy() - before["r"].to_numpy())
+    }
+
+    report = before[["ticker", "expiry", "strike", "optionType"]].copy()
+
+    report["price"] = before["price"].to_numpy()
+    report["dS"] = dS
+    report["dIV"] = after["iv"].to_numpy() - before["iv"].to_numpy()
+
+    for name in COMPONENTS:
+        report[f"{name}_pnl"] = explained[name]
+
+    report["explained"] = sum(explained.values())
+    report["actual"] = after["price"].to_numpy() - before["price"].to_numpy()
+    report["unexplained"] = report["actual"] - report["explained"]
+
+    return report
+
+
+def summarize(report) -> pd.DataFrame:
+    """Contribution sums per ticker, with absolute residual statistics."""
+
+    columns = [f"{name}_pnl" for name in COMPONENTS] + ["explained", "actual", "unexplained"]
+
+    summary = report.groupby("ticker")[columns].sum()
+
+    summary["abs_unexplained"] = report["unexplained"].abs().groupby(report["ticker"]).sum()
+    summary["abs_actual"] = report["actual"].abs().groupby(report["ticker"]).sum()
+    summary["contracts"] = report.groupby("ticker").size()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        summary["unexplained_ratio"] = summary["abs_unexplained"] / summary["abs_actual"]
+
+    return summary.reset_index()
+
+
+# -----------------------------------
+# Driver
+# -----------------------------------
+def run_attribution(
+    root,
+    out,
+    tickers=None,
+    start=None,
+    end=None,
+    fmt="parquet"
+) -> pd.DataFrame:
+    """
+    Walk the snapshot dates under `root` (optionally from `start` to
+    `end`), valuing each snapshot once and attributing the P&L since
+    the previous one. Writes one contract report per date and returns
+    the daily summary (also written to <out>/_summary.csv).
+    """
+
+    check_format(fmt)
+
+    dates = [
+        d for d in list_snapshot_dates(root)
+        if (start is None or d >= start) and (end is None or d <= end)
+    ]
+
+    previous = None
+    summaries = []
+
+    for date in dates:
+
+        current = value_snapshot(load_snapshot(root, date, tickers))
+
+        if previous is not None:
+
+            report = attribute(previous, current)
+
+            write_frame(
+                report.reset_index(),
+                os.path.join(out, f"date={date}.{fmt}"),
+                fmt
+            )
+
+            summary = summarize(report)
+            summary.insert(0, "date", date)
+            summaries.append(summary)
+
+        # Today's Greeks explain tomorrow's P&L
+        previous = current
+
+    if summaries:
+        summary = pd.concat(summaries, ignore_index=True)
+    else:
+        summary = pd.DataFrame(columns=["date", "ticker"])
+
+    os.makedirs(out, exist_ok=True)
+    summary.to_csv(os.path.join(out, "_summary.csv"), index=False)
+
+    return summary
+
+
+# -----------------------------------
+# Command line
+# -----------------------------------
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--snapshots", required=True,
+                        help="directory written by write_snapshot")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--tickers", nargs="+", default=None)
+    parser.add_argument("--start", default=None)
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+
+    args = parser.parse_args(argv)
+
+    summary = run_attribution(
+        args.snapshots,
+        args.out,
+        tickers=args.tickers,
+        start=args.start,
+        end=args.end,
+        fmt=args.format
+    )
+
+    if not summary.empty:
+        print(summary.to_string(index=False), file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from src.data.option_chain import OptionChain
+from src.models.black_scholes import price_and_greeks_batch
+from src.models.binomial_tree import binomial_option_price_batch
+from src.models.forwards import forward_carry, implied_forwards
+from src.models.implied_vol import option_chain_implied_vol
+
+
+# -----------------------------------
+# Full-chain analytics
+# -----------------------------------
+# Every contract of every expiry goes through the same batched passes:
+# parity-implied rate and carry, implied vol from the mid, Black–Scholes
+# price and Greeks at that vol, and the American binomial price. The
+# result is one table that pages and exports filter instead of
+# recomputing their own slices.
+ANALYTICS_COLUMNS = [
+    "rate",
+    "carry",
+    "k",
+    "impliedVol",
+    "black_scholes",
+    "delta",
+    "gamma",
+    "vega",
+    "theta",
+    "rho",
+    "binomial",
+    "bs_error",
+    "binomial_error",
+    "early_exercise"
+]
+
+
+def option_chain_analytics(
+    chain,
+    r,
+    q=0.0,
+    forwards=None,
+    parity=True,
+    steps=200,
+    american=True
+) -> dict:
+    """
+    Analytics columns (see ANALYTICS_COLUMNS) for every row of an
+    OptionChain. With `parity` and no `forwards`, rate and carry are
+    implied per expiry from the chain itself; `r` and `q` are fallbacks.
+    Rows whose vol cannot be implied are NaN past the "impliedVol"
+    column. Model errors are model price minus market mid.
+    """
+
+    if forwards is None and parity:
+        forwards = implied_forwards(chain, r=r)
+
+    if forwards is not None:
+        rate, carry = forward_carry(chain, forwards, r, q)
+    else:
+        rate = np.array(np.broadcast_to(r, len(chain)), dtype=np.float64)
+        carry = np.array(np.broadcast_to(q, len(chain)), dtype=np.float64)
+
+    iv = option_chain_implied_vol(chain, rate, carry)
+
+    result = {
+        "rate": rate,
+        "carry": carry,
+        "k": chain.forward_moneyness(rate, carry),
+        "impliedVol": iv
+    }
+
+    # Model passes only over the contracts with a vol
+    ok = np.flatnonzero(~np.isnan(iv))
+
+    args = (
+        chain.spot[ok], chain.strike[ok], chain.T[ok],
+        rate[ok], iv[ok], carry[ok]
+    )
+
+    bs = price_and_greeks_batch(*args, chain.flag[ok])
+
+    binomial = binomial_option_price_batch(
+        *args,
+        steps=steps,
+        option_type=chain.flag[ok],
+        american=american
+    )
+
+    def column(values):
+        out = np.full(len(chain), np.nan)
+        out[ok] = values
+        return out
+
+    result["black_scholes"] = column(bs["price"])
+
+    for greek in ("delta", "gamma", "vega", "theta", "rho"):
+        result[greek] = column(bs[greek])
+
+    result["binomial"] = column(binomial)
+    result["bs_error"] = result["black_scholes"] - chain.mid
+    result["binomial_error"] = result["binomial"] - chain.mid
+    result["early_exercise"] = result["binomial"] - result["black_scholes"]
+
+    return result
+
+
+def chain_analytics(
+    options_df,
+    S=None,
+    T=None,
+    r=0.0,
+    q=0.0,
+    forwards=None,
+    parity=True,
+    steps=200,
+    american=True
+) -> pd.DataFrame:
+    """
+    Full analytics table for a get_option_chain-style DataFrame, or a
+    get_full_chain frame spanning many expiries (S and T then come from
+    its spot / T columns). One row per contract: the chain columns plus
+    mid, moneyness and the analytics columns.
+    """
+
+    chain = OptionChain.from_frame(options_df, spot=S, T=T)
+
+    result = option_chain_analytics(
+        chain, r, q,
+        forwards=forwards,
+        parity=parity,
+        steps=steps,
+        american=american
+    )
+
+    table = chain.to_frame(**result)
+
+    if "contractSymbol" in options_df.columns:
+        table.insert(0, "contractSymbol", options_df["contractSymbol"].to_numpy())
+
+    return table.reset_index(drop=True)
@@ -0,0 +1,391 @@
+"""
+Nightly model-divergence report over a universe of tickers.
+
+    python -m src.analysis.divergence_batch --tickers-file universe.txt \\
+        --out reports/divergence --workers 8
+
+Each (ticker, expiry) is one task on a process pool: the chain is
+fetched from the given (or default) market data provider, implied vols
+are inverted at the parity-implied rate and carry, and compare_models
+prices every strike with Black–Scholes, the American binomial lattice
+and Monte Carlo. Results stream to one Parquet file per task under
+<out>/as_of=<date>/ticker=<T>/expiry=<E>.parquet as tasks finish,
+together with a per-task timing manifest.
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.model_comparison import compare_models
+from src.data import data_scraper
+from src.data.option_chain import OptionChain
+from src.data.storage import FORMATS, check_format, write_frame
+from src.models.forwards import implied_forwards
+from src.models.implied_vol import implied_volatility_chain
+
+
+# -----------------------------------
+# Worker tasks
+# -----------------------------------
+def _provider_as_of(provider):
+    """The provider's data date as YYYY-MM-DD, today when it has none."""
+
+    as_of = getattr(provider, "as_of", None)
+
+    if as_of is None:
+        return datetime.date.today().isoformat()
+
+    return str(as_of)[:10]
+
+
+def list_ticker_expiries(ticker, provider=None):
+    """Spot and expiries of one ticker, fetched once for all its tasks."""
+
+    provider = provider or data_scraper.get_provider()
+
+    S = provider.get_spot_price(ticker)
+    expiries = list(provider.get_expiry_dates(ticker))
+
+    return ticker, S, expiries
+
+
+def divergence_task(
+    ticker,
+    expiry,
+    S,
+    r,
+    as_of,
+    q=None,
+    provider=None,
+    steps=200,
+    simulations=20000,
+    moneyness=(0.8, 1.2),
+    seed=0
+):
+    """
+    Model divergence for every call and put of one expiry, with time to
+    expiry counted from `as_of`. Where parity gives no carry, `q` is
+    used, or the provider's dividend yield if `q` is None. Returns the
+    compare_models rows with ticker, expiry, optionType, T, rate and
+    carry columns, and the task's wall time in seconds.
+    """
+
+    start = time.perf_counter()
+
+    provider = provider or data_scraper.get_provider()
+
+    chain = provider.get_option_chain(ticker, expiry)
+
+    days = (datetime.date.fromisoformat(expiry) - datetime.date.fromisoformat(as_of)).days
+    T = max(days / 365, 0.0001)
+
+    # One rate and carry per expiry from put–call parity
+    implied = implied_forwards(
+        OptionChain.from_frame(chain, spot=S, T=T), r=r, moneyness=moneyness
+    )
+
+    if implied["forward"].size and np.isfinite(implied["forward"][0]):
+        rate = float(implied["rate"][0])
+        carry = float(implied["carry"][0])
+    else:
+        rate = r
+        carry = provider.get_dividend_yield(ticker) if q is None else q
+
+    quotes = chain[
+        (chain["strike"] / S > moneyness[0]) &
+        (chain["strike"] / S < moneyness[1])
+    ]
+
+    frames = []
+
+    for option_type in ("call", "put"):
+
+        side = quotes[quotes["optionType"] == option_type]
+
+        if side.empty:
+            continue
+
+        side = implied_volatility_chain(side, S, T, rate, carry, option_type)
+
+        results = compare_models(
+            side, S, T, rate, carry,
+            steps=steps,
+            option_type=option_type,
+            simulations=simulations,
+            seed=seed
+        )
+
+        results.insert(0, "optionType", option_type)
+        frames.append(results)
+
+    if frames:
+        results = pd.concat(frames, ignore_index=True)
+    else:
+        results = pd.DataFrame(columns=["optionType", "strike", "market"])
+
+    results.insert(0, "expiry", expiry)
+    results.insert(0, "ticker", ticker)
+    results["T"] = T
+    results["rate"] = rate
+    results["carry"] = carry
+
+    return results, time.perf_counter() - start
+
+
+# -----------------------------------
+# Output
+# -----------------------------------
+def partition_path(out, as_of, ticker, expiry, fmt="parquet"):
+
+    return os.path.join(
+        out, f"as_of={as_of}", f"ticker={ticker}", f"expiry={expiry}.{fmt}"
+    )
+
+
+def _print_progress(done, total, ticker, expiry, rows, seconds, error=None):
+
+    status = f"failed: {error}" if error else f"{rows} rows"
+
+    print(
+        f"[{done}/{total}] {ticker} {expiry}: {status} ({seconds:.2f}s)",
+        file=sys.stderr,
+        flush=True
+    )
+
+
+# -----------------------------------
+# Batch driver
+# -----------------------------------
+def run_divergence_batch(
+    tickers,
+    out,
+    provider=None,
+    as_of=None,
+    workers=None,
+    steps=200,
+    simulations=20000,
+    moneyness=(0.8, 1.2),
+    max_expiries=None,
+    fmt="parquet",
+    seed=0,
+    progress=_print_progress
+) -> pd.DataFrame:
+    """
+    Run divergence tasks for every expiry of every ticker on a pool of
+    `workers` processes (None = one per CPU). Tasks use `provider`
+    when given, otherwise the default provider; `as_of` defaults to
+    the provider's data date. At most two tasks per worker are in
+    flight, and each finished task is written to its own partition
+    straight away and released, so memory is bounded by the tasks in
+    flight. Failed tasks are recorded, not raised.
+
+    Returns the timing manifest (one row per task: ticker, expiry,
+    rows, seconds, error), also written to <out>/as_of=<date>/_tasks.csv.
+    """
+
+    check_format(fmt)
+
+    as_of = as_of or _provider_as_of(provider or data_scraper.get_provider())
+
+    if provider is None:
+        r = data_scraper.get_risk_free_rate()
+    else:
+        r = provider.get_risk_free_rate()
+
+    manifest = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+
+        # Stage 1: spot and expiries per ticker
+        listings = {}
+
+        pending = {pool.submit(list_ticker_expiries, t, provider): t for t in tickers}
+
+        for future in as_completed(pending):
+            try:
+                ticker, S, expiries = future.result()
+            except Exception as e:
+                manifest.append({
+                    "ticker": pending[future], "expiry": None, "rows": 0,
+                    "seconds": np.nan, "error": f"expiry listing: {e}"
+                })
+                continue
+
+            listings[ticker] = (S, expiries[:max_expiries])
+
+        # Stage 2: one task per (ticker, expiry), submitted through a
+        # window of two per worker
+        tasks = [
+            (ticker, expiry, listings[ticker][0])
+            for ticker in tickers if ticker in listings
+            for expiry in listings[ticker][1]
+        ]
+
+        window = 2 * (workers or os.cpu_count() or 1)
+        queued = iter(tasks)
+        in_flight = {}
+        done = 0
+
+        submitted = time.perf_counter()
+
+        while True:
+
+            for ticker, expiry, S in queued:
+                future = pool.submit(
+                    divergence_task, ticker, expiry, S, r, as_of, None, provider,
+                    steps, simulations, moneyness, seed
+                )
+                in_flight[future] = (ticker, expiry)
+                if len(in_flight) >= window:
+                    break
+
+            if not in_flight:
+                break
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+            for future in finished:
+
+                # Dropping the future releases its result frame
+                ticker, expiry = in_flight.pop(future)
+                record = {"ticker": ticker, "expiry": expiry, "rows": 0,
+                          "seconds": np.nan, "error": None}
+
+                try:
+                    results, seconds = future.result()
+                    write_frame(
+                        results,
+                        partition_path(out, as_of, ticker, expiry, fmt),
+                        fmt
+                    )
+                    record.update(rows=len(results), seconds=seconds)
+
+                except Exception as e:
+                    record["error"] = f"{type(e).__name__}: {e}"
+
+                manifest.append(record)
+                done += 1
+
+                if progress is not None:
+                    progress(
+                        done, len(tasks), ticker, expiry,
+                        record["rows"], record["seconds"], record["error"]
+                    )
+
+        elapsed = time.perf_counter() - submitted
+
+    manifest = pd.DataFrame(
+        manifest, columns=["ticker", "expiry", "rows", "seconds", "error"]
+    )
+
+    base = os.path.join(out, f"as_of={as_of}")
+    os.makedirs(base, exist_ok=True)
+    manifest.to_csv(os.path.join(base, "_tasks.csv"), index=False)
+
+    if progress is not None:
+        print(
+            f"{len(tasks)} tasks, {int(manifest['rows'].sum())} rows "
+            f"in {elapsed:.1f}s",
+            file=sys.stderr
+        )
+
+    return manifest
+
+
+def read_divergence(out, as_of=None, fmt="parquet") -> pd.DataFrame:
+    """Concatenate the partitions of one run (the latest when as_of is None)."""
+
+    if as_of is None:
+        runs = sorted(d for d in os.listdir(out) if d.startswith("as_of="))
+        if not runs:
+            raise FileNotFoundError(f"No divergence runs under {out}")
+        as_of = runs[-1].split("=", 1)[1]
+
+    base = os.path.join(out, f"as_of={as_of}")
+    read = pd.read_parquet if fmt == "parquet" else pd.read_csv
+
+    frames = [
+        read(os.path.join(root, name))
+        for root, _, files in sorted(os.walk(base))
+        for name in sorted(files)
+        if name.endswith("." + fmt) and not name.startswith("_")
+    ]
+
+    if not frames:
+        raise FileNotFoundError(f"No {fmt} partitions under {base}")
+
+    return pd.concat(frames, ignore_index=True)
+
+
+# -----------------------------------
+# Command line
+# -----------------------------------
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    universe = parser.add_mutually_exclusive_group(required=True)
+    universe.add_argument("--tickers", nargs="+")
+    universe.add_argument("--tickers-file",
+                          help="text file with one ticker per line")
+    parser.add_argument("--out", required=True)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--snapshots",
+                        help="directory written by write_snapshot")
+    source.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--as-of", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--simulations", type=int, default=20000)
+    parser.add_argument("--max-expiries", type=int, default=None)
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+    parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+
+    if args.tickers_file:
+        with open(args.tickers_file) as f:
+            tickers = [line.strip() for line in f if line.strip()]
+    else:
+        tickers = args.tickers
+
+    provider = None
+
+    if args.synthetic:
+        from src.data.synthetic import SyntheticProvider
+        provider = SyntheticProvider(as_of=args.as_of, seed=args.seed)
+
+    elif args.snapshots:
+        from src.data.snapshots import SnapshotProvider
+        provider = SnapshotProvider(args.snapshots, as_of=args.as_of)
+
+    manifest = run_divergence_batch(
+        tickers,
+        args.out,
+        provider=provider,
+        as_of=args.as_of,
+        workers=args.workers,
+        steps=args.steps,
+        simulations=args.simulations,
+        max_expiries=args.max_expiries,
+        fmt=args.format,
+        seed=args.seed
+    )
+
+    failed = manifest["error"].notna()
+
+    if failed.any():
+        print(f"{int(failed.sum())} tasks failed", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,397 @@
+"""
+Implied-volatility history built from stored chain snapshots.
+
+    python -m src.analysis.iv_history --snapshots data/snapshots \\
+        --store data/iv_history
+
+Each snapshot date is reduced to a few numbers per ticker: per expiry
+the ATM implied vol, skew and curvature of the OTM-merged smile and
+the SSVI ATM total variance; per ticker the constant-maturity ATM vols
+and skews (the term structure) and the SSVI rho, eta and gamma. Rows
+go to two tables under the store, one file per snapshot date:
+<store>/daily/date=<D>.<fmt> and <store>/expiries/date=<D>.<fmt>. An
+update only processes snapshots newer than the last date already in
+the store, so the nightly run writes one day of data. iv_rank and
+iv_percentile query the daily table.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.attribution import load_snapshot
+from src.analysis.smile import option_chain_smile
+from src.data.option_chain import OptionChain
+from src.data.snapshots import list_snapshot_dates
+from src.data.storage import FORMATS, check_format, write_frame
+from src.models.forwards import forward_carry, implied_forwards
+from src.models.vol_surface import MIN_SLICE_POINTS, fit_ssvi
+
+
+# Constant-maturity points of the term structure, in days
+TENORS = (30, 60, 90, 180, 365)
+
+# Skew and curvature are read at log-forward moneyness -/+ WING
+WING = 0.1
+
+# Quotes used, as K / S
+MONEYNESS = (0.8, 1.2)
+
+TABLES = ("daily", "expiries")
+
+# Rows identifying one record of each table
+KEYS = {
+    "daily": ["date", "ticker"],
+    "expiries": ["date", "ticker", "expiry"]
+}
+
+
+# -----------------------------------
+# One snapshot
+# -----------------------------------
+def _slice_metrics(k, iv):
+    """ATM vol, skew (put wing minus call wing) and curvature of one smile."""
+
+    order = np.argsort(k)
+    k, iv = k[order], iv[order]
+
+    def at(x):
+        if k.size < 2 or x < k[0] or x > k[-1]:
+            return np.nan
+        return float(np.interp(x, k, iv))
+
+    atm, put, call = at(0.0), at(-WING), at(WING)
+
+    return atm, put - call, 0.5 * (put + call) - atm
+
+
+def _ssvi_parameters(k, iv, T):
+
+    expiries, counts = np.unique(T, return_counts=True)
+    keep = np.isin(T, expiries[counts >= MIN_SLICE_POINTS])
+
+    if not keep.any():
+        return None
+
+    try:
+        expiries, theta, rho, eta, gamma = fit_ssvi(
+            k[keep], iv[keep] ** 2 * T[keep], T[keep]
+        )
+    except (ValueError, np.linalg.LinAlgError):
+        return None
+
+    return dict(zip(expiries, theta)), float(rho), float(eta), float(gamma)
+
+
+def _constant_maturity(T, values, tenors, total_variance=False):
+    """
+    Values at fixed tenors from per-expiry ones: linear in total variance
+    (vols) or in the value itself between expiries, flat beyond them.
+    """
+
+    ok = np.isfinite(values)
+    T, values = T[ok], values[ok]
+
+    if T.size == 0:
+        return np.full(len(tenors), np.nan)
+
+    t = np.asarray(tenors, dtype=np.float64) / 365
+    inside = np.clip(t, T[0], T[-1])
+
+    if not total_variance:
+        return np.interp(inside, T, values)
+
+    w = np.interp(inside, T, values ** 2 * T)
+
+    return np.sqrt(w / inside)
+
+
+def snapshot_iv_metrics(frame, date=None) -> tuple:
+    """
+    (daily, expiries) metric tables of one snapshot frame (as from
+    attribution.load_snapshot): one row per ticker and one per
+    (ticker, expiry). Rates and carries are implied per expiry from
+    put–call parity, falling back to the snapshot's rate and yield.
+    """
+
+    chain = OptionChain.from_frame(frame)
+
+    r = float(frame["r"].iloc[0])
+
+    # Filtered here so the per-row carries (the fallback where parity fails)
+    # stay aligned with the rows the smile uses
+    low, high = MONEYNESS
+    keep = (chain.moneyness > low) & (chain.moneyness < high)
+
+    chain = chain.select(keep)
+    q = frame["q"].to_numpy(dtype=np.float64)[keep]
+
+    rate, carry = forward_carry(chain, implied_forwards(chain, r=r), r, q)
+    smile = option_chain_smile(chain, rate, carry, moneyness=None)
+
+    points = pd.DataFrame({
+        name: smile[name] for name in ("ticker", "expiry", "T", "k", "impliedVol")
+    }).dropna(subset=["impliedVol"])
+
+    spots = frame.groupby("ticker")["spot"].first()
+
+    daily_rows, expiry_rows = [], []
+
+    for ticker, group in points.groupby("ticker", sort=True):
+
+        surface = _ssvi_parameters(
+            group["k"].to_numpy(), group["impliedVol"].to_numpy(), group["T"].to_numpy()
+        )
+        theta = surface[0] if surface else {}
+
+        slices = []
+
+        for (expiry, T), piece in group.groupby(["expiry", "T"], sort=False):
+
+            atm, skew, curvature = _slice_metrics(
+                piece["k"].to_numpy(), piece["impliedVol"].to_numpy()
+            )
+
+            slices.append({
+                "date": date,
+                "ticker": ticker,
+                "expiry": expiry,
+                "T": T,
+                "atm_iv": atm,
+                "skew": skew,
+                "curvature": curvature,
+                "ssvi_theta": theta.get(T, np.nan),
+                "quotes": len(piece)
+            })
+
+        slices.sort(key=lambda row: row["T"])
+        expiry_rows.extend(slices)
+
+        T = np.array([row["T"] for row in slices])
+
+        iv = _constant_maturity(
+            T, np.array([row["atm_iv"] for row in slices]), TENORS, total_variance=True
+        )
+        skew = _constant_maturity(
+            T, np.array([row["skew"] for row in slices]), TENORS
+        )
+
+        row = {"date": date, "ticker": ticker, "spot": float(spots[ticker])}
+        row.update({f"iv_{days}d": value for days, value in zip(TENORS, iv)})
+        row.update({f"skew_{days}d": value for days, value in zip(TENORS, skew)})
+        row.update(dict(zip(
+            ("ssvi_rho", "ssvi_eta", "ssvi_gamma"),
+            surface[1:] if surface else (np.nan,) * 3
+        )))
+        row["expiries"] = len(slices)
+
+        daily_rows.append(row)
+
+    return pd.DataFrame(daily_rows), pd.DataFrame(expiry_rows)
+
+
+# -----------------------------------
+# Store
+# -----------------------------------
+def _path(store, table, date, fmt):
+
+    return os.path.join(store, table, f"date={date}.{fmt}")
+
+
+def _stored_dates(store, table, fmt):
+
+    base = os.path.join(store, table)
+
+    if not os.path.isdir(base):
+        return []
+
+    return sorted(
+        name[len("date="):-len(fmt) - 1]
+        for name in os.listdir(base)
+        if name.startswith("date=") and name.endswith("." + fmt)
+    )
+
+
+def _read(path, fmt):
+
+    return pd.read_parquet(path) if fmt == "parquet" else pd.read_csv(path)
+
+
+def read_iv_history(store, table="daily", fmt="parquet") -> pd.DataFrame:
+    """One table of the store (empty when nothing has been written yet)."""
+
+    if table not in TABLES:
+        raise ValueError(f"table must be one of {TABLES}")
+
+    frames = [
+        _read(_path(store, table, date, fmt), fmt)
+        for date in _stored_dates(store, table, fmt)
+    ]
+
+    if not frames:
+        return pd.DataFrame(columns=["date", "ticker"])
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def last_processed_date(store, fmt="parquet"):
+
+    dates = _stored_dates(store, "daily", fmt)
+
+    return dates[-1] if dates else None
+
+
+def _append(store, table, rows, fmt):
+    """
+    Write `rows` to their date partitions. Rows already stored under the
+    same key are replaced, so a run resumed after a crash between the
+    two tables does not duplicate them.
+    """
+
+    for date, group in rows.groupby("date", sort=True):
+
+        path = _path(store, table, date, fmt)
+
+        if os.path.exists(path):
+            group = pd.concat([_read(path, fmt), group], ignore_index=True)
+            group = group.drop_duplicates(KEYS[table], keep="last")
+
+        write_frame(group, path, fmt)
+
+
+def update_iv_history(
+    snapshots,
+    store,
+    tickers=None,
+    fmt="parquet",
+    checkpoint=50
+) -> dict:
+    """
+    Process every snapshot under `snapshots` dated after the last date in
+    `store` and append its rows. New rows are flushed every `checkpoint`
+    dates, so an interrupted backfill resumes where it stopped.
+    Returns the dates processed and the run time.
+    """
+
+    check_format(fmt)
+
+    start = time.perf_counter()
+
+    last = last_processed_date(store, fmt)
+
+    dates = [d for d in list_snapshot_dates(snapshots) if last is None or d > last]
+
+    pending = {table: [] for table in TABLES}
+
+    def flush():
+
+        # The daily table marks progress, so it is written last
+        for table in ("expiries", "daily"):
+            frames = [f for f in pending[table] if not f.empty]
+            if frames:
+                _append(store, table, pd.concat(frames, ignore_index=True), fmt)
+            pending[table].clear()
+
+    for i, date in enumerate(dates, start=1):
+
+        frame = load_snapshot(snapshots, date, tickers)
+
+        if frame.empty:
+            continue
+
+        daily, expiries = snapshot_iv_metrics(frame, date)
+
+        pending["daily"].append(daily)
+        pending["expiries"].append(expiries)
+
+        if i % checkpoint == 0:
+            flush()
+
+    flush()
+
+    return {"dates": dates, "seconds": time.perf_counter() - start}
+
+
+# -----------------------------------
+# Queries
+# -----------------------------------
+def _window(store, ticker, column, window, as_of, fmt):
+
+    daily = read_iv_history(store, "daily", fmt)
+    series = daily.loc[daily["ticker"] == ticker, ["date", column]].dropna()
+
+    if as_of is not None:
+        series = series[series["date"].astype(str) <= str(as_of)]
+
+    if series.empty:
+        raise ValueError(f"No {column} history for {ticker}")
+
+    series = series.sort_values("date")
+
+    # Trailing window of `window` calendar days ending at the last date
+    end = pd.Timestamp(str(series["date"].iloc[-1]))
+    start = (end - pd.Timedelta(days=window)).date().isoformat()
+
+    values = series.loc[series["date"].astype(str) > start, column].to_numpy()
+
+    return values[-1], values
+
+
+def iv_rank(store, ticker, column="iv_30d", window=365, as_of=None, fmt="parquet") -> float:
+    """
+    Where the latest value sits between the window's low (0) and high
+    (1), over the trailing `window` calendar days.
+    """
+
+    current, values = _window(store, ticker, column, window, as_of, fmt)
+
+    low, high = values.min(), values.max()
+
+    return float((current - low) / (high - low)) if high > low else np.nan
+
+
+def iv_percentile(store, ticker, column="iv_30d", window=365, as_of=None, fmt="parquet") -> float:
+    """Share of the window's days with a value below the latest one."""
+
+    current, values = _window(store, ticker, column, window, as_of, fmt)
+
+    return float(np.mean(values[:-1] < current)) if values.size > 1 else np.nan
+
+
+# -----------------------------------
+# Command line
+# -----------------------------------
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--snapshots", required=True,
+                        help="directory written by write_snapshot")
+    parser.add_argument("--store", required=True)
+    parser.add_argument("--tickers", nargs="+", default=None)
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+    parser.add_argument("--checkpoint", type=int, default=50)
+
+    args = parser.parse_args(argv)
+
+    result = update_iv_history(
+        args.snapshots,
+        args.store,
+        tickers=args.tickers,
+        fmt=args.format,
+        checkpoint=args.checkpoint
+    )
+
+    print(
+        f"{len(result['dates'])} snapshots processed in {result['seconds']:.1f}s",
+        file=sys.stderr
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
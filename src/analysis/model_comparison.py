@@ -1,8 +1,10 @@
 import numpy as np
 import pandas as pd
 
-from src.models.black_scholes import black_scholes_price
-from src.models.binomial_tree import binomial_option_price
+from src.data.option_chain import OptionChain
+from src.models.black_scholes import black_scholes_price_batch
+from src.models.binomial_tree import binomial_option_price_batch
+from src.models.monte_carlo import monte_carlo_option_price_batch
 
 
 def compare_models(
@@ -12,46 +14,59 @@ def compare_models(
     r,
     q=0.0,
     steps=200,
-    option_type="call"
+    option_type="call",
+    simulations=None,
+    seed=None
 ):
+    """
+    Black–Scholes and American binomial prices at each row's impliedVol
+    against the market mid. `option_type=None` uses the optionType
+    column. With `simulations`, a Monte Carlo (European) price from
+    shared draws is added as a third model.
+    """
 
-    results = []
+    chain = OptionChain.from_frame(
+        options_df, spot=S, T=T, option_type=option_type
+    )
 
-    for _, row in options_df.iterrows():
+    iv = options_df["impliedVol"].to_numpy(dtype=np.float64)
 
-        strike = row["strike"]
+    keep = ~np.isnan(iv)
+    chain = chain.select(keep)
+    iv = iv[keep]
 
-        # Use mid-price
-        if row["bid"] > 0 and row["ask"] > 0:
-            market_price = (row["bid"] + row["ask"]) / 2
-        else:
-            market_price = row["lastPrice"]
+    # Black–Scholes (European)
+    bs_price = black_scholes_price_batch(
+        chain.spot, chain.strike, chain.T, r, iv, q, chain.flag
+    )
 
-        iv = row["impliedVol"]
+    # Binomial (American)
+    bin_price = binomial_option_price_batch(
+        chain.spot, chain.strike, chain.T, r, iv, q,
+        steps=steps,
+        option_type=chain.flag,
+        american=True
+    )
 
-        if np.isnan(iv):
-            continue
+    results = pd.DataFrame({
+        "strike": chain.strike,
+        "market": chain.mid,
+        "black_scholes": bs_price,
+        "binomial": bin_price,
+        "bs_error": bs_price - chain.mid,
+        "binomial_error": bin_price - chain.mid
+    })
 
-        # Black–Scholes (European)
-        bs_price = black_scholes_price(
-            S, strike, T, r, iv, q, option_type
+    # Monte Carlo (European)
+    if simulations:
+        mc = monte_carlo_option_price_batch(
+            chain.spot, chain.strike, chain.T, r, iv, q, chain.flag,
+            simulations=simulations,
+            seed=seed
         )
 
-        # Binomial (American)
-        bin_price = binomial_option_price(
-            S, strike, T, r, iv, q,
-            steps=steps,
-            option_type=option_type,
-            american=True
-        )
-
-        results.append({
-            "strike": strike,
-            "market": market_price,
-            "black_scholes": bs_price,
-            "binomial": bin_price,
-            "bs_error": bs_price - market_price,
-            "binomial_error": bin_price - market_price
-        })
+        results["monte_carlo"] = mc["price"]
+        results["mc_std_error"] = mc["std_error"]
+        results["mc_error"] = mc["price"] - chain.mid
 
-    return pd.DataFrame(results)
\ No newline at end of file
+    return results
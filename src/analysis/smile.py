@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+from src.data.option_chain import OptionChain
+from src.models.forwards import forward_carry
+from src.models.implied_vol import option_chain_implied_vol
+
+
+# -----------------------------------
+# OTM-merged volatility smile
+# -----------------------------------
+# Out-of-the-money options carry the information in each wing: puts
+# below the forward, calls above it. ITM quotes are mostly intrinsic
+# value with wide spreads, so their vols are noisy. Within `blend` of
+# the forward (in log-moneyness) both sides are kept and averaged with
+# weights sliding linearly from the put to the call.
+def otm_weight(k, is_call, blend=0.05):
+    """Weight of each quote in its merged smile point (0 = unused)."""
+
+    if blend > 0:
+        call_weight = np.clip(0.5 + k / (2 * blend), 0.0, 1.0)
+    else:
+        call_weight = (k >= 0).astype(np.float64)
+
+    return np.where(is_call, call_weight, 1.0 - call_weight)
+
+
+def _merge_points(chain, k, iv, weight):
+    """Weighted average of the quotes sharing a (ticker, T, strike)."""
+
+    weight = np.where(np.isnan(iv), 0.0, weight)
+    call_part = np.where(chain.is_call, weight, 0.0)
+
+    ids, _ = chain.expiry_groups()
+
+    order = np.lexsort((chain.strike, ids))
+
+    first = np.ones(order.size, dtype=bool)
+    first[1:] = (np.diff(ids[order]) != 0) | (np.diff(chain.strike[order]) != 0)
+
+    n = int(first.sum())
+
+    point = np.empty(len(chain), dtype=np.intp)
+    point[order] = np.cumsum(first) - 1
+
+    total = np.bincount(point, weights=weight, minlength=n)
+    weighted_iv = np.bincount(
+        point, weights=weight * np.nan_to_num(iv), minlength=n
+    )
+    calls = np.bincount(point, weights=call_part, minlength=n)
+
+    head = order[first]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        smile = {
+            "strike": chain.strike[head],
+            "T": chain.T[head],
+            "k": k[head],
+            "impliedVol": np.where(total > 0, weighted_iv / total, np.nan),
+            "call_weight": calls / total
+        }
+
+    if chain.ticker is not None:
+        smile["ticker"] = chain.ticker[head]
+
+    if chain.expiry is not None:
+        smile["expiry"] = chain.expiry[head]
+
+    return smile
+
+
+def _smile_frame(smile):
+
+    columns = [c for c in ("ticker", "expiry") if c in smile]
+    columns += ["T", "strike", "k", "impliedVol", "call_weight"]
+
+    df = pd.DataFrame({c: smile[c] for c in columns})
+
+    return df.dropna(subset=["impliedVol"]).reset_index(drop=True)
+
+
+def option_chain_smile(
+    chain,
+    r,
+    q=0.0,
+    forwards=None,
+    blend=0.05,
+    min_volume=None,
+    moneyness=(0.8, 1.2)
+) -> dict:
+    """
+    One smile point per (ticker, T, strike) of an OptionChain holding
+    calls and puts. Returns a dict of arrays: strike, T, k (log-forward
+    moneyness), impliedVol, call_weight (0 = put only, 1 = call only),
+    plus ticker and expiry labels when the chain carries them.
+    """
+
+    chain = chain.filter(min_volume=min_volume, moneyness=moneyness)
+
+    if forwards is not None:
+        r, q = forward_carry(chain, forwards, r, q)
+
+    k = chain.forward_moneyness(r, q)
+    weight = otm_weight(k, chain.is_call, blend)
+
+    # Invert only the quotes that contribute, calls and puts together
+    rows = np.flatnonzero(weight > 0)
+    chain = chain.select(rows)
+
+    iv = option_chain_implied_vol(
+        chain,
+        np.broadcast_to(r, k.shape)[rows],
+        np.broadcast_to(q, k.shape)[rows]
+    )
+
+    return _merge_points(chain, k[rows], iv, weight[rows])
+
+
+def build_smile(
+    options_df,
+    S,
+    T,
+    r,
+    q=0.0,
+    forwards=None,
+    blend=0.05,
+    min_volume=None,
+    moneyness=(0.8, 1.2)
+) -> pd.DataFrame:
+    """
+    OTM-merged smile of a get_option_chain DataFrame (calls and puts),
+    one row per strike, sorted by strike within each expiry. Points
+    where both sides failed to invert are dropped.
+    """
+
+    chain = OptionChain.from_frame(options_df, spot=S, T=T)
+
+    return _smile_frame(option_chain_smile(
+        chain, r, q,
+        forwards=forwards,
+        blend=blend,
+        min_volume=min_volume,
+        moneyness=moneyness
+    ))
+
+
+def smile_from_analytics(
+    table,
+    blend=0.05,
+    min_volume=None,
+    moneyness=(0.8, 1.2)
+) -> pd.DataFrame:
+    """
+    Same smile read from a chain_analytics table, reusing its implied
+    vols and log-moneyness instead of inverting the quotes again.
+    """
+
+    table = table.reset_index(drop=True)
+
+    chain = OptionChain.from_frame(table).filter(
+        min_volume=min_volume, moneyness=moneyness
+    )
+
+    # Positional index, so it addresses the table's rows
+    k = table["k"].to_numpy()[chain.index]
+    iv = table["impliedVol"].to_numpy()[chain.index]
+
+    return _smile_frame(
+        _merge_points(chain, k, iv, otm_weight(k, chain.is_call, blend))
+    )
@@ -10,13 +10,45 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
-from src.data.data_scraper import *
-from src.models.black_scholes import *
-from src.models.binomial_tree import *
-from src.models.implied_vol import *
-from src.analysis.model_comparison import *
-from src.visualizations.plots import *
+from src.app.precompute import PrecomputeWorker, freeze, freeze_book
+from src.data.data_scraper import (
+    DATA_TTL,
+    calculate_historical_volatility,
+    get_dividend_yield,
+    get_expiry_dates,
+    get_full_chain,
+    get_historical_data,
+    get_option_chain,
+    get_risk_free_rate,
+    get_spot_price,
+    time_to_expiry
+)
+from src.models.black_scholes import (
+    black_scholes_price,
+    price_and_greeks,
+    resolve_sigma
+)
+from src.analysis.smile import smile_from_analytics
+from src.data.option_chain import OptionChain
+from src.data.streaming import LiveOptionTable, QuoteStream, StreamCache, SyntheticFeed
+from src.models.binomial_tree import binomial_option_price
+from src.models.forwards import forward_carry, implied_forwards
+from src.models.heston import HESTON_PARAMETERS, heston_option_price
+from src.models.vol_surface import SplineVolSurface
+from src.visualizations.plots import (
+    plot_binomial_tree_network,
+    plot_delta_curve,
+    plot_model_errors,
+    plot_pnl_distribution,
+    plot_price_volume_chart,
+    plot_scenario_heatmap,
+    plot_vega_curve,
+    plot_volatility_smile,
+    plot_volatility_surface
+)
 from src.models.monte_carlo import monte_carlo_option_price
+from src.risk.portfolio import Portfolio
+from src.risk.scenarios import pnl_table, spot_ladder
 
 
 # ---------------------------------------------------
@@ -26,7 +58,7 @@ st.set_page_config(layout="wide")
 
 st.title("Derivatives Analytics Platform")
 st.caption(
-    "Black–Scholes | Binomial Tree | Monte Carlo | Volatility Surface | Risk Analytics"
+    "Black–Scholes | Binomial Tree | Monte Carlo | Heston | Volatility Surface | Risk Analytics"
 )
 
 # ---------------------------------------------------
@@ -54,9 +86,54 @@ expiries = get_expiry_dates(ticker)
 
 expiry = st.sidebar.selectbox("Expiry", expiries)
 
+# ---------------------------------------------------
+# Shared Market Data (Defined ONCE)
+# ---------------------------------------------------
+@st.cache_data(ttl=DATA_TTL)
+def load_market_data(ticker, expiry):
+    S = get_spot_price(ticker)
+    r = get_risk_free_rate()
+    T = time_to_expiry(expiry)
+    chain = get_option_chain(ticker, expiry)
+
+    # Rate and carry implied by put–call parity on this expiry;
+    # the T-bill rate and quoted dividend yield are only fallbacks
+    implied = implied_forwards(
+        OptionChain.from_frame(chain, spot=S, T=T),
+        r=r
+    )
+
+    if implied["forward"].size and np.isfinite(implied["forward"][0]):
+        r = float(implied["rate"][0])
+        q = float(implied["carry"][0])
+    else:
+        q = get_dividend_yield(ticker)
+
+    return S, T, r, q, chain
+
+
+@st.cache_data(ttl=DATA_TTL)
+def load_full_chain_carry(ticker):
+    # Every expiry with its rate and carry from put–call parity; the
+    # quoted yield is fetched only if some expiry cannot be fitted
+    frame = get_full_chain(ticker)
+    chain = OptionChain.from_frame(frame)
+    r = get_risk_free_rate()
+
+    rate, carry = forward_carry(
+        chain, implied_forwards(chain, r=r), r,
+        lambda: get_dividend_yield(ticker)
+    )
+
+    return frame, rate, carry
+
+
+S, T, r, q, chain = load_market_data(ticker, expiry)
+
+# The spot fetched once above seeds the strike
 strike = st.sidebar.number_input(
     "Strike",
-    value=float(round(get_spot_price(ticker)))
+    value=float(round(S))
 )
 
 option_type = st.sidebar.selectbox(
@@ -69,27 +146,76 @@ steps = st.sidebar.slider(
     10, 300, 100
 )
 
+vol_source = st.sidebar.selectbox(
+    "Volatility Source",
+    ["Historical (30d)", "Implied Surface"]
+)
+
+
+@st.cache_resource
+def precompute_worker():
+    # One worker per server process: chain analytics, surfaces, the
+    # Heston calibration and the Risk page are computed in the
+    # background, once for every session, and refreshed when the market
+    # data TTL runs out
+    return PrecomputeWorker(ttl=DATA_TTL).start()
+
+
+def precomputed(kind, *args):
+
+    result = precompute_worker().get(kind, ticker, *args)
+
+    if result.error is not None:
+        raise result.error
+
+    return result.value
 
-# ---------------------------------------------------
-# Shared Market Data (Defined ONCE)
-# ---------------------------------------------------
-@st.cache_data
-def load_market_data(ticker, expiry):
-    S = get_spot_price(ticker)
-    r = get_risk_free_rate()
-    q = get_dividend_yield(ticker)
-    chain = get_option_chain(ticker, expiry)
-    return S, r, q, chain
 
+def _open_live_stream(ticker):
+    # One stream per ticker, covering every expiry at its own implied
+    # rate and carry. The synthetic feed stands in for a market
+    # connection and runs for one data TTL.
+    table = LiveOptionTable(*load_full_chain_carry(ticker))
+    feed = SyntheticFeed(table, n_ticks=200 * DATA_TTL, rate=200)
+    return QuoteStream(table, feed).start()
 
-S, r, q, chain = load_market_data(ticker, expiry)
-T = time_to_expiry(expiry)
+
+@st.cache_resource
+def live_streams():
+    # Streaming tables fed in the background; reruns only read them.
+    # Streams past the data TTL or beyond the four most recent tickers
+    # are stopped.
+    return StreamCache(_open_live_stream, max_streams=4, ttl=DATA_TTL)
+
+
+def live_quotes(ticker):
+
+    return live_streams().get(ticker)
+
+
+analytics = precomputed("analytics", tuple(expiries), steps)
+expiry_rows = analytics[analytics["expiry"] == expiry]
 sigma_hist = calculate_historical_volatility(ticker, 30)
 
+# Pricers take either a number or a surface as sigma
+sigma = sigma_hist
+
+if vol_source == "Implied Surface":
+    surface_expiries = list(dict.fromkeys(list(expiries[:4]) + [expiry]))
+    try:
+        sigma = SplineVolSurface.from_surface(
+            precomputed("surface", tuple(surface_expiries))
+        )
+    except ValueError:
+        st.sidebar.warning("Not enough quotes for a surface; using historical vol.")
+
+sigma_value = float(resolve_sigma(sigma, strike, T))
+
 st.sidebar.write(f"Spot: {S:.2f}")
-st.sidebar.write(f"Risk-Free Rate: {r:.4f}")
-st.sidebar.write(f"Dividend Yield: {q:.4f}")
+st.sidebar.write(f"Rate: {r:.4f}")
+st.sidebar.write(f"Carry (implied): {q:.4f}")
 st.sidebar.write(f"Time to Expiry: {T:.4f} years")
+st.sidebar.write(f"Volatility: {sigma_value:.4f}")
 
 
 # ===================================================
@@ -112,6 +238,20 @@ if page == "Market Overview":
 
     st.plotly_chart(fig_price, use_container_width=True)
 
+    if st.checkbox("Stream live quotes"):
+
+        stream = live_quotes(ticker)
+        stats = stream.stats()
+
+        l1, l2, l3 = st.columns(3)
+        l1.metric("Table Version", stream.table.version)
+        l2.metric("Batches", stats["batches"])
+        l3.metric("p99 Batch Latency", f"{stats.get('p99_ms', 0.0):.1f} ms")
+
+        live = stream.table.snapshot()
+
+        st.dataframe(live[live["expiry"] == expiry], use_container_width=True)
+
 
 # ===================================================
 # PAGE 2 — OPTION PRICING
@@ -122,11 +262,11 @@ if page == "Option Pricing":
     st.divider()
 
     bs_result = price_and_greeks(
-        S, strike, T, r, sigma_hist, q, option_type
+        S, strike, T, r, sigma, q, option_type
     )
 
     bin_price = binomial_option_price(
-        S, strike, T, r, sigma_hist, q,
+        S, strike, T, r, sigma, q,
         steps=steps,
         option_type=option_type,
         american=True
@@ -135,7 +275,7 @@ if page == "Option Pricing":
     col1, col2 = st.columns(2)
 
     with col1:
-        st.markdown("### Black–Scholes (Historical Vol)")
+        st.markdown(f"### Black–Scholes ({vol_source})")
         c1, c2, c3 = st.columns(3)
         c4, c5, c6 = st.columns(3)
 
@@ -150,6 +290,20 @@ if page == "Option Pricing":
         st.markdown("### Binomial (American)")
         st.metric("Price", f"{bin_price:.2f}")
 
+        # Listed contract at this strike, from the chain analytics table
+        listed = expiry_rows[
+            (expiry_rows["optionType"] == option_type) &
+            (expiry_rows["strike"] == strike)
+        ]
+
+        if not listed.empty:
+            quote = listed.iloc[0]
+            st.markdown("### Market")
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Mid", f"{quote['mid']:.2f}")
+            m2.metric("Implied Vol", f"{quote['impliedVol']:.4f}")
+            m3.metric("Binomial @ IV", f"{quote['binomial']:.2f}")
+
     # Monte Carlo
     st.markdown("## 🎲 Monte Carlo Pricing")
     st.divider()
@@ -160,9 +314,11 @@ if page == "Option Pricing":
     )
 
     mc_result = monte_carlo_option_price(
-        S, strike, T, r, sigma_hist,
+        S, strike, T, r, sigma,
         option_type=option_type,
-        simulations=simulations
+        simulations=simulations,
+        q=q,
+        greeks=True
     )
 
     colA, colB = st.columns(2)
@@ -172,13 +328,21 @@ if page == "Option Pricing":
         f"[{mc_result['ci_low']:.2f} , {mc_result['ci_high']:.2f}]"
     )
 
+    # Greeks from the same paths (pathwise, gamma mixed)
+    for col, name in zip(st.columns(4), ("delta", "gamma", "vega", "rho")):
+        col.metric(
+            f"MC {name.capitalize()}",
+            f"{mc_result[name]:.4f}",
+            help=f"± {mc_result[name + '_std_error']:.4f} (1 s.e.)"
+        )
+
     # Early Exercise Premium
     euro_price = black_scholes_price(
-        S, strike, T, r, sigma_hist, q, option_type
+        S, strike, T, r, sigma, q, option_type
     )
 
     amer_price = binomial_option_price(
-        S, strike, T, r, sigma_hist, q,
+        S, strike, T, r, sigma, q,
         steps=200,
         option_type=option_type,
         american=True
@@ -197,7 +361,7 @@ if page == "Risk & Greeks":
 
     st.markdown("## 📊 Delta Curve")
     st.plotly_chart(
-        plot_delta_curve(S, strike, T, r, sigma_hist, q, option_type),
+        plot_delta_curve(S, strike, T, r, sigma_value, q, option_type),
         use_container_width=True
     )
 
@@ -224,7 +388,7 @@ if page == "Risk & Greeks":
         vol_slider = st.slider(
             "Volatility",
             0.05, 1.0,
-            float(sigma_hist)
+            float(min(max(sigma_value, 0.05), 1.0))
         )
 
     with s3:
@@ -259,109 +423,220 @@ if page == "Risk & Greeks":
     tree_steps = st.slider("Tree Steps (visual)", 2, 6, 4)
 
     fig_tree = plot_binomial_tree_network(
-        S, T, sigma_hist, tree_steps
+        S, T, sigma_value, tree_steps
     )
 
     st.plotly_chart(fig_tree, use_container_width=True)
 
+    # Book-level Greeks
+    st.markdown("## 📚 Portfolio Greeks")
+    st.divider()
 
-# ===================================================
-# PAGE 4 — VOLATILITY ANALYTICS
-# ===================================================
-if page == "Volatility Analytics":
+    positions_file = st.file_uploader(
+        "Positions CSV (underlying, strike, expiry, optionType, quantity"
+        "[, style, multiplier])",
+        type="csv"
+    )
 
-    st.markdown("## Volatility Smile")
+    # Without an uploaded book, the sidebar contract is a one-line book
+    if positions_file is not None:
+        book = Portfolio.from_frame(pd.read_csv(positions_file))
+        names = list(book.underlyings)
+        book_spot = {u: get_spot_price(u) for u in names}
+        book_vol = {u: calculate_historical_volatility(u, 30) for u in names}
+        # One carry per underlying: the median over its expiries
+        book_q = {u: float(np.median(load_full_chain_carry(u)[2])) for u in names}
+        book_r = get_risk_free_rate()
+    else:
+        # At the contract's own vol, so the book is a stable job key
+        book = Portfolio([ticker], [strike], [expiry], [option_type], [1])
+        book_spot, book_vol, book_q, book_r = S, sigma_value, q, r
+
+    # Hashable job arguments for the precompute worker
+    book_args = (
+        freeze_book(book), freeze(book_spot), freeze(book_vol), book_r, freeze(book_q)
+    )
+
+    if positions_file is not None:
+
+        exposure = book.aggregate(
+            spot=book_spot,
+            vol=book_vol,
+            r=book_r,
+            q=book_q,
+            steps=steps
+        )
+
+        total = exposure.loc["TOTAL"]
+
+        p1, p2, p3, p4 = st.columns(4)
+        p1.metric("Net Value", f"{total['value']:,.0f}")
+        p2.metric("Net Delta", f"{total['delta']:,.1f}")
+        p3.metric("Net Gamma", f"{total['gamma']:,.2f}")
+        p4.metric("Net Vega", f"{total['vega']:,.0f}")
+
+        st.dataframe(exposure, use_container_width=True)
+
+    # Spot x vol stress grid, whole book revalued per scenario
+    st.markdown("## 🔥 Scenario P&L")
     st.divider()
 
-    calls = chain[
-        (chain["optionType"] == "call") &
-        (chain["volume"] > 0)
-    ].copy()
+    horizon = st.slider("Horizon (days)", 0, 30, 0)
 
-    calls["moneyness"] = calls["strike"] / S
-    calls = calls[
-        (calls["moneyness"] > 0.8) &
-        (calls["moneyness"] < 1.2)
-    ]
+    scenarios = precomputed("scenarios", *book_args, (horizon,), steps)
 
-    calls = implied_volatility_chain(
-        calls,
-        S,
-        T,
-        r,
-        q,
-        option_type="call"
+    if scenarios["skipped"].size:
+        st.warning(
+            f"{scenarios['skipped'].size} positions without a spot or vol "
+            "are left out of the scenario P&L."
+        )
+
+    st.plotly_chart(
+        plot_scenario_heatmap(
+            pnl_table(scenarios, day=horizon),
+            f"P&L by Spot and Vol Shock ({horizon}d horizon)"
+        ),
+        use_container_width=True
     )
 
-    fig_smile = plot_volatility_smile(calls, ticker, expiry)
-    st.plotly_chart(fig_smile, use_container_width=True)
+    st.dataframe(
+        spot_ladder(scenarios, day=horizon).iloc[:, ::4],
+        use_container_width=True
+    )
 
-    # st.markdown("## Model Divergence")
-    # results = compare_models(
-    #     calls, S, T, r, q,
-    #     steps=steps,
-    #     option_type="call"
-    # )
+    # Hedging the sidebar contract over bootstrapped historical paths
+    st.markdown("## 🛡 Delta Hedging Backtest")
+    st.divider()
 
-    # st.write(results.head())
-    # st.write(results.columns)
+    hedge_cost = st.slider("Transaction Cost (bp of notional)", 0, 50, 0)
 
-    # fig_div = plot_model_errors(results, ticker, expiry)
-    # st.plotly_chart(fig_div, use_container_width=True)
+    backtests = precomputed(
+        "hedge", S, strike, T, r, q, option_type, sigma_value,
+        (sigma_hist, sigma_value), hedge_cost / 1e4
+    )
 
-    # 3D Surface
-    st.markdown("## 🌊 3D Volatility Surface")
+    h1, h2 = st.columns(2)
+
+    for col, label, hedge_vol in (
+        (h1, "Hedged at historical vol", sigma_hist),
+        (h2, "Hedged at pricing vol", sigma_value)
+    ):
+        backtest = backtests[hedge_vol]
+        col.markdown(f"**{label}** ({hedge_vol:.2%})")
+        col.dataframe(backtest["summary"].round(3), use_container_width=True)
+
+    # Tail risk of the book over correlated historical or simulated moves
+    st.markdown("## 📉 Value at Risk")
     st.divider()
 
-    expiries_list = get_expiry_dates(ticker)[:4]
-    surface_rows = []
+    v1, v2, v3 = st.columns(3)
+    var_method = v1.selectbox("Scenarios", ["historical", "parametric"])
+    var_mode = v2.selectbox("Revaluation", ["full", "delta_gamma"])
+    var_horizon = v3.slider("VaR Horizon (days)", 1, 10, 1)
 
-    for exp in expiries_list:
+    risk = precomputed("var", *book_args, var_method, var_mode, var_horizon, steps)
 
-        T_temp = time_to_expiry(exp)
-        chain_temp = get_option_chain(ticker, exp)
+    if risk["skipped"].size:
+        st.warning(
+            f"{risk['skipped'].size} positions without a value or Greeks "
+            "are left out of the VaR."
+        )
 
-        calls_temp = chain_temp[
-            (chain_temp["optionType"] == "call") &
-            (chain_temp["volume"] > 0)
-        ].copy()
+    m1, m2, m3 = st.columns(3)
+    m1.metric(
+        "99% VaR", f"{risk['var']:,.2f}",
+        help=f"95% CI {risk['var_ci'][0]:,.2f} – {risk['var_ci'][1]:,.2f}"
+    )
+    m2.metric(
+        "99% ES", f"{risk['es']:,.2f}",
+        help=f"95% CI {risk['es_ci'][0]:,.2f} – {risk['es_ci'][1]:,.2f}"
+    )
+    m3.metric("Scenarios", f"{risk['scenarios']:,}")
 
-        calls_temp["moneyness"] = calls_temp["strike"] / S
-        calls_temp = calls_temp[
-            (calls_temp["moneyness"] > 0.8) &
-            (calls_temp["moneyness"] < 1.2)
-        ]
+    st.plotly_chart(
+        plot_pnl_distribution(
+            risk["pnl"], risk["var"], risk["es"],
+            f"{var_horizon}d P&L ({var_method}, {var_mode})"
+        ),
+        use_container_width=True
+    )
 
-        calls_temp = implied_volatility_chain(
-            calls_temp,
-            S,
-            T_temp,
-            r,
-            q,
-            option_type="call"
-        )
 
-        for _, row in calls_temp.iterrows():
-            if not np.isnan(row["impliedVol"]):
-                surface_rows.append({
-                    "strike": row["strike"],
-                    "T": T_temp,
-                    "iv": row["impliedVol"]
-                })
+# ===================================================
+# PAGE 4 — VOLATILITY ANALYTICS
+# ===================================================
+if page == "Volatility Analytics":
+
+    st.markdown("## Volatility Smile")
+    st.divider()
+
+    # OTM puts below the forward, OTM calls above, blended at the money
+    smile = smile_from_analytics(
+        expiry_rows,
+        min_volume=0,
+        moneyness=(0.8, 1.2)
+    )
 
-    surface_df = pd.DataFrame(surface_rows)
+    fig_smile = plot_volatility_smile(smile, ticker, expiry)
+    st.plotly_chart(fig_smile, use_container_width=True)
 
-    if len(surface_df) > 0:
+    st.markdown("## Model Divergence")
+    st.divider()
 
-        pivot = surface_df.pivot_table(
-            values="iv",
-            index="T",
-            columns="strike"
+    results = expiry_rows[
+        (expiry_rows["optionType"] == option_type) &
+        (expiry_rows["volume"] > 0) &
+        (expiry_rows["moneyness"] > 0.8) &
+        (expiry_rows["moneyness"] < 1.2)
+    ].dropna(subset=["impliedVol"])
+
+    try:
+        heston = precomputed("heston", tuple(expiries[:5]))
+    except ValueError:
+        heston = None
+
+    if heston is not None and not results.empty:
+        results = results.assign(heston=heston_option_price(
+            S, results["strike"], results["T"], results["rate"],
+            heston, results["carry"], results["optionType"]
+        ))
+        results["heston_error"] = results["heston"] - results["mid"]
+
+        st.caption(
+            "Heston: "
+            + ", ".join(f"{p} = {heston[p]:.3f}" for p in HESTON_PARAMETERS)
+            + f" (IV RMSE {heston['iv_rmse']:.4f})"
         )
 
-        strikes = pivot.columns.values
-        expiries_years = pivot.index.values
-        iv_matrix = pivot.values
+    fig_div = plot_model_errors(results, ticker, expiry)
+
+    if fig_div is not None:
+        st.plotly_chart(fig_div, use_container_width=True)
+
+    st.download_button(
+        "Download chain analytics (CSV)",
+        analytics.to_csv(index=False),
+        file_name=f"{ticker}_chain_analytics.csv",
+        mime="text/csv"
+    )
+
+    # 3D Surface
+    st.markdown("## 🌊 3D Volatility Surface")
+    st.divider()
+
+    try:
+        surface = precomputed("surface", tuple(expiries[:4]))
+    except ValueError:
+        surface = None
+
+    if surface is not None:
+
+        # Evaluate the calibrated surface on a dense regular grid
+        strikes = np.linspace(0.8 * S, 1.2 * S, 60)
+        expiries_years = np.linspace(
+            surface.expiries[0], surface.expiries[-1], 40
+        )
+        iv_matrix = surface.grid(strikes, expiries_years)
 
         fig_surface = plot_volatility_surface(
             strikes,
@@ -373,4 +648,4 @@ if page == "Volatility Analytics":
         st.plotly_chart(fig_surface, use_container_width=True)
 
     else:
-        st.warning("Not enough data to build surface.")
\ No newline at end of file
+        st.warning("Not enough data to build surface.")
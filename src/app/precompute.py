@@ -0,0 +1,408 @@
+"""
+Background precompute of the dashboard's heavy analytics.
+
+Streamlit reruns the whole dashboard script on every widget change, and
+every session would otherwise redo the same chain pricing, surface fit,
+Heston calibration and Risk page revaluations (scenario grid, hedging
+backtest, VaR). Instead, one PrecomputeWorker per process (held
+by st.cache_resource) computes them on a background thread into a
+ResultStore shared by every session. Pages only read results:
+
+    worker = PrecomputeWorker(ResultStore()).start()
+    analytics = worker.get("analytics", "NVDA", expiries, 100).value
+
+A request registers its key with the worker. A key's result is served
+as long as it exists, and is recomputed in the background once it is
+older than the data TTL (the same TTL after which the data_scraper
+caches refetch quotes), so refreshes follow the market data. Keys no
+page has read for `idle` seconds stop being refreshed and their results
+are dropped; the store and the surface builders also keep only their
+most recently used entries.
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import pandas as pd
+
+from src.analysis.chain_analytics import chain_analytics
+from src.data.data_scraper import (
+    DATA_TTL,
+    get_dividend_yield,
+    get_full_chain,
+    get_option_chain,
+    get_risk_free_rate,
+    get_spot_price,
+    time_to_expiry
+)
+from src.models.heston import calibrate_heston
+from src.models.incremental_surface import IncrementalVolSurface
+from src.risk.hedging import hedge_backtest, historical_paths
+from src.risk.portfolio import Portfolio
+from src.risk.scenarios import scenario_grid
+from src.risk.var import portfolio_var
+
+
+Result = namedtuple("Result", ["value", "error", "version", "computed"])
+
+# Results and surface builders kept before the least recently used go
+MAX_RESULTS = 256
+MAX_BUILDERS = 16
+
+POSITION_COLUMNS = (
+    "underlying", "strike", "expiry", "optionType", "quantity", "style", "multiplier"
+)
+
+
+# -----------------------------------
+# Hashable job arguments
+# -----------------------------------
+# Keys are dict keys, so books and per-underlying inputs are passed to
+# jobs as tuples and rebuilt inside them.
+def freeze(value):
+    """Per-underlying dicts as sorted item tuples; other values unchanged."""
+
+    if isinstance(value, dict):
+        return tuple(sorted(value.items()))
+
+    return value
+
+
+def _thaw(value):
+
+    return dict(value) if isinstance(value, tuple) else value
+
+
+def freeze_book(book) -> tuple:
+    """A Portfolio as a tuple of position rows."""
+
+    return tuple(book.to_frame().itertuples(index=False, name=None))
+
+
+def _book(positions) -> Portfolio:
+
+    return Portfolio.from_frame(pd.DataFrame(list(positions), columns=POSITION_COLUMNS))
+
+
+# -----------------------------------
+# Jobs
+# -----------------------------------
+# One function per kind of result, called as job(worker, ticker, *args).
+# Errors are stored with the result and re-raised by the page reading it.
+def _analytics_job(worker, ticker, expiries, steps):
+
+    # Every contract of every expiry, priced once per data refresh
+    return chain_analytics(
+        get_full_chain(ticker, list(expiries)),
+        r=get_risk_free_rate(),
+        steps=steps
+    )
+
+
+def _surface_job(worker, ticker, expiries):
+
+    # Slices are cached per expiry; only changed chains are refit. The
+    # quoted yield is fetched only for expiries parity cannot fit.
+    builder = worker.builder(ticker, expiries)
+
+    builder.refresh(
+        {exp: get_option_chain(ticker, exp) for exp in expiries},
+        get_spot_price(ticker),
+        get_risk_free_rate(),
+        lambda: get_dividend_yield(ticker),
+        {exp: time_to_expiry(exp) for exp in expiries},
+        parity=True
+    )
+
+    return builder.surface()
+
+
+def _heston_job(worker, ticker, expiries):
+
+    # One calibration across the nearest expiries, shared by every strike
+    return calibrate_heston(
+        get_full_chain(ticker, list(expiries)),
+        r=get_risk_free_rate()
+    )
+
+
+# Book jobs: `spot`, `vol` and `q` are numbers or frozen per-underlying dicts
+def _scenarios_job(worker, ticker, positions, spot, vol, r, q, days, steps):
+
+    return scenario_grid(
+        _book(positions), _thaw(spot), _thaw(vol), r, _thaw(q),
+        days=list(days),
+        steps=steps
+    )
+
+
+def _var_job(worker, ticker, positions, spot, vol, r, q, method, mode, horizon, steps):
+
+    return portfolio_var(
+        _book(positions), _thaw(spot), _thaw(vol), r, _thaw(q),
+        method=method,
+        mode=mode,
+        horizon=horizon,
+        seed=0,
+        workers=1,
+        steps=steps
+    )
+
+
+def _hedge_job(worker, ticker, S, K, T, r, q, option_type, sigma_price, hedge_vols, cost):
+
+    # One set of bootstrapped paths for every hedging vol
+    paths = historical_paths(ticker, T, n_paths=5000, S=S, demean=True, seed=0)
+
+    return {
+        sigma: hedge_backtest(
+            paths, K, T, r, sigma, q,
+            option_type=option_type,
+            sigma_price=sigma_price,
+            cost=cost
+        )
+        for sigma in hedge_vols
+    }
+
+
+JOBS = {
+    "analytics": _analytics_job,
+    "surface": _surface_job,
+    "heston": _heston_job,
+    "scenarios": _scenarios_job,
+    "var": _var_job,
+    "hedge": _hedge_job
+}
+
+
+# -----------------------------------
+# Shared, versioned results
+# -----------------------------------
+class ResultStore:
+    """
+    Thread-safe map from (kind, ticker, *args) keys to their latest
+    Result. Every put bumps the store version and stamps the result with
+    it, so readers can tell whether anything changed since they looked.
+    Beyond `max_entries` keys, the least recently used is evicted.
+    """
+
+    def __init__(self, max_entries=MAX_RESULTS):
+
+        self.version = 0
+        self.max_entries = max_entries
+
+        self._results = OrderedDict()
+        self._changed = threading.Condition()
+
+    def __len__(self):
+
+        return len(self._results)
+
+    def __contains__(self, key):
+
+        return key in self._results
+
+    def put(self, key, value=None, error=None) -> Result:
+
+        with self._changed:
+
+            self.version += 1
+            result = Result(value, error, self.version, time.time())
+
+            self._results[key] = result
+            self._results.move_to_end(key)
+
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+            self._changed.notify_all()
+
+        return result
+
+    def get(self, key):
+        """Latest result of `key`, or None when it was never computed."""
+
+        with self._changed:
+            return self._touch(key)
+
+    def wait(self, key, timeout=None):
+        """Block until `key` has a result (None on timeout)."""
+
+        with self._changed:
+            self._changed.wait_for(lambda: key in self._results, timeout)
+
+            return self._touch(key)
+
+    def discard(self, key):
+
+        with self._changed:
+            self._results.pop(key, None)
+
+    def _touch(self, key):
+
+        # Reads count as use; callers hold the lock
+        if key in self._results:
+            self._results.move_to_end(key)
+
+        return self._results.get(key)
+
+    def age(self, key) -> float:
+        """Seconds since `key` was computed (inf if never)."""
+
+        with self._changed:
+            result = self._results.get(key)
+
+        return float("inf") if result is None else time.time() - result.computed
+
+
+# -----------------------------------
+# Background worker
+# -----------------------------------
+class PrecomputeWorker:
+    """
+    Keeps every requested key of a ResultStore no older than `ttl`
+    seconds, computing on a single daemon thread so concurrent sessions
+    asking for the same result share one computation.
+    """
+
+    def __init__(
+        self,
+        store=None,
+        ttl=DATA_TTL,
+        idle=None,
+        poll=1.0,
+        max_builders=MAX_BUILDERS
+    ):
+
+        self.store = ResultStore() if store is None else store
+        self.ttl = ttl
+        self.idle = 10 * ttl if idle is None else idle
+        self.poll = poll
+        self.max_builders = max_builders
+
+        self.computations = 0
+
+        self._requested = {}
+        self._requested_lock = threading.Lock()
+        self._builders = OrderedDict()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def builder(self, ticker, expiries) -> IncrementalVolSurface:
+        """
+        Surface builder kept across refreshes of one set of expiries;
+        only the `max_builders` most recently used are kept.
+        """
+
+        key = (ticker, tuple(expiries))
+
+        if key not in self._builders:
+            self._builders[key] = IncrementalVolSurface(
+                option_type="call",
+                min_volume=0,
+                moneyness=(0.8, 1.2)
+            )
+
+            while len(self._builders) > self.max_builders:
+                self._builders.popitem(last=False)
+
+        self._builders.move_to_end(key)
+
+        return self._builders[key]
+
+    def request(self, kind, ticker, *args):
+        """Register a key to keep fresh; returns it."""
+
+        if kind not in JOBS:
+            raise ValueError(f"kind must be one of {tuple(JOBS)}")
+
+        key = (kind, ticker) + args
+
+        # Sessions register keys while the worker thread prunes them
+        with self._requested_lock:
+            is_new = key not in self._requested
+            self._requested[key] = time.time()
+
+        if is_new or self.store.age(key) > self.ttl:
+            self._wake.set()
+
+        return key
+
+    def get(self, kind, ticker, *args, timeout=None) -> Result:
+        """
+        Latest result of a key, even if a refresh is under way. The first
+        request of a key waits for its computation; without a running
+        thread, it is computed in the caller.
+        """
+
+        key = self.request(kind, ticker, *args)
+
+        result = self.store.get(key)
+
+        if result is not None:
+            return result
+
+        if self._thread is None:
+            return self.compute(key)
+
+        return self.store.wait(key, timeout)
+
+    def compute(self, key) -> Result:
+
+        kind, ticker, *args = key
+
+        self.computations += 1
+
+        try:
+            value = JOBS[kind](self, ticker, *args)
+        except Exception as e:
+            return self.store.put(key, error=e)
+
+        return self.store.put(key, value)
+
+    def pending(self) -> list:
+        """Requested keys without a result younger than the TTL."""
+
+        now = time.time()
+
+        # Keys nobody reads any more are dropped rather than refreshed
+        with self._requested_lock:
+            for key, seen in list(self._requested.items()):
+                if now - seen > self.idle:
+                    del self._requested[key]
+                    self.store.discard(key)
+
+            keys = list(self._requested)
+
+        return [key for key in keys if self.store.age(key) > self.ttl]
+
+    def run(self):
+
+        while not self._stopped.is_set():
+
+            self._wake.clear()
+
+            for key in self.pending():
+                if self._stopped.is_set():
+                    break
+                self.compute(key)
+
+            self._wake.wait(self.poll)
+
+    def start(self):
+        """Run the worker on a daemon thread."""
+
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+        return self
+
+    def stop(self, timeout=None):
+
+        self._stopped.set()
+        self._wake.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
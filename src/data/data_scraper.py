@@ -1,50 +1,111 @@
+import functools
+import warnings
+
 import pandas as pd
 import numpy as np
-import yfinance as yf
-from pandas_datareader import data as pdr
-import datetime
-import streamlit as st
+
+from src.data.providers import MarketDataError, YFinanceProvider
+
+
+# -----------------------------------
+# Market data provider
+# -----------------------------------
+# Every fetch below goes through one provider so the app can run on
+# Yahoo Finance, recorded snapshots or the local stand-in server.
+_provider = None
+
+_cached_functions = []
+
+# Used only when the rate source fails and the caller accepts a fallback
+FALLBACK_RISK_FREE_RATE = 0.0425
+
+# Seconds before a cached fetch is refetched from the provider
+DATA_TTL = 300
+
+
+def get_provider():
+
+    global _provider
+
+    if _provider is None:
+        _provider = YFinanceProvider()
+
+    return _provider
+
+
+def set_provider(provider):
+
+    global _provider
+
+    _provider = provider
+
+    for func in _cached_functions:
+        func.clear()
+
 
 # -----------------------------------
-# Historic Price Fetching
+# Lazy Streamlit caching
 # -----------------------------------
-def get_historical_data(ticker: str, period = "1y"):
-    stock = yf.Ticker(ticker)
-    hist = stock.history(period=period)
-    return hist
+# Streamlit is only imported on first use so that importing this
+# module stays cheap for workers and CLI jobs. Entries expire after
+# DATA_TTL seconds.
+def _cache_data(func):
+
+    cached = None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+
+        nonlocal cached
+
+        if cached is None:
+            try:
+                import streamlit as st
+                cached = st.cache_data(func, ttl=DATA_TTL)
+            except ImportError:
+                cached = func
+
+        return cached(*args, **kwargs)
+
+    def clear():
+
+        nonlocal cached
+
+        if cached is not None and hasattr(cached, "clear"):
+            cached.clear()
+
+        cached = None
+
+    wrapper.clear = clear
+    _cached_functions.append(wrapper)
+
+    return wrapper
 
 
 # -----------------------------------
 # Fetch spot price of selected ticker
 # -----------------------------------
 def get_spot_price(ticker: str) -> float:
-    stock = yf.Ticker(ticker)
-    price = stock.history(period = "1d")["Close"].iloc[-1]
-    return float(price)
+    return get_provider().get_spot_price(ticker)
 
 # -----------------------
 # Fetch historical OHLCV
 # -----------------------
-@st.cache_data
+@_cache_data
 def get_historical_data(ticker: str, period = "1y") -> pd.DataFrame:
-    stock = yf.Ticker(ticker)
-    hist = stock.history(period=period)
-
-    hist.reset_index(inplace=True)
-
-    return hist
+    return get_provider().get_historical_data(ticker, period=period)
 
 # -----------------------------------
 # Calculate histrical volatility
 # -----------------------------------
-
+@_cache_data
 def calculate_historical_volatility(ticker: str, window=30) -> float:
 
     hist = get_historical_data(ticker, period = "1y")
 
-    hist["log_return"] = np.log(hist["Close"] / hist["Close"].shift(1))
+    log_return = np.log(hist["Close"] / hist["Close"].shift(1))
 
-    rolling_std = hist["log_return"].rolling(window=window).std()
+    rolling_std = log_return.rolling(window=window).std()
 
     annualized_vol = rolling_std.iloc[-1] * np.sqrt(252)
 
@@ -56,87 +117,58 @@ def calculate_historical_volatility(ticker: str, window=30) -> float:
 
 def get_dividend_yield(ticker: str) -> float:
 
-    stock = yf.Ticker(ticker)
-
-    info = stock.info
-    
-    if "dividendYield" in info and info["dividendYield"] is not None:
-        return float(info["dividendYield"])
-    
-    return 0.0
+    return get_provider().get_dividend_yield(ticker)
 
 # -----------------------------------
 # Fetch option chain
 # -----------------------------------
-st.cache_data
+@_cache_data
 def get_option_chain(ticker: str, expiry_date: str):
 
-    stock = yf.Ticker(ticker)
-
-    options = stock.option_chain(expiry_date)
-
-    calls = options.calls.copy()
-    puts = options.puts.copy()
-
-    # Add explicit option type column
-    calls["optionType"] = "call"
-    puts["optionType"] = "put"
-
-    combined = pd.concat([calls, puts], ignore_index=True)
-
-    return combined
+    return get_provider().get_option_chain(ticker, expiry_date)
 
 # --------------------------------------
-# Fetch risk-free rate from FRED
-# Using 3-month T-BilL (DGS3MO) as proxy
+# Fetch risk-free rate
+# Using the 13 week T-Bill index as proxy
 # --------------------------------------
 
-def get_risk_free_rate() -> float:
+def get_risk_free_rate(fallback=FALLBACK_RISK_FREE_RATE) -> float:
     """
-    Fetch 3-month T-Bill rate from FRED
-    Falls back to constant rate if connection fails
+    Fetch the risk-free rate from the active provider.
+    If the provider fails, warn and return `fallback`;
+    pass fallback=None to raise MarketDataError instead.
     """
 
-    import datetime
-
     try:
-        end = datetime.datetime.today()
-        start = end - datetime.timedelta(days=30)
-
-        treasury = yf.Ticker("^IRX") # 13 week T-Bill index
-        # rates = pdr.DataReader(
-        #     "DGS3MO",
-        #     "fred",
-        #     start,
-        #     end
-        # )
-
-        rates = treasury.history(period="1d")["Close"] # removing .iloc[-1] now and adding it to latest rates
-
-        latest_rate = rates.iloc[-1, 0]
-
-        if pd.isna(latest_rate):
-            raise ValueError("Invalid rate received")
-        
-        return float(latest_rate) / 100
-    
+        rate = get_provider().get_risk_free_rate()
+
+        if pd.isna(rate):
+            raise MarketDataError("Invalid rate received")
+
+        return float(rate)
+
     except Exception as e:
 
-        print("Warning: Could not reach FRED database. Using fallback rate.")
-        # print("Error:", e)
+        if fallback is None:
+            if isinstance(e, MarketDataError):
+                raise
+            raise MarketDataError(f"Risk-free rate unavailable: {e}") from e
 
-        # Fallback rate based on recent historical average of 3-month T-Bill yield
-        return 0.0425 
+        warnings.warn(
+            f"Risk-free rate unavailable ({e}); using fallback {fallback}",
+            RuntimeWarning,
+            stacklevel=2
+        )
+
+        return fallback
 
 # -----------------------------------
 # Get available expirations
 # -----------------------------------
-@st.cache_data
+@_cache_data
 def get_expiry_dates(ticker: str):
 
-    stock = yf.Ticker(ticker)
-
-    return stock.options
+    return get_provider().get_expiry_dates(ticker)
 
 # -----------------------------------
 # Get time to expiry
@@ -152,6 +184,37 @@ def time_to_expiry(expiry_date):
 
     return max(T, 0.0001)
 
+# -----------------------------------
+# Fetch every expiry into one chain
+# -----------------------------------
+def get_full_chain(ticker: str, expiries=None) -> pd.DataFrame:
+    """
+    Option chains of all (or the given) expiries stacked into one
+    frame, with expiry, T and spot columns added to each row.
+    """
+
+    if expiries is None:
+        expiries = get_expiry_dates(ticker)
+
+    S = get_spot_price(ticker)
+
+    frames = []
+
+    for expiry in expiries:
+
+        chain = get_option_chain(ticker, expiry)
+
+        frames.append(chain.assign(
+            expiry=expiry,
+            T=time_to_expiry(expiry),
+            spot=S
+        ))
+
+    if not frames:
+        raise MarketDataError(f"No expiries available for {ticker}")
+
+    return pd.concat(frames, ignore_index=True)
+
 # -----------------------------------
 # Master function to fetch all inputs
 # -----------------------------------
@@ -0,0 +1,256 @@
+import numpy as np
+
+from src.models.black_scholes import CALL, PUT, option_flag
+
+
+def mid_price(bid, ask, last):
+    """Bid/ask midpoint where both sides are quoted, last trade otherwise."""
+
+    bid = np.asarray(bid, dtype=np.float64)
+    ask = np.asarray(ask, dtype=np.float64)
+    last = np.asarray(last, dtype=np.float64)
+
+    quoted = (bid > 0) & (ask > 0)
+
+    return np.where(quoted, 0.5 * (bid + ask), last)
+
+
+def _factorize(labels):
+    """Integer codes and sorted unique values of a label array."""
+
+    # Chains are stored ticker by ticker, so only run heads need sorting
+    heads = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+
+    names, codes = np.unique(labels[heads].astype(str), return_inverse=True)
+
+    return np.repeat(codes.ravel(), np.diff(np.r_[heads, labels.size])), names
+
+
+def _column(values, n, dtype=np.float64):
+
+    if values is None:
+        return np.full(n, np.nan, dtype=dtype)
+
+    return np.ascontiguousarray(
+        np.broadcast_to(np.asarray(values, dtype=dtype), (n,))
+    )
+
+
+# -----------------------------------
+# Columnar option chain
+# -----------------------------------
+class OptionChain:
+    """
+    Struct-of-arrays option chain.
+
+    Every field is a contiguous array of length n: float64 for prices
+    and contract terms, int8 for the CALL (+1) / PUT (-1) flag. Mid
+    prices, moneyness (K / S) and intrinsic values are computed once at
+    construction. `spot` and `T` are per row, so one chain can span many
+    expiries or tickers; `expiry` and `ticker` are optional label arrays.
+    """
+
+    def __init__(
+        self,
+        strike,
+        bid,
+        ask,
+        last,
+        volume,
+        flag,
+        spot,
+        T=None,
+        expiry=None,
+        ticker=None,
+        index=None
+    ):
+
+        self.strike = np.ascontiguousarray(strike, dtype=np.float64)
+
+        n = self.strike.size
+
+        self.bid = _column(bid, n)
+        self.ask = _column(ask, n)
+        self.last = _column(last, n)
+        self.volume = _column(volume, n)
+        self.flag = np.ascontiguousarray(
+            np.broadcast_to(option_flag(flag), (n,))
+        )
+        self.spot = _column(spot, n)
+        self.T = _column(T, n)
+
+        self.expiry = None if expiry is None else _column(expiry, n, object)
+        self.ticker = None if ticker is None else _column(ticker, n, object)
+        self.index = np.arange(n) if index is None else np.asarray(index)
+
+        self.mid = mid_price(self.bid, self.ask, self.last)
+        self.moneyness = self.strike / self.spot
+        self.intrinsic = np.maximum(self.flag * (self.spot - self.strike), 0.0)
+
+    def __len__(self):
+
+        return self.strike.size
+
+    def __repr__(self):
+
+        return (
+            f"OptionChain({len(self)} contracts, "
+            f"{int(self.is_call.sum())} calls, {int(self.is_put.sum())} puts)"
+        )
+
+    @property
+    def is_call(self):
+
+        return self.flag == CALL
+
+    @property
+    def is_put(self):
+
+        return self.flag == PUT
+
+    def forward_moneyness(self, r, q=0.0):
+        """log(K / F) with F = S * exp((r - q) * T)."""
+
+        return np.log(self.strike / self.spot) - (np.asarray(r) - q) * self.T
+
+    def expiry_groups(self):
+        """
+        Group index per row for each (ticker, T) slice, and the list of
+        (ticker, T) keys in sorted order (ticker is None without labels).
+        """
+
+        if self.ticker is None:
+            times, ids = np.unique(self.T, return_inverse=True)
+            return ids.ravel(), [(None, T) for T in times]
+
+        codes, names = _factorize(self.ticker)
+        times, t_codes = np.unique(self.T, return_inverse=True)
+
+        keys, ids = np.unique(
+            codes * times.size + t_codes.ravel(), return_inverse=True
+        )
+
+        return ids.ravel(), [
+            (str(names[key // times.size]), times[key % times.size])
+            for key in keys
+        ]
+
+    # -----------------------------------
+    # Selection
+    # -----------------------------------
+    def select(self, mask):
+
+        mask = np.asarray(mask)
+
+        chain = object.__new__(OptionChain)
+
+        for name, value in self.__dict__.items():
+            chain.__dict__[name] = None if value is None else value[mask]
+
+        return chain
+
+    def filter(self, option_type=None, min_volume=None, moneyness=None):
+        """
+        Common liquidity filters: option_type "call"/"put", volume
+        strictly above `min_volume` and K / S inside the open interval
+        `moneyness` = (low, high).
+        """
+
+        mask = np.ones(len(self), dtype=bool)
+
+        if option_type is not None:
+            mask &= self.flag == option_flag(option_type)
+
+        if min_volume is not None:
+            mask &= self.volume > min_volume
+
+        if moneyness is not None:
+            low, high = moneyness
+            mask &= (self.moneyness > low) & (self.moneyness < high)
+
+        return self.select(mask)
+
+    def calls(self):
+
+        return self.select(self.is_call)
+
+    def puts(self):
+
+        return self.select(self.is_put)
+
+    # -----------------------------------
+    # pandas conversion
+    # -----------------------------------
+    @classmethod
+    def from_frame(cls, df, spot=None, T=None, option_type=None):
+        """
+        Build from a get_option_chain-style DataFrame. `spot` and `T`
+        default to the frame's "spot" / "T" columns when present;
+        `option_type` overrides the optionType column.
+        """
+
+        def column(name, default=None):
+            return df[name].to_numpy() if name in df.columns else default
+
+        if spot is None:
+            spot = column("spot")
+
+        if spot is None:
+            raise ValueError("spot is required when the frame has no spot column")
+
+        if T is None:
+            T = column("T")
+
+        if option_type is None:
+            option_type = column("optionType")
+
+        if option_type is None:
+            raise ValueError("option_type is required without an optionType column")
+
+        return cls(
+            strike=column("strike"),
+            bid=column("bid"),
+            ask=column("ask"),
+            last=column("lastPrice"),
+            volume=column("volume"),
+            flag=option_type,
+            spot=spot,
+            T=T,
+            expiry=column("expiry"),
+            ticker=column("ticker"),
+            index=df.index.to_numpy()
+        )
+
+    def to_frame(self, **extra):
+        """
+        DataFrame in the get_option_chain layout plus the precomputed
+        columns; keyword arguments add further columns (e.g. impliedVol).
+        """
+
+        import pandas as pd
+
+        data = {}
+
+        if self.ticker is not None:
+            data["ticker"] = self.ticker
+
+        if self.expiry is not None:
+            data["expiry"] = self.expiry
+
+        data.update({
+            "strike": self.strike,
+            "bid": self.bid,
+            "ask": self.ask,
+            "lastPrice": self.last,
+            "volume": self.volume,
+            "optionType": np.where(self.is_call, "call", "put"),
+            "spot": self.spot,
+            "T": self.T,
+            "mid": self.mid,
+            "moneyness": self.moneyness,
+            "intrinsic": self.intrinsic
+        })
+
+        data.update(extra)
+
+        return pd.DataFrame(data, index=self.index, copy=False)
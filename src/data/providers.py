@@ -0,0 +1,179 @@
+import abc
+import json
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import pandas as pd
+
+
+class MarketDataError(RuntimeError):
+    """Raised when a provider cannot supply the requested data."""
+
+
+# -----------------------------------
+# Provider interface
+# -----------------------------------
+class MarketDataProvider(abc.ABC):
+    """
+    Source of every market input the platform consumes.
+
+    Option chains are returned in the combined layout produced by
+    get_option_chain (yfinance columns plus an optionType column) and
+    histories with a Date column followed by OHLCV columns. Providers
+    missing any method cannot be instantiated.
+    """
+
+    @abc.abstractmethod
+    def get_spot_price(self, ticker: str) -> float:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_expiry_dates(self, ticker: str) -> list:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_option_chain(self, ticker: str, expiry_date: str) -> pd.DataFrame:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_risk_free_rate(self) -> float:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_dividend_yield(self, ticker: str) -> float:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_historical_data(self, ticker: str, period="1y") -> pd.DataFrame:
+        raise NotImplementedError
+
+
+# -----------------------------------
+# Yahoo Finance
+# -----------------------------------
+class YFinanceProvider(MarketDataProvider):
+
+    # 13 week T-Bill index, quoted in percent
+    RATE_TICKER = "^IRX"
+
+    def _ticker(self, ticker):
+
+        import yfinance as yf
+
+        return yf.Ticker(ticker)
+
+    def get_spot_price(self, ticker: str) -> float:
+
+        close = self._ticker(ticker).history(period="1d")["Close"]
+
+        if close.empty:
+            raise MarketDataError(f"No spot price for {ticker}")
+
+        return float(close.iloc[-1])
+
+    def get_expiry_dates(self, ticker: str) -> list:
+
+        return list(self._ticker(ticker).options)
+
+    def get_option_chain(self, ticker: str, expiry_date: str) -> pd.DataFrame:
+
+        options = self._ticker(ticker).option_chain(expiry_date)
+
+        calls = options.calls.copy()
+        puts = options.puts.copy()
+
+        # Add explicit option type column
+        calls["optionType"] = "call"
+        puts["optionType"] = "put"
+
+        return pd.concat([calls, puts], ignore_index=True)
+
+    def get_risk_free_rate(self) -> float:
+
+        rates = self._ticker(self.RATE_TICKER).history(period="5d")["Close"]
+        rates = rates.dropna()
+
+        if rates.empty:
+            raise MarketDataError(f"No quote for {self.RATE_TICKER}")
+
+        return float(rates.iloc[-1]) / 100
+
+    def get_dividend_yield(self, ticker: str) -> float:
+
+        info = self._ticker(ticker).info
+
+        if info.get("dividendYield") is not None:
+            return float(info["dividendYield"])
+
+        return 0.0
+
+    def get_historical_data(self, ticker: str, period="1y") -> pd.DataFrame:
+
+        hist = self._ticker(ticker).history(period=period)
+
+        return hist.reset_index()
+
+
+# -----------------------------------
+# HTTP client for the local stand-in server
+# -----------------------------------
+class HTTPProvider(MarketDataProvider):
+    """Client for src.data.stub_server (or anything speaking its API)."""
+
+    def __init__(self, base_url: str, timeout=10.0):
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _get(self, path, **params):
+
+        url = f"{self.base_url}/{path}"
+
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as resp:
+                return json.loads(resp.read())
+
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", str(e))
+            except ValueError:
+                message = str(e)
+            raise MarketDataError(message) from e
+
+        except urllib.error.URLError as e:
+            raise MarketDataError(f"Cannot reach {url}: {e.reason}") from e
+
+    def get_spot_price(self, ticker: str) -> float:
+
+        return float(self._get("spot", ticker=ticker)["spot"])
+
+    def get_expiry_dates(self, ticker: str) -> list:
+
+        return list(self._get("expiries", ticker=ticker)["expiries"])
+
+    def get_option_chain(self, ticker: str, expiry_date: str) -> pd.DataFrame:
+
+        payload = self._get("chain", ticker=ticker, expiry=expiry_date)
+
+        return pd.DataFrame(payload["columns"])
+
+    def get_risk_free_rate(self) -> float:
+
+        return float(self._get("rate")["rate"])
+
+    def get_dividend_yield(self, ticker: str) -> float:
+
+        return float(self._get("dividend", ticker=ticker)["dividend_yield"])
+
+    def get_historical_data(self, ticker: str, period="1y") -> pd.DataFrame:
+
+        payload = self._get("history", ticker=ticker, period=period)
+
+        hist = pd.DataFrame(payload["columns"])
+        hist["Date"] = pd.to_datetime(hist["Date"])
+
+        return hist
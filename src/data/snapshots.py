@@ -0,0 +1,208 @@
+import datetime
+import json
+import os
+
+import pandas as pd
+
+from src.data.providers import MarketDataError, MarketDataProvider
+
+
+# -----------------------------------
+# On-disk layout
+# -----------------------------------
+# <root>/<YYYY-MM-DD>/market.json              risk-free rate
+# <root>/<YYYY-MM-DD>/<TICKER>/meta.json       spot, dividend yield, expiries
+# <root>/<YYYY-MM-DD>/<TICKER>/chain_<expiry>.csv
+# <root>/<YYYY-MM-DD>/<TICKER>/history.csv
+
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10)
+}
+
+
+def list_snapshot_dates(root: str) -> list:
+
+    if not os.path.isdir(root):
+        return []
+
+    dates = []
+
+    for name in os.listdir(root):
+        try:
+            datetime.date.fromisoformat(name)
+        except ValueError:
+            continue
+        dates.append(name)
+
+    return sorted(dates)
+
+
+def slice_period(hist: pd.DataFrame, period="1y") -> pd.DataFrame:
+
+    if period == "max" or hist.empty:
+        return hist
+
+    if period not in PERIOD_OFFSETS:
+        raise ValueError(f"Unsupported period: {period}")
+
+    dates = pd.to_datetime(hist["Date"])
+    start = dates.iloc[-1] - PERIOD_OFFSETS[period]
+
+    return hist[dates > start].reset_index(drop=True)
+
+
+# -----------------------------------
+# Record a snapshot from any provider
+# -----------------------------------
+def write_snapshot(
+    provider,
+    tickers,
+    root,
+    as_of=None,
+    expiries=None,
+    history_period="1y"
+):
+    """
+    Record everything a provider returns for `tickers` under
+    <root>/<as_of>. `expiries` limits how many expiries are stored
+    per ticker (None = all). Returns the snapshot directory.
+    """
+
+    as_of = as_of or datetime.date.today().isoformat()
+    base = os.path.join(root, as_of)
+
+    os.makedirs(base, exist_ok=True)
+
+    with open(os.path.join(base, "market.json"), "w") as f:
+        json.dump({"risk_free_rate": provider.get_risk_free_rate()}, f)
+
+    for ticker in tickers:
+
+        folder = os.path.join(base, ticker)
+        os.makedirs(folder, exist_ok=True)
+
+        ticker_expiries = list(provider.get_expiry_dates(ticker))
+
+        if expiries is not None:
+            ticker_expiries = ticker_expiries[:expiries]
+
+        for expiry in ticker_expiries:
+            chain = provider.get_option_chain(ticker, expiry)
+            chain.to_csv(
+                os.path.join(folder, f"chain_{expiry}.csv"),
+                index=False
+            )
+
+        hist = provider.get_historical_data(ticker, period=history_period)
+        hist.to_csv(os.path.join(folder, "history.csv"), index=False)
+
+        meta = {
+            "spot": provider.get_spot_price(ticker),
+            "dividend_yield": provider.get_dividend_yield(ticker),
+            "expiries": ticker_expiries
+        }
+
+        with open(os.path.join(folder, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+    return base
+
+
+# -----------------------------------
+# Replay recorded snapshots
+# -----------------------------------
+class SnapshotProvider(MarketDataProvider):
+    """
+    Serve market data from files written by write_snapshot.
+    `as_of` selects a snapshot date; the latest one is used when omitted.
+    """
+
+    def __init__(self, root: str, as_of=None):
+
+        dates = list_snapshot_dates(root)
+
+        if not dates:
+            raise MarketDataError(f"No snapshots under {root}")
+
+        if as_of is None:
+            as_of = dates[-1]
+
+        if as_of not in dates:
+            raise MarketDataError(f"No snapshot for {as_of} under {root}")
+
+        self.root = root
+        self.as_of = as_of
+        self.base = os.path.join(root, as_of)
+        self._meta = {}
+
+    def _folder(self, ticker):
+
+        folder = os.path.join(self.base, ticker)
+
+        if not os.path.isdir(folder):
+            raise MarketDataError(f"{ticker} not in snapshot {self.as_of}")
+
+        return folder
+
+    def _read_meta(self, ticker):
+
+        if ticker not in self._meta:
+            with open(os.path.join(self._folder(ticker), "meta.json")) as f:
+                self._meta[ticker] = json.load(f)
+
+        return self._meta[ticker]
+
+    def tickers(self) -> list:
+
+        return sorted(
+            name for name in os.listdir(self.base)
+            if os.path.isdir(os.path.join(self.base, name))
+        )
+
+    def get_spot_price(self, ticker: str) -> float:
+
+        return float(self._read_meta(ticker)["spot"])
+
+    def get_expiry_dates(self, ticker: str) -> list:
+
+        return list(self._read_meta(ticker)["expiries"])
+
+    def get_option_chain(self, ticker: str, expiry_date: str) -> pd.DataFrame:
+
+        path = os.path.join(self._folder(ticker), f"chain_{expiry_date}.csv")
+
+        if not os.path.exists(path):
+            raise MarketDataError(
+                f"No {expiry_date} chain for {ticker} in {self.as_of}"
+            )
+
+        return pd.read_csv(path)
+
+    def get_risk_free_rate(self) -> float:
+
+        with open(os.path.join(self.base, "market.json")) as f:
+            return float(json.load(f)["risk_free_rate"])
+
+    def get_dividend_yield(self, ticker: str) -> float:
+
+        return float(self._read_meta(ticker).get("dividend_yield", 0.0))
+
+    def get_historical_data(self, ticker: str, period="1y") -> pd.DataFrame:
+
+        path = os.path.join(self._folder(ticker), "history.csv")
+
+        if not os.path.exists(path):
+            raise MarketDataError(f"No history for {ticker} in {self.as_of}")
+
+        hist = pd.read_csv(path)
+        hist["Date"] = pd.to_datetime(hist["Date"], utc=True)
+
+        return slice_period(hist, period)
@@ -0,0 +1,44 @@
+import os
+
+
+# -----------------------------------
+# Tabular output files
+# -----------------------------------
+# Batch jobs write their results as Parquet (pyarrow or fastparquet)
+# or CSV, one file per partition.
+FORMATS = ("parquet", "csv")
+
+
+def check_format(fmt):
+    """Raise if `fmt` is unknown, or is Parquet without an engine installed."""
+
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}")
+
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            try:
+                import fastparquet  # noqa: F401
+            except ImportError:
+                raise ImportError(
+                    "Parquet output needs pyarrow or fastparquet; "
+                    "install one or use format='csv'"
+                ) from None
+
+
+def write_frame(frame, path, fmt):
+    """Write a DataFrame to `path`, creating its directory."""
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp = path + ".tmp"
+
+    if fmt == "parquet":
+        frame.to_parquet(tmp, index=False)
+    else:
+        frame.to_csv(tmp, index=False)
+
+    # Readers never see a half-written file
+    os.replace(tmp, path)
@@ -0,0 +1,521 @@
+"""
+Streaming quotes into a live, in-memory analytics table.
+
+A feed is any object with an async `ticks()` generator yielding
+OptionTick and SpotTick updates. QuoteStream drains it on an asyncio
+loop in micro-batches: ticks arriving within `interval` seconds are
+coalesced (the last quote per contract and per spot wins) and applied
+to a LiveOptionTable in one step, which re-inverts implied vols and
+recomputes Greeks only for the rows the batch touched: the quoted
+contracts, plus every contract of an underlying whose spot moved.
+
+ReplayFeed plays back a recorded tick list and SyntheticFeed generates
+random spot and quote moves for a table's contracts, for testing
+without a market connection.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.option_chain import _factorize, mid_price
+from src.models.black_scholes import option_flag, price_and_greeks_batch
+from src.models.implied_vol import implied_volatility_batch
+
+
+OptionTick = namedtuple("OptionTick", ["contract", "bid", "ask"])
+SpotTick = namedtuple("SpotTick", ["ticker", "price"])
+
+# Default micro-batch window, in seconds
+BATCH_INTERVAL = 0.01
+
+# Ticks queued ahead of the batch loop before the feed has to wait
+MAX_QUEUED_TICKS = 100_000
+
+# Recent batches kept for the latency percentiles
+MAX_BATCH_STATS = 10_000
+
+LIVE_COLUMNS = ("impliedVol", "price", "delta", "gamma", "vega", "theta", "rho")
+
+
+# -----------------------------------
+# Shared live table
+# -----------------------------------
+class LiveOptionTable:
+    """
+    Struct-of-arrays table of contracts with their latest quotes, spot,
+    implied vol and Greeks, shared between the streaming loop (writer)
+    and any number of readers (e.g. Streamlit reruns) under a lock.
+
+    Built from a get_full_chain-style frame with ticker and expiry
+    (optional), contractSymbol, strike, optionType, bid, ask, lastPrice,
+    T and spot columns; `r` and `q` are numbers, per-row arrays or dicts
+    keyed by ticker.
+    """
+
+    def __init__(self, frame, r, q=0.0):
+
+        n = len(frame)
+
+        tickers = (
+            frame["ticker"].to_numpy().astype(str) if "ticker" in frame.columns
+            else np.full(n, "chain")
+        )
+
+        self.codes, self.tickers = _factorize(tickers)
+        self.contracts = frame["contractSymbol"].astype(str).to_numpy()
+        self.expiry = (
+            frame["expiry"].to_numpy() if "expiry" in frame.columns else None
+        )
+
+        self.strike = frame["strike"].to_numpy(dtype=np.float64)
+        self.T = frame["T"].to_numpy(dtype=np.float64)
+        self.flag = option_flag(frame["optionType"].to_numpy())
+
+        def per_row(value):
+            if isinstance(value, dict):
+                return np.array([value[t] for t in self.tickers], dtype=np.float64)[self.codes]
+            return np.array(np.broadcast_to(np.asarray(value, dtype=np.float64), n))
+
+        self.r = per_row(r)
+        self.q = per_row(q)
+
+        self.bid = frame["bid"].to_numpy(dtype=np.float64).copy()
+        self.ask = frame["ask"].to_numpy(dtype=np.float64).copy()
+        self.mid = mid_price(self.bid, self.ask, frame["lastPrice"].to_numpy())
+
+        self.spots = np.array(
+            frame.groupby(tickers, sort=True)["spot"].first(), dtype=np.float64
+        )
+
+        self.values = {name: np.full(n, np.nan) for name in LIVE_COLUMNS}
+        self.updated = np.zeros(n)
+
+        self.row = {contract: i for i, contract in enumerate(self.contracts)}
+        self._ticker_code = {name: i for i, name in enumerate(self.tickers)}
+        self._ticker_rows = np.split(
+            np.argsort(self.codes, kind="stable"),
+            np.cumsum(np.bincount(self.codes, minlength=len(self.tickers)))[:-1]
+        )
+
+        self.version = 0
+        self._lock = threading.Lock()
+
+        self._recompute(np.arange(n))
+        self.updated[:] = time.time()
+
+    def __len__(self):
+
+        return self.strike.size
+
+    def __repr__(self):
+
+        return (
+            f"LiveOptionTable({len(self)} contracts on {len(self.tickers)} "
+            f"underlyings, version {self.version})"
+        )
+
+    def _recompute(self, rows):
+        """
+        Implied vol (warm started from the last one) and Greeks of `rows`,
+        written in place; callers hold the lock.
+        """
+
+        S = self.spots[self.codes[rows]]
+        args = (self.strike[rows], self.T[rows], self.r[rows])
+
+        previous = self.values["impliedVol"][rows]
+
+        iv = implied_volatility_batch(
+            self.mid[rows], S, *args, self.q[rows], self.flag[rows],
+            initial_guess=np.where(np.isfinite(previous), previous, 0.2)
+        )
+
+        greeks = price_and_greeks_batch(
+            S, self.strike[rows], self.T[rows], self.r[rows], iv,
+            self.q[rows], self.flag[rows]
+        )
+
+        self.values["impliedVol"][rows] = iv
+
+        for name in LIVE_COLUMNS[1:]:
+            self.values[name][rows] = greeks[name]
+
+    def apply(self, quotes=None, spots=None) -> int:
+        """
+        Apply one coalesced batch: `quotes` maps contract -> (bid, ask),
+        `spots` maps ticker -> price. Unknown contracts and tickers are
+        ignored. Returns the number of rows recomputed.
+        """
+
+        quotes = quotes or {}
+        spots = spots or {}
+
+        rows = np.fromiter(
+            (self.row[c] for c in quotes if c in self.row), dtype=np.intp
+        )
+        codes = np.fromiter(
+            (self._ticker_code[t] for t in spots if t in self._ticker_code), dtype=np.intp
+        )
+
+        touched = np.unique(np.concatenate(
+            [rows] + [self._ticker_rows[code] for code in codes]
+        )).astype(np.intp)
+
+        if touched.size == 0:
+            return 0
+
+        with self._lock:
+
+            if rows.size:
+                bid, ask = np.array(
+                    [quotes[self.contracts[i]] for i in rows], dtype=np.float64
+                ).T
+                self.bid[rows] = bid
+                self.ask[rows] = ask
+                self.mid[rows] = mid_price(bid, ask, self.mid[rows])
+
+            for ticker, price in spots.items():
+                if ticker in self._ticker_code:
+                    self.spots[self._ticker_code[ticker]] = price
+
+            self._recompute(touched)
+
+            self.updated[touched] = time.time()
+            self.version += 1
+
+        return int(touched.size)
+
+    def snapshot(self) -> pd.DataFrame:
+        """Consistent copy of the whole table as a DataFrame."""
+
+        with self._lock:
+
+            table = pd.DataFrame({
+                "ticker": self.tickers[self.codes],
+                "contractSymbol": self.contracts,
+                "strike": self.strike,
+                "T": self.T,
+                "optionType": np.where(self.flag > 0, "call", "put"),
+                "spot": self.spots[self.codes],
+                "bid": self.bid,
+                "ask": self.ask,
+                "mid": self.mid,
+                **{name: values.copy() for name, values in self.values.items()},
+                "updated": self.updated.copy()
+            })
+
+        if self.expiry is not None:
+            table.insert(2, "expiry", self.expiry)
+
+        return table
+
+
+# -----------------------------------
+# Feeds
+# -----------------------------------
+class ReplayFeed:
+    """Plays back a sequence of ticks, `rate` per second (None = at once)."""
+
+    def __init__(self, ticks, rate=None):
+
+        self.recorded = list(ticks)
+        self.rate = rate
+
+    async def ticks(self):
+
+        pause = 0.0 if self.rate is None else 1.0 / self.rate
+
+        for tick in self.recorded:
+            yield tick
+            await asyncio.sleep(pause)
+
+
+class SyntheticFeed:
+    """
+    Random ticks for the contracts of a LiveOptionTable: each step moves
+    one underlying's spot (lognormal, `spot_vol` per step) with
+    probability `spot_share`, otherwise requotes one contract around its
+    current mid. Deterministic for a given seed.
+    """
+
+    def __init__(
+        self,
+        table,
+        n_ticks=10000,
+        rate=None,
+        spot_share=0.1,
+        spot_vol=0.001,
+        spread=0.04,
+        seed=0
+    ):
+
+        self.table = table
+        self.n_ticks = n_ticks
+        self.rate = rate
+        self.spot_share = spot_share
+        self.spot_vol = spot_vol
+        self.spread = spread
+        self.seed = seed
+
+    async def ticks(self):
+
+        rng = np.random.default_rng(self.seed)
+        table = self.table
+
+        spots = table.spots.copy()
+        pause = 0.0 if self.rate is None else 1.0 / self.rate
+
+        for _ in range(self.n_ticks):
+
+            if rng.random() < self.spot_share:
+                code = rng.integers(len(table.tickers))
+                spots[code] *= np.exp(self.spot_vol * rng.standard_normal())
+                yield SpotTick(str(table.tickers[code]), float(spots[code]))
+
+            else:
+                i = rng.integers(len(table))
+                mid = table.mid[i] * np.exp(0.01 * rng.standard_normal())
+                half = max(0.5 * self.spread * mid, 0.005)
+                yield OptionTick(str(table.contracts[i]), mid - half, mid + half)
+
+            await asyncio.sleep(pause)
+
+
+# -----------------------------------
+# Micro-batching consumer
+# -----------------------------------
+class QuoteStream:
+    """
+    Drains a feed into a LiveOptionTable. The reader task only queues
+    ticks; the batch loop waits for a tick, keeps collecting for
+    `interval` seconds, coalesces and applies the batch. At most
+    `max_queued` ticks wait in the queue, so a feed faster than the
+    table can apply them is held back. Latency (apply time) and sizes
+    of the last `max_stats` batches are kept in `batches`, with running
+    totals in `totals`.
+    """
+
+    def __init__(
+        self,
+        table,
+        feed,
+        interval=BATCH_INTERVAL,
+        max_queued=MAX_QUEUED_TICKS,
+        max_stats=MAX_BATCH_STATS
+    ):
+
+        self.table = table
+        self.feed = feed
+        self.interval = interval
+        self.max_queued = max_queued
+
+        self.batches = deque(maxlen=max_stats)
+        self.totals = {"batches": 0, "ticks": 0, "rows": 0}
+
+        self._thread = None
+        self._loop = None
+        self._queue = None
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+
+    async def _read(self, queue):
+
+        async for tick in self.feed.ticks():
+            await queue.put(tick)
+
+        await queue.put(None)
+
+    def _coalesce(self, ticks):
+
+        quotes, spots = {}, {}
+
+        for tick in ticks:
+            if isinstance(tick, SpotTick):
+                spots[tick.ticker] = tick.price
+            else:
+                quotes[tick.contract] = (tick.bid, tick.ask)
+
+        return quotes, spots
+
+    async def run(self):
+        """Consume the feed until it ends (or stop() is called)."""
+
+        queue = self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._loop = asyncio.get_running_loop()
+        self._ready.set()
+
+        reader = asyncio.create_task(self._read(queue))
+
+        finished = False
+
+        try:
+            while not finished and not self._stopped.is_set():
+
+                tick = await queue.get()
+
+                if tick is None:
+                    break
+
+                ticks = [tick]
+                deadline = time.perf_counter() + self.interval
+
+                # Collect until the window closes
+                while True:
+
+                    while not queue.empty():
+                        tick = queue.get_nowait()
+                        if tick is None:
+                            finished = True
+                            break
+                        ticks.append(tick)
+
+                    remaining = deadline - time.perf_counter()
+
+                    if finished or remaining <= 0:
+                        break
+
+                    await asyncio.sleep(min(remaining, 0.001))
+
+                quotes, spots = self._coalesce(ticks)
+
+                start = time.perf_counter()
+                rows = self.table.apply(quotes, spots)
+
+                self.batches.append({
+                    "ticks": len(ticks),
+                    "quotes": len(quotes),
+                    "spots": len(spots),
+                    "rows": rows,
+                    "seconds": time.perf_counter() - start
+                })
+
+                self.totals["batches"] += 1
+                self.totals["ticks"] += len(ticks)
+                self.totals["rows"] += rows
+
+        finally:
+            reader.cancel()
+
+    def start(self):
+        """Run the stream on an event loop in a daemon thread."""
+
+        def target():
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(self.run())
+            finally:
+                loop.close()
+
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+
+        return self
+
+    def _wake(self):
+
+        # A full queue means the batch loop is draining it and will see
+        # the stop flag after its current batch
+        try:
+            self._queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+    def stop(self, timeout=None):
+
+        self._stopped.set()
+
+        if self._thread is None:
+            return
+
+        # The loop and queue only exist once run() has started
+        self._ready.wait(timeout)
+
+        # An end-of-feed marker wakes the batch loop wherever it waits;
+        # a stream whose feed already ended has nothing to wake
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wake)
+            except RuntimeError:
+                pass
+
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        """
+        Batch, tick and row totals, and latency percentiles in
+        milliseconds over the recent batches.
+        """
+
+        if not self.batches:
+            return {"batches": 0}
+
+        seconds = np.array([b["seconds"] for b in self.batches])
+
+        return {
+            **self.totals,
+            "p50_ms": 1e3 * float(np.percentile(seconds, 50)),
+            "p99_ms": 1e3 * float(np.percentile(seconds, 99)),
+            "max_ms": 1e3 * float(seconds.max())
+        }
+
+
+# -----------------------------------
+# Long-lived streams by key
+# -----------------------------------
+class StreamCache:
+    """
+    Running streams by key for callers that ask for the same streams
+    over and over (e.g. dashboard reruns). `factory(key)` opens and
+    starts a stream. A stream older than `ttl` seconds, or the least
+    recently used one beyond `max_streams`, is stopped; an expired key
+    gets a fresh stream on its next request.
+    """
+
+    def __init__(self, factory, max_streams=4, ttl=None, stop_timeout=1.0):
+
+        self.factory = factory
+        self.max_streams = max_streams
+        self.ttl = ttl
+        self.stop_timeout = stop_timeout
+
+        self._streams = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+
+        return len(self._streams)
+
+    def get(self, key):
+
+        with self._lock:
+
+            now = time.time()
+
+            if self.ttl is not None:
+                for expired in [k for k, (_, opened) in self._streams.items()
+                                if now - opened > self.ttl]:
+                    self._streams.pop(expired)[0].stop(self.stop_timeout)
+
+            if key in self._streams:
+                self._streams.move_to_end(key)
+                return self._streams[key][0]
+
+            stream = self.factory(key)
+            self._streams[key] = (stream, now)
+
+            while len(self._streams) > self.max_streams:
+                self._streams.popitem(last=False)[1][0].stop(self.stop_timeout)
+
+            return stream
+
+    def stop(self):
+        """Stop every stream."""
+
+        with self._lock:
+            while self._streams:
+                self._streams.popitem()[1][0].stop(self.stop_timeout)
@@ -0,0 +1,187 @@
+"""
+Local stand-in for the market-data backend.
+
+Serves any MarketDataProvider (recorded snapshots, synthetic data, ...)
+over a small JSON API consumed by src.data.providers.HTTPProvider:
+
+    GET /spot?ticker=NVDA
+    GET /expiries?ticker=NVDA
+    GET /chain?ticker=NVDA&expiry=2025-01-17
+    GET /rate
+    GET /dividend?ticker=NVDA
+    GET /history?ticker=NVDA&period=1y
+
+Run with:
+    python -m src.data.stub_server --snapshots data/snapshots --port 8765
+    python -m src.data.stub_server --synthetic --port 8765
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.data.providers import MarketDataError
+
+
+def _frame_payload(df):
+
+    df = df.copy()
+
+    for col in df.columns:
+        if str(df[col].dtype).startswith("datetime"):
+            df[col] = df[col].astype(str)
+
+    return {"columns": df.to_dict(orient="list")}
+
+
+def _routes(provider):
+
+    def one(params, name):
+
+        if name not in params:
+            raise KeyError(name)
+
+        return params[name][0]
+
+    return {
+        "/spot": lambda p: {
+            "spot": provider.get_spot_price(one(p, "ticker"))
+        },
+        "/expiries": lambda p: {
+            "expiries": list(provider.get_expiry_dates(one(p, "ticker")))
+        },
+        "/chain": lambda p: _frame_payload(
+            provider.get_option_chain(one(p, "ticker"), one(p, "expiry"))
+        ),
+        "/rate": lambda p: {
+            "rate": provider.get_risk_free_rate()
+        },
+        "/dividend": lambda p: {
+            "dividend_yield": provider.get_dividend_yield(one(p, "ticker"))
+        },
+        "/history": lambda p: _frame_payload(
+            provider.get_historical_data(
+                one(p, "ticker"),
+                period=p.get("period", ["1y"])[0]
+            )
+        )
+    }
+
+
+def make_handler(provider, latency=0.0):
+    """
+    Build a request handler serving `provider`. `latency` (seconds) is
+    added to every response to mimic a remote backend under load tests.
+    """
+
+    routes = _routes(provider)
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def _send(self, status, payload):
+
+            body = json.dumps(payload).encode()
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+
+            url = urllib.parse.urlparse(self.path)
+            route = routes.get(url.path)
+
+            if latency > 0:
+                time.sleep(latency)
+
+            if route is None:
+                self._send(404, {"error": f"Unknown endpoint {url.path}"})
+                return
+
+            try:
+                payload = route(urllib.parse.parse_qs(url.query))
+            except KeyError as e:
+                self._send(400, {"error": f"Missing parameter {e.args[0]}"})
+                return
+            except (MarketDataError, ValueError) as e:
+                self._send(404, {"error": str(e)})
+                return
+            except Exception as e:
+                self._send(502, {"error": f"{type(e).__name__}: {e}"})
+                return
+
+            self._send(200, payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_stub_server(provider, host="127.0.0.1", port=0, latency=0.0):
+    """
+    Serve `provider` from a daemon thread. Port 0 picks a free port;
+    the resulting URL is available as `server.base_url`.
+    """
+
+    server = ThreadingHTTPServer((host, port), make_handler(provider, latency))
+    server.daemon_threads = True
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    return server
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--snapshots",
+                        help="directory written by write_snapshot")
+    source.add_argument("--synthetic", action="store_true",
+                        help="serve generated chains for any ticker")
+    parser.add_argument("--as-of", default=None,
+                        help="snapshot or synthetic date (default: latest / today)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        from src.data.synthetic import SyntheticProvider
+
+        provider = SyntheticProvider(as_of=args.as_of, seed=args.seed)
+        source_name = "synthetic data"
+
+    else:
+        from src.data.snapshots import SnapshotProvider
+
+        provider = SnapshotProvider(args.snapshots, as_of=args.as_of)
+        source_name = provider.base
+
+    server = ThreadingHTTPServer(
+        (args.host, args.port),
+        make_handler(provider, args.latency_ms / 1000)
+    )
+
+    print(f"Serving {source_name} on http://{args.host}:{args.port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
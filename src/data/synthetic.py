@@ -0,0 +1,409 @@
+"""
+Synthetic, arbitrage-free option chains for load and scale testing.
+
+Quotes are generated from an SSVI surface (no butterfly or calendar
+arbitrage by construction), priced with the vectorized Black-Scholes
+kernel, then widened into tick-rounded bid/ask quotes with noisy last
+prices and moneyness-dependent volumes. The column layout matches
+get_option_chain so every consumer of live chains works unchanged.
+"""
+
+import datetime
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from src.data.providers import MarketDataError, MarketDataProvider
+from src.data.snapshots import slice_period
+from src.models.black_scholes import black_scholes_price_batch
+from src.models.vol_surface import ssvi_total_variance
+
+
+DEFAULT_EXPIRY_DAYS = (7, 14, 21, 30, 45, 60, 90, 120, 180, 270, 365, 540, 730)
+
+CHAIN_COLUMNS = [
+    "contractSymbol",
+    "strike",
+    "lastPrice",
+    "bid",
+    "ask",
+    "volume",
+    "impliedVolatility",
+    "optionType"
+]
+
+TICK = 0.01
+
+
+# -----------------------------------
+# Per-ticker market parameters
+# -----------------------------------
+def _rng(seed, *keys):
+
+    return np.random.default_rng(
+        [seed] + [zlib.crc32(str(k).encode()) for k in keys]
+    )
+
+
+def ticker_params(ticker: str, seed=0) -> dict:
+    """Deterministic spot, dividend yield and SSVI parameters for a ticker."""
+
+    rng = _rng(seed, ticker)
+
+    rho = rng.uniform(-0.75, -0.15)
+
+    return {
+        "spot": float(np.round(np.exp(rng.uniform(np.log(15), np.log(800))), 2)),
+        "dividend_yield": float(rng.choice([0.0, 0.0, 0.01, 0.02, 0.035])),
+        "short_vol": rng.uniform(0.15, 0.9),
+        "long_vol": rng.uniform(0.18, 0.6),
+        "kappa": rng.uniform(0.5, 4.0),
+        "rho": rho,
+        # Keeps eta * (1 + |rho|) <= 2 (no butterfly arbitrage)
+        "eta": rng.uniform(0.4, 1.0) * 2 / (1 + abs(rho)),
+        "gamma": 0.45
+    }
+
+
+def atm_total_variance(T, params):
+    """
+    ATM total variance from a mean-reverting variance curve.
+    Its derivative in T is positive, so there is no calendar arbitrage.
+    """
+
+    T = np.asarray(T, dtype=np.float64)
+
+    v0 = params["short_vol"] ** 2
+    v_inf = params["long_vol"] ** 2
+    kappa = params["kappa"]
+
+    return v_inf * T + (v0 - v_inf) * (1 - np.exp(-kappa * T)) / kappa
+
+
+def _strike_increment(step):
+
+    magnitude = 10 ** np.floor(np.log10(step))
+
+    for mult in (5, 2.5, 2, 1):
+        if mult * magnitude <= step:
+            return mult * magnitude
+
+    return magnitude
+
+
+def _strike_grid(forward, atm_vol, T, n_strikes):
+
+    width = np.clip(4 * atm_vol * np.sqrt(T), 0.1, 1.5)
+    step = forward * (np.exp(width) - np.exp(-width)) / (n_strikes - 1)
+
+    inc = _strike_increment(step)
+    centre = np.round(forward / inc) * inc
+
+    strikes = centre + inc * (np.arange(n_strikes) - n_strikes // 2)
+
+    return strikes[strikes > 0]
+
+
+# -----------------------------------
+# Quote generation
+# -----------------------------------
+def _quote_block(
+    ticker,
+    params,
+    expiries,
+    T,
+    r,
+    n_strikes,
+    spread,
+    noise,
+    volume_scale,
+    rng
+):
+
+    S = params["spot"]
+    q = params["dividend_yield"]
+
+    strikes, taus, labels = [], [], []
+
+    for expiry, tau in zip(expiries, T):
+
+        forward = S * np.exp((r - q) * tau)
+        atm_vol = np.sqrt(atm_total_variance(tau, params) / tau)
+
+        K = _strike_grid(forward, atm_vol, tau, n_strikes)
+
+        strikes.append(K)
+        taus.append(np.full(K.size, tau))
+        labels.append(np.full(K.size, expiry, dtype=object))
+
+    # Calls then puts for every expiry
+    K = np.tile(np.concatenate(strikes), 2)
+    tau = np.tile(np.concatenate(taus), 2)
+    expiry = np.tile(np.concatenate(labels), 2)
+
+    n = K.size // 2
+    option_type = np.repeat(np.array(["call", "put"], dtype=object), n)
+
+    forward = S * np.exp((r - q) * tau)
+    k = np.log(K / forward)
+
+    w = ssvi_total_variance(
+        k,
+        atm_total_variance(tau, params),
+        params["rho"],
+        params["eta"],
+        params["gamma"]
+    )
+    iv = np.sqrt(w / tau)
+
+    mid = black_scholes_price_batch(S, K, tau, r, iv, q, option_type)
+
+    # Quotes bracket the arbitrage-free mid on the tick grid
+    half_spread = np.maximum(0.5 * spread * mid, TICK)
+
+    bid = np.maximum(np.floor((mid - half_spread) / TICK) * TICK, 0.0)
+    ask = np.maximum(np.ceil((mid + half_spread) / TICK) * TICK, TICK)
+
+    last = mid + noise * half_spread * rng.uniform(-1, 1, mid.size)
+    last = np.maximum(np.round(last / TICK) * TICK, TICK)
+
+    liquidity = np.exp(-np.abs(k) / (2 * np.sqrt(w)))
+    volume = rng.poisson(volume_scale * liquidity / np.sqrt(1 + tau))
+
+    return {
+        "ticker": np.full(K.size, ticker, dtype=object),
+        "expiry": expiry,
+        "T": tau,
+        "spot": np.full(K.size, S),
+        "strike": K,
+        "lastPrice": np.round(last, 2),
+        "bid": np.round(bid, 2),
+        "ask": np.round(ask, 2),
+        "volume": volume.astype(np.float64),
+        "impliedVolatility": iv,
+        "optionType": option_type
+    }
+
+
+def _contract_symbols(ticker, expiry, option_type, strike):
+
+    return [
+        f"{ticker}{e[2:4]}{e[5:7]}{e[8:10]}{t[0].upper()}{int(round(k * 1000)):08d}"
+        for e, t, k in zip(expiry, option_type, strike)
+    ]
+
+
+def _expiry_dates(as_of, expiry_days):
+
+    return [
+        (as_of + datetime.timedelta(days=int(d))).isoformat()
+        for d in expiry_days
+    ]
+
+
+def _as_of_date(as_of):
+
+    if as_of is None:
+        return datetime.date.today()
+
+    if isinstance(as_of, str):
+        return datetime.date.fromisoformat(as_of)
+
+    return as_of
+
+
+def generate_option_chain(
+    ticker="SYN",
+    expiry_date=None,
+    as_of=None,
+    r=0.04,
+    n_strikes=41,
+    spread=0.04,
+    noise=0.5,
+    volume_scale=500,
+    seed=0,
+    params=None
+) -> pd.DataFrame:
+    """
+    One synthetic chain (calls and puts) in the get_option_chain layout.
+    `params` overrides the ticker's generated parameters (see ticker_params).
+    """
+
+    as_of = _as_of_date(as_of)
+
+    if expiry_date is None:
+        expiry_date = _expiry_dates(as_of, [30])[0]
+
+    T = (datetime.date.fromisoformat(expiry_date) - as_of).days / 365
+
+    if T <= 0:
+        raise ValueError("expiry_date must be after as_of")
+
+    params = {**ticker_params(ticker, seed), **(params or {})}
+
+    block = _quote_block(
+        ticker, params, [expiry_date], [T], r, n_strikes,
+        spread, noise, volume_scale, _rng(seed, ticker, expiry_date)
+    )
+
+    block["contractSymbol"] = _contract_symbols(
+        ticker, block["expiry"], block["optionType"], block["strike"]
+    )
+
+    return pd.DataFrame({col: block[col] for col in CHAIN_COLUMNS})
+
+
+def iter_synthetic_chains(
+    tickers,
+    as_of=None,
+    r=0.04,
+    expiry_days=DEFAULT_EXPIRY_DAYS,
+    n_strikes=41,
+    chunk_size=250_000,
+    spread=0.04,
+    noise=0.5,
+    volume_scale=500,
+    seed=0,
+    symbols=False
+):
+    """
+    Stream chains for many tickers as DataFrames of at most `chunk_size`
+    rows. Besides the chain columns each row carries ticker, expiry,
+    T and spot, so chunks are self-describing. Memory stays bounded by
+    one ticker's chain plus one chunk.
+    """
+
+    as_of = _as_of_date(as_of)
+    expiries = _expiry_dates(as_of, expiry_days)
+    T = np.asarray(expiry_days, dtype=np.float64) / 365
+
+    columns = ["ticker", "expiry", "T", "spot"] + CHAIN_COLUMNS
+
+    if not symbols:
+        columns.remove("contractSymbol")
+
+    buffer = []
+    buffered = 0
+
+    for ticker in tickers:
+
+        block = _quote_block(
+            ticker, ticker_params(ticker, seed), expiries, T, r,
+            n_strikes, spread, noise, volume_scale, _rng(seed, ticker, "chain")
+        )
+
+        if symbols:
+            block["contractSymbol"] = _contract_symbols(
+                ticker, block["expiry"], block["optionType"], block["strike"]
+            )
+
+        buffer.append(pd.DataFrame({col: block[col] for col in columns}))
+        buffered += len(buffer[-1])
+
+        while buffered >= chunk_size:
+            merged = pd.concat(buffer, ignore_index=True)
+            yield merged.iloc[:chunk_size].reset_index(drop=True)
+            buffer = [merged.iloc[chunk_size:]]
+            buffered = len(buffer[0])
+
+    if buffered:
+        yield pd.concat(buffer, ignore_index=True)
+
+
+# -----------------------------------
+# Provider
+# -----------------------------------
+class SyntheticProvider(MarketDataProvider):
+    """
+    MarketDataProvider serving synthetic data for any ticker (or only
+    `tickers` when given). Output is deterministic for a given seed.
+    """
+
+    def __init__(
+        self,
+        tickers=None,
+        as_of=None,
+        r=0.04,
+        expiry_days=DEFAULT_EXPIRY_DAYS,
+        n_strikes=41,
+        spread=0.04,
+        noise=0.5,
+        seed=0
+    ):
+
+        self.tickers = None if tickers is None else list(tickers)
+        self.as_of = _as_of_date(as_of)
+        self.r = r
+        self.expiry_days = expiry_days
+        self.n_strikes = n_strikes
+        self.spread = spread
+        self.noise = noise
+        self.seed = seed
+
+    def _params(self, ticker):
+
+        if self.tickers is not None and ticker not in self.tickers:
+            raise MarketDataError(f"Unknown synthetic ticker {ticker}")
+
+        return ticker_params(ticker, self.seed)
+
+    def get_spot_price(self, ticker: str) -> float:
+
+        return self._params(ticker)["spot"]
+
+    def get_expiry_dates(self, ticker: str) -> list:
+
+        self._params(ticker)
+
+        return _expiry_dates(self.as_of, self.expiry_days)
+
+    def get_option_chain(self, ticker: str, expiry_date: str) -> pd.DataFrame:
+
+        return generate_option_chain(
+            ticker,
+            expiry_date,
+            as_of=self.as_of,
+            r=self.r,
+            n_strikes=self.n_strikes,
+            spread=self.spread,
+            noise=self.noise,
+            seed=self.seed,
+            params=self._params(ticker)
+        )
+
+    def get_risk_free_rate(self) -> float:
+
+        return self.r
+
+    def get_dividend_yield(self, ticker: str) -> float:
+
+        return self._params(ticker)["dividend_yield"]
+
+    def get_historical_data(self, ticker: str, period="1y") -> pd.DataFrame:
+
+        params = self._params(ticker)
+        rng = _rng(self.seed, ticker, "history")
+
+        dates = pd.bdate_range(end=self.as_of, periods=5 * 252)
+        vol = params["long_vol"] / np.sqrt(252)
+
+        # Walk backwards from today's spot so the last close matches it
+        returns = rng.normal(-0.5 * vol ** 2, vol, len(dates))
+        remaining = np.cumsum(returns[::-1])[::-1] - returns
+        close = params["spot"] * np.exp(-remaining)
+
+        open_ = close * np.exp(rng.normal(0, 0.25 * vol, len(dates)))
+        high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.5 * vol, len(dates))))
+        low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.5 * vol, len(dates))))
+
+        hist = pd.DataFrame({
+            "Date": dates,
+            "Open": open_,
+            "High": high,
+            "Low": low,
+            "Close": close,
+            "Volume": rng.poisson(2e6, len(dates))
+        })
+
+        return slice_period(hist, period)
@@ -1,5 +1,7 @@
 import numpy as np
 
+from src.models.black_scholes import option_flag, resolve_sigma
+
 
 # ----------------------------
 # Core CRR Binomial Model
@@ -19,14 +21,14 @@ def binomial_option_price(
     if steps <= 0:
         raise ValueError("steps must be positive")
 
+    sigma = float(resolve_sigma(sigma, K, T))
+
     dt = T / steps
 
     # CRR parameters
     u = np.exp(sigma * np.sqrt(dt))
     d = 1 / u
 
-    disc = np.exp(-r * dt)
-
     p = (
         np.exp((r - q) * dt) - d
     ) / (u - d)
@@ -34,88 +36,221 @@ def binomial_option_price(
     if not (0 <= p <= 1):
         raise ValueError("Invalid risk-neutral probability")
 
+    if option_type.lower() not in ("call", "put"):
+        raise ValueError("option_type must be call or put")
 
-    # ----------------------------
-    # Terminal stock prices
-    # ----------------------------
-    stock_prices = np.zeros(steps + 1)
+    price = binomial_option_price_batch(
+        S, K, T, r, sigma, q,
+        steps=steps,
+        option_type=option_type,
+        american=american
+    )
 
-    for i in range(steps + 1):
-        stock_prices[i] = (
-            S
-            * (u ** (steps - i))
-            * (d ** i)
-        )
+    return float(price[0])
 
 
-    # ----------------------------
-    # Terminal option values
-    # ----------------------------
-    option_values = np.zeros(steps + 1)
+# ----------------------------
+# Vectorized CRR lattice
+# ----------------------------
+def binomial_option_price_batch(
+    S,
+    K,
+    T,
+    r,
+    sigma,
+    q=0.0,
+    steps=100,
+    option_type="call",
+    american=True,
+    chunk_size=512
+):
+    """
+    CRR prices for many contracts at once. Arguments broadcast against
+    each other; backward induction runs over all contracts and nodes of
+    a time step in one pass. Contracts are processed `chunk_size` at a
+    time so memory stays at chunk_size * (steps + 1) floats.
+    Contracts with an invalid risk-neutral probability return NaN.
+    `sigma` may be a volatility surface (see resolve_sigma).
+    """
 
-    if option_type.lower() == "call":
+    if steps <= 0:
+        raise ValueError("steps must be positive")
 
-        option_values = np.maximum(
-            stock_prices - K,
-            0
-        )
+    sigma = resolve_sigma(sigma, K, T)
 
-    elif option_type.lower() == "put":
+    S, K, T, r, sigma, q, american = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=np.float64))
+          for x in (S, K, T, r, sigma, q, american))
+    )
+    phi = np.broadcast_to(option_flag(option_type), S.shape)
 
-        option_values = np.maximum(
-            K - stock_prices,
-            0
-        )
+    shape = S.shape
+    args = [x.ravel() for x in (S, K, T, r, sigma, q, phi, american)]
 
-    else:
-        raise ValueError("option_type must be call or put")
+    prices = np.empty(args[0].size)
 
+    for start in range(0, prices.size, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        prices[chunk] = _lattice(*(x[chunk] for x in args), steps)
 
-    # ----------------------------
-    # Backward induction
-    # ----------------------------
-    for step in range(steps - 1, -1, -1):
+    return prices.reshape(shape)
 
-        for i in range(step + 1):
 
-            continuation = (
-                p * option_values[i]
-                + (1 - p) * option_values[i + 1]
-            ) * disc
+def binomial_greeks_batch(
+    S,
+    K,
+    T,
+    r,
+    sigma,
+    q=0.0,
+    steps=100,
+    option_type="call",
+    american=True,
+    chunk_size=512,
+    vol_bump=0.01,
+    rate_bump=0.001
+):
+    """
+    CRR price and Greeks for many contracts, in the units of
+    black_scholes_greeks_batch. Delta, gamma and theta are read off the
+    first two steps of the same lattice that gives the price; vega and
+    rho are central differences from one more batch of bumped lattices.
+    Returns a dict of arrays.
+    """
+
+    if steps < 2:
+        raise ValueError("steps must be at least 2 for lattice Greeks")
+
+    sigma = resolve_sigma(sigma, K, T)
+
+    S, K, T, r, sigma, q, american = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=np.float64))
+          for x in (S, K, T, r, sigma, q, american))
+    )
+    phi = np.broadcast_to(option_flag(option_type), S.shape)
+
+    shape = S.shape
+    args = [x.ravel() for x in (S, K, T, r, sigma, q, phi, american)]
+
+    greeks = {
+        name: np.empty(args[0].size)
+        for name in ("price", "delta", "gamma", "theta")
+    }
+
+    for start in range(0, args[0].size, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        for name, values in _lattice(
+            *(x[chunk] for x in args), steps, greeks=True
+        ).items():
+            greeks[name][chunk] = values
+
+    # Vega and rho: four bumped lattices priced as one batch
+    S, K, T, r, sigma, q, phi, american = args
+
+    h = np.minimum(vol_bump, 0.5 * sigma)
+
+    bumped = binomial_option_price_batch(
+        np.tile(S, 4),
+        np.tile(K, 4),
+        np.tile(T, 4),
+        np.concatenate([r, r, r + rate_bump, r - rate_bump]),
+        np.concatenate([sigma + h, sigma - h, sigma, sigma]),
+        np.tile(q, 4),
+        steps=steps,
+        option_type=np.tile(phi, 4),
+        american=np.tile(american, 4),
+        chunk_size=chunk_size
+    ).reshape(4, -1)
+
+    greeks["vega"] = (bumped[0] - bumped[1]) / (2 * h)
+    greeks["rho"] = (bumped[2] - bumped[3]) / (2 * rate_bump)
+
+    return {name: values.reshape(shape) for name, values in greeks.items()}
+
+
+def _lattice(S, K, T, r, sigma, q, phi, american, steps, greeks=False):
+
+    dt = T / steps
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = np.exp(sigma * np.sqrt(dt))
+        d = 1 / u
+        disc = np.exp(-r * dt)
+        p = (np.exp((r - q) * dt) - d) / (u - d)
 
-            if american:
+    valid = (T > 0) & (sigma > 0) & (p >= 0) & (p <= 1)
 
-                stock_price = (
-                    S
-                    * (u ** (step - i))
-                    * (d ** i)
-                )
+    # Node i at step n holds S * u^(n - i) * d^i
+    log_u = np.log(u)[:, None]
+    nodes = np.arange(steps + 1)
 
-                if option_type.lower() == "call":
+    def stock_prices(n):
+        return S[:, None] * np.exp(log_u * (n - 2 * nodes[:n + 1]))
 
-                    exercise = max(
-                        stock_price - K,
-                        0
-                    )
+    phi = phi[:, None]
+    K = K[:, None]
+    p = p[:, None]
+    disc = disc[:, None]
+    american = american.astype(bool)[:, None]
 
-                else:
+    # Signed spot phi * S at each node, so exercise value is phi * S - phi * K
+    signed = phi * stock_prices(steps)
+    strike = phi * K
 
-                    exercise = max(
-                        K - stock_price,
-                        0
-                    )
+    values = np.maximum(signed - strike, 0.0)
 
-                option_values[i] = max(
-                    continuation,
-                    exercise
-                )
+    early = american.any()
+    all_american = american.all()
+    d = d[:, None]
 
+    levels = {}
+
+    for n in range(steps - 1, -1, -1):
+
+        down = values[:, 1:n + 2]
+        values = disc * (down + p * (values[:, :n + 1] - down))
+
+        if early:
+            # One step back, node i sits at node i of the next step times d.
+            # Continuation values are never negative, so exercise needs no floor
+            signed = signed[:, :n + 1] * d
+            exercise = signed - strike
+
+            if all_american:
+                np.maximum(values, exercise, out=values)
             else:
+                values = np.where(american, np.maximum(values, exercise), values)
+
+        if greeks and n <= 2:
+            levels[n] = values
+
+    price = np.where(valid, values[:, 0], np.nan)
+
+    if not greeks:
+        return price
+
+    # Finite differences across the nodes of steps 1 and 2
+    v1, v2 = levels[1], levels[2]
+    s1, s2 = stock_prices(1), stock_prices(2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+
+        delta = (v1[:, 0] - v1[:, 1]) / (s1[:, 0] - s1[:, 1])
 
-                option_values[i] = continuation
+        gamma = (
+            (v2[:, 0] - v2[:, 1]) / (s2[:, 0] - s2[:, 1])
+            - (v2[:, 1] - v2[:, 2]) / (s2[:, 1] - s2[:, 2])
+        ) / (0.5 * (s2[:, 0] - s2[:, 2]))
 
+        # The middle node of step 2 is back at the spot
+        theta = (v2[:, 1] - values[:, 0]) / (2 * dt)
 
-    return float(option_values[0])
+    return {
+        "price": price,
+        "delta": np.where(valid, delta, np.nan),
+        "gamma": np.where(valid, gamma, np.nan),
+        "theta": np.where(valid, theta, np.nan)
+    }
 
 
 # ----------------------------
@@ -1,11 +1,57 @@
+import math
+
 import numpy as np
-from scipy.stats import norm
+
+# -----------------------------------
+# Standard normal helpers
+# -----------------------------------
+# scipy is only loaded on the first CDF call so that the
+# pricing core can be imported with NumPy alone.
+_ndtr = None
+
+
+def norm_cdf(x):
+
+    global _ndtr
+
+    if _ndtr is None:
+        try:
+            from scipy.special import ndtr as _ndtr
+        except ImportError:
+            _ndtr = np.vectorize(
+                lambda v: 0.5 * math.erfc(-v / math.sqrt(2.0))
+            )
+
+    return _ndtr(x)
+
+
+def norm_pdf(x):
+
+    return np.exp(-0.5 * np.square(x)) / math.sqrt(2.0 * math.pi)
+
+# -----------------------------------
+# Volatility source
+# -----------------------------------
+def resolve_sigma(sigma, K, T):
+    """
+    `sigma` may be a number, an array, or a volatility surface (any
+    object with an implied_vol(K, T) method, e.g. SplineVolSurface),
+    in which case the vol for each contract is looked up in one call.
+    """
+
+    if hasattr(sigma, "implied_vol"):
+        return sigma.implied_vol(K, T)
+
+    return sigma
+
 
 # -----------------------------------
 # Internal d1 and d2 calculations
 # -----------------------------------
 def _compute_d1_d2(S, K, T, r, sigma, q):
 
+    sigma = float(resolve_sigma(sigma, K, T))
+
     if T <= 0 or sigma <= 0:
         raise ValueError("T and sigma must be +ive")
     
@@ -36,15 +82,15 @@ def black_scholes_price(
     if option_type.lower() == "call":
 
         price = (
-            S * np.exp(-q * T) * norm.cdf(d1)
-            - K * np.exp(-r * T) * norm.cdf(d2)
+            S * np.exp(-q * T) * norm_cdf(d1)
+            - K * np.exp(-r * T) * norm_cdf(d2)
         )
 
     elif option_type.lower() == "put":
 
         price = (
-            S * np.exp(-r * T) * norm.cdf(-d2)
-            - K * np.exp(-q * T) * norm.cdf(-d1)
+            K * np.exp(-r * T) * norm_cdf(-d2)
+            - S * np.exp(-q * T) * norm_cdf(-d1)
         )
 
     else:
@@ -65,15 +111,17 @@ def black_scholes_greeks(
     option_type = "call"
 ):
     
+    sigma = float(resolve_sigma(sigma, K, T))
+
     d1, d2 = _compute_d1_d2(S, K, T, r, sigma, q)
 
-    pdf_d1 = norm.pdf(d1)
+    pdf_d1 = norm_pdf(d1)
 
     # Delta
     if option_type.lower() == "call":
-        delta = np.exp(-q * T) * norm.cdf(d1)
+        delta = np.exp(-q * T) * norm_cdf(d1)
     else:
-        delta = np.exp(-q * T) * (norm.cdf(d1) - 1)
+        delta = np.exp(-q * T) * (norm_cdf(d1) - 1)
 
     # Gamma
     gamma = (
@@ -103,16 +151,16 @@ def black_scholes_greeks(
 
         theta = (
             term1
-            - r * K * np.exp(-r * T) * norm.cdf(d2)
-            + q * S * np.exp(-q * T) * norm.cdf(d1)
+            - r * K * np.exp(-r * T) * norm_cdf(d2)
+            + q * S * np.exp(-q * T) * norm_cdf(d1)
         )
 
     else:
 
         theta = (
             term1
-            + r * K * np.exp(-r * T) * norm.cdf(-d2)
-            - q * S * np.exp(-q * T) * norm.cdf(-d1)
+            + r * K * np.exp(-r * T) * norm_cdf(-d2)
+            - q * S * np.exp(-q * T) * norm_cdf(-d1)
         )
 
     # Rho
@@ -122,7 +170,7 @@ def black_scholes_greeks(
             K
             * T
             * np.exp(-r * T)
-            * norm.cdf(d2)
+            * norm_cdf(d2)
         )
     
     else:
@@ -131,7 +179,7 @@ def black_scholes_greeks(
             -K
             * T
             * np.exp(-r * T)
-            * norm.cdf(-d2)
+            * norm_cdf(-d2)
         )
 
     return {
@@ -162,4 +210,140 @@ def price_and_greeks(
     return {
         "price": price,
         **greeks
-    }
\ No newline at end of file
+    }
+
+
+# -----------------------------------
+# Vectorized kernels
+# -----------------------------------
+# Batch versions of the functions above. Every argument may be a scalar
+# or an array; inputs broadcast against each other and invalid contracts
+# (T <= 0 or sigma <= 0) come back as NaN instead of raising.
+CALL = 1
+PUT = -1
+
+
+def option_flag(option_type):
+    """
+    Map "call"/"put" labels (scalar or array) or +1/-1 flags
+    to an int8 array of CALL / PUT.
+    """
+
+    arr = np.asarray(option_type)
+
+    if arr.dtype.kind in "iuf":
+        return np.where(arr > 0, CALL, PUT).astype(np.int8)
+
+    if arr.dtype.kind == "b":
+        return np.where(arr, CALL, PUT).astype(np.int8)
+
+    is_call = arr == "call"
+    is_put = arr == "put"
+
+    if not (is_call | is_put).all():
+        labels = np.char.lower(arr.astype(str))
+        is_call = labels == "call"
+
+        if not (is_call | (labels == "put")).all():
+            raise ValueError("option type must be call or put")
+
+    return np.where(is_call, CALL, PUT).astype(np.int8)
+
+
+def _batch_inputs(S, K, T, r, sigma, q):
+
+    sigma = resolve_sigma(sigma, K, T)
+
+    S, K, T, r, sigma, q = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (S, K, T, r, sigma, q))
+    )
+
+    valid = (T > 0) & (sigma > 0)
+
+    T = np.where(valid, T, np.nan)
+    sigma = np.where(valid, sigma, np.nan)
+
+    sqrt_T = np.sqrt(T)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (
+            np.log(S / K)
+            + (r - q + 0.5 * sigma ** 2) * T
+        ) / (sigma * sqrt_T)
+
+    d2 = d1 - sigma * sqrt_T
+
+    return S, K, T, r, sigma, q, sqrt_T, d1, d2
+
+
+def black_scholes_price_batch(
+    S,
+    K,
+    T,
+    r,
+    sigma,
+    q=0.0,
+    option_type="call"
+):
+
+    S, K, T, r, sigma, q, sqrt_T, d1, d2 = _batch_inputs(
+        S, K, T, r, sigma, q
+    )
+
+    phi = option_flag(option_type)
+
+    return phi * (
+        S * np.exp(-q * T) * norm_cdf(phi * d1)
+        - K * np.exp(-r * T) * norm_cdf(phi * d2)
+    )
+
+
+def black_scholes_greeks_batch(
+    S,
+    K,
+    T,
+    r,
+    sigma,
+    q=0.0,
+    option_type="call"
+):
+
+    S, K, T, r, sigma, q, sqrt_T, d1, d2 = _batch_inputs(
+        S, K, T, r, sigma, q
+    )
+
+    phi = option_flag(option_type)
+
+    disc_q = np.exp(-q * T)
+    disc_r = np.exp(-r * T)
+
+    pdf_d1 = norm_pdf(d1)
+    cdf_d1 = norm_cdf(phi * d1)
+    cdf_d2 = norm_cdf(phi * d2)
+
+    return {
+        "delta": phi * disc_q * cdf_d1,
+        "gamma": disc_q * pdf_d1 / (S * sigma * sqrt_T),
+        "vega": S * disc_q * pdf_d1 * sqrt_T,
+        "theta": (
+            -S * pdf_d1 * sigma * disc_q / (2 * sqrt_T)
+            - phi * r * K * disc_r * cdf_d2
+            + phi * q * S * disc_q * cdf_d1
+        ),
+        "rho": phi * K * T * disc_r * cdf_d2
+    }
+
+
+def price_and_greeks_batch(
+    S, K, T, r, sigma, q=0.0,
+    option_type="call"
+):
+
+    return {
+        "price": black_scholes_price_batch(
+            S, K, T, r, sigma, q, option_type
+        ),
+        **black_scholes_greeks_batch(
+            S, K, T, r, sigma, q, option_type
+        )
+    }
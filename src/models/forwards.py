@@ -0,0 +1,209 @@
+import numpy as np
+
+from src.models.black_scholes import CALL, PUT
+
+
+# -----------------------------------
+# Implied forwards from put–call parity
+# -----------------------------------
+# For each expiry, C - P = D * F - D * K with D the discount factor and
+# F the forward. A weighted regression of C - P on K over matched strikes
+# gives D (minus the slope) and F (intercept / D), hence an implied rate
+# r = -log(D) / T and an implied carry q = r - log(F / S) / T. Everything
+# is computed for all expiries at once with grouped sums.
+
+# Minimum number of matched strikes for an expiry
+MIN_PARITY_PAIRS = 3
+
+# Implied rates outside this range, or with a larger standard error,
+# are treated as a failed fit
+RATE_BOUNDS = (-0.05, 0.25)
+MAX_RATE_ERROR = 0.01
+
+
+def _parity_pairs(chain, moneyness):
+    """Row indices of (put, call) quotes sharing a group and strike."""
+
+    ids, keys = chain.expiry_groups()
+
+    usable = (
+        np.isfinite(chain.mid) & (chain.mid > 0)
+        & (chain.moneyness > moneyness[0])
+        & (chain.moneyness < moneyness[1])
+    )
+    rows = np.flatnonzero(usable)
+
+    # Puts sort just before calls of the same group and strike
+    order = rows[np.lexsort((chain.flag[rows], chain.strike[rows], ids[rows]))]
+
+    put, call = order[:-1], order[1:]
+
+    matched = (
+        (ids[put] == ids[call])
+        & (chain.strike[put] == chain.strike[call])
+        & (chain.flag[put] == PUT)
+        & (chain.flag[call] == CALL)
+    )
+
+    return ids, keys, put[matched], call[matched]
+
+
+def implied_forwards(
+    chain,
+    r=None,
+    moneyness=(0.8, 1.2),
+    min_pairs=MIN_PARITY_PAIRS,
+    rate_bounds=RATE_BOUNDS,
+    max_rate_error=MAX_RATE_ERROR
+) -> dict:
+    """
+    Implied forward, discount factor, rate and carry for every expiry
+    (and ticker) of an OptionChain holding both calls and puts.
+
+    Pairs are weighted by their inverse squared bid/ask width, so stale
+    or wide quotes count for less. The rate is implied with the forward
+    when an expiry has `min_pairs` matched strikes, the fitted rate
+    lies inside `rate_bounds` and its standard error is below
+    `max_rate_error`. Otherwise, if `r` is given, the discount
+    factor is fixed at exp(-r T) and only the forward is estimated.
+    Expiries that still cannot be fitted come back as NaN.
+
+    Returns a dict of per-expiry arrays: T, spot, forward, discount,
+    rate, carry, pairs and fitted (True where the rate was implied),
+    plus ticker and expiry labels when the chain carries them.
+    """
+
+    ids, keys, put, call = _parity_pairs(chain, moneyness)
+
+    n = len(keys)
+    group = ids[call]
+
+    T = np.array([key[1] for key in keys], dtype=np.float64)
+
+    spot = np.full(n, np.nan)
+    spot[ids] = chain.spot
+
+    K = chain.strike[call]
+    y = chain.mid[call] - chain.mid[put]
+
+    # Width of the synthetic forward quote; last-price-only rows get a
+    # nominal 10% width
+    width = (chain.ask - chain.bid)[call] + (chain.ask - chain.bid)[put]
+    quoted = (chain.bid[call] > 0) & (chain.bid[put] > 0) & (width > 0)
+    width = np.where(
+        quoted, width, 0.1 * (chain.mid[call] + chain.mid[put])
+    )
+    w = 1.0 / np.maximum(width, 1e-4) ** 2
+
+    def total(values):
+        return np.bincount(group, weights=values, minlength=n)
+
+    pairs = np.bincount(group, minlength=n)
+
+    sw, sx, sy = total(w), total(w * K), total(w * y)
+    sxx, sxy, syy = total(w * K * K), total(w * K * y), total(w * y * y)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+
+        # Weighted least squares of y on K, all expiries at once
+        denom = sw * sxx - sx ** 2
+        slope = (sw * sxy - sx * sy) / denom
+        intercept = (sy - slope * sx) / sw
+
+        discount = -slope
+        forward = intercept / discount
+        rate = -np.log(discount) / T
+
+        # Standard error of the slope, carried over to the rate
+        rss = np.maximum(syy - intercept * sy - slope * sxy, 0.0)
+        slope_error = np.sqrt(rss / (pairs - 2) * sw / denom)
+        rate_error = slope_error / (discount * T)
+
+        fitted = (
+            (pairs >= min_pairs)
+            & (rate_error < max_rate_error)
+            & (denom > 0)
+            & (discount > 0)
+            & (rate > rate_bounds[0])
+            & (rate < rate_bounds[1])
+            & (forward > 0)
+        )
+
+        if r is None:
+            fixed = np.zeros(n, dtype=bool)
+        else:
+            # Known discount factor: F = K + (C - P) / D, averaged
+            fixed = ~fitted & (pairs > 0)
+
+            fixed_discount = np.exp(-np.asarray(r, dtype=np.float64) * T)
+            fixed_forward = sx / sw + sy / (sw * fixed_discount)
+
+            discount = np.where(fixed, fixed_discount, discount)
+            forward = np.where(fixed, fixed_forward, forward)
+            rate = np.where(fixed, np.broadcast_to(r, n), rate)
+
+        valid = fitted | (fixed & (forward > 0))
+
+        discount = np.where(valid, discount, np.nan)
+        forward = np.where(valid, forward, np.nan)
+        rate = np.where(valid, rate, np.nan)
+        carry = rate - np.log(forward / spot) / T
+
+    result = {
+        "T": T,
+        "spot": spot,
+        "forward": forward,
+        "discount": discount,
+        "rate": rate,
+        "carry": carry,
+        "pairs": pairs,
+        "fitted": fitted
+    }
+
+    if chain.ticker is not None:
+        result["ticker"] = np.array([key[0] for key in keys], dtype=object)
+
+    if chain.expiry is not None:
+        expiry = np.empty(n, dtype=object)
+        expiry[ids] = chain.expiry
+        result["expiry"] = expiry
+
+    return result
+
+
+def forward_carry(chain, forwards, r, q=0.0):
+    """
+    Per-row (rate, carry) arrays for `chain` from an implied_forwards
+    result, matched on ticker and T. Rows whose expiry has no implied
+    forward keep `r` and `q`. `q` may be a callable returning the
+    carry, called only when some row needs it.
+    """
+
+    tickers = forwards.get("ticker")
+
+    lookup = {
+        (None if tickers is None or chain.ticker is None else tickers[i], T): i
+        for i, T in enumerate(forwards["T"])
+        if np.isfinite(forwards["forward"][i])
+    }
+
+    ids, keys = chain.expiry_groups()
+
+    source = np.array([
+        lookup.get((None if tickers is None else ticker, T), -1)
+        for ticker, T in keys
+    ], dtype=np.intp)[ids]
+
+    rows = source >= 0
+
+    # e.g. a quoted dividend yield, fetched only when parity fails
+    if callable(q):
+        q = 0.0 if rows.all() else q()
+
+    rate = np.array(np.broadcast_to(r, len(chain)), dtype=np.float64)
+    carry = np.array(np.broadcast_to(q, len(chain)), dtype=np.float64)
+
+    rate[rows] = forwards["rate"][source[rows]]
+    carry[rows] = forwards["carry"][source[rows]]
+
+    return rate, carry
@@ -0,0 +1,424 @@
+import time
+
+import numpy as np
+
+from src.data.option_chain import OptionChain
+from src.models.black_scholes import CALL, black_scholes_greeks_batch, option_flag
+from src.models.forwards import forward_carry, implied_forwards
+from src.models.implied_vol import option_chain_implied_vol
+
+
+# -----------------------------------
+# Heston stochastic volatility
+# -----------------------------------
+#   dS / S = (r - q) dt + sqrt(v) dW1
+#   dv     = kappa (theta - v) dt + xi sqrt(v) dW2,    d<W1, W2> = rho dt
+#
+# Parameters are always ordered as HESTON_PARAMETERS; functions accept
+# them as a sequence or as a dict keyed by name.
+HESTON_PARAMETERS = ("v0", "kappa", "theta", "xi", "rho")
+
+# Calibration bounds, in HESTON_PARAMETERS order
+HESTON_BOUNDS = (
+    [1e-4, 1e-2, 1e-4, 1e-2, -0.999],
+    [4.0, 20.0, 4.0, 5.0, 0.999]
+)
+
+# Cosine expansion terms and truncation width (in standard deviations)
+COS_TERMS = 192
+COS_WIDTH = 16.0
+
+
+def _unpack(params):
+
+    if isinstance(params, dict):
+        params = [params[name] for name in HESTON_PARAMETERS]
+
+    return tuple(float(p) for p in params)
+
+
+def heston_charfn(u, T, params, gradient=False):
+    """
+    Characteristic function E[exp(iu log(S_T / F_T))] in the "little
+    trap" form of Albrecher et al., which stays on the principal branch
+    of the logarithm for any maturity. With `gradient`, also returns its
+    derivatives with respect to each parameter, shape (5,) + u.shape.
+    """
+
+    v0, kappa, theta, xi, rho = _unpack(params)
+
+    u = np.asarray(u, dtype=np.float64)
+    iu = 1j * u
+
+    A = iu + u * u
+    beta = kappa - rho * xi * iu
+    d = np.sqrt(beta * beta + xi * xi * A)
+
+    m = beta - d
+    n = beta + d
+    g = m / n
+
+    E = np.exp(-d * T)
+    one_gE = 1 - g * E
+
+    L = np.log(one_gE / (1 - g))
+    R = (1 - E) / one_gE
+
+    xi2 = xi * xi
+
+    C = kappa * theta / xi2 * (m * T - 2 * L)
+    D = m / xi2 * R
+
+    phi = np.exp(C + v0 * D)
+
+    if not gradient:
+        return phi
+
+    # Chain rule through beta and d for the parameters they depend on
+    derivatives = {"v0": D, "theta": C / theta}
+
+    for name, beta_p, d_p in (
+        ("kappa", 1.0, beta / d),
+        ("xi", -rho * iu, (xi * A - rho * iu * beta) / d),
+        ("rho", -xi * iu, -xi * iu * beta / d)
+    ):
+        m_p = beta_p - d_p
+        n_p = beta_p + d_p
+        g_p = (m_p * n - m * n_p) / (n * n)
+        E_p = -T * d_p * E
+
+        gE_p = g_p * E + g * E_p
+
+        L_p = g_p / (1 - g) - gE_p / one_gE
+        R_p = (-E_p * one_gE + (1 - E) * gE_p) / (one_gE * one_gE)
+
+        C_p = kappa * theta / xi2 * (m_p * T - 2 * L_p)
+        D_p = (m_p * R + m * R_p) / xi2
+
+        if name == "kappa":
+            C_p = C_p + C / kappa
+        elif name == "xi":
+            C_p = C_p - 2 * C / xi
+            D_p = D_p - 2 * D / xi
+
+        derivatives[name] = C_p + v0 * D_p
+
+    return phi, phi * np.stack([derivatives[p] for p in HESTON_PARAMETERS])
+
+
+def heston_cumulants(T, params, h=1e-3):
+    """
+    First two cumulants of log(S_T / F_T), used to size the truncation
+    range of the cosine expansion. Taken from central differences of
+    log phi at u = 0, which holds for any parameters without the long
+    closed forms.
+    """
+
+    log_phi = np.log(heston_charfn(np.array([h, -h]), T, params))
+
+    c1 = (log_phi[0] - log_phi[1]).imag / (2 * h)
+    c2 = -(log_phi[0] + log_phi[1]).real / h ** 2
+
+    return c1, abs(c2)
+
+
+# -----------------------------------
+# COS pricing of a whole strike grid
+# -----------------------------------
+# Fang & Oosterlee's cosine expansion: with y = log(S_T / K) truncated
+# to [a, b], a European put is
+#
+#   P = K D Re sum'_k phi(u_k) exp(i u_k (log(F / K) - a)) U_k,
+#
+# u_k = k pi / (b - a). The payoff coefficients U_k do not depend on
+# the strike, so one characteristic function evaluation serves every
+# strike of an expiry and pricing reduces to one complex matrix-vector
+# product. Calls follow from put–call parity, which is more accurate
+# than expanding the unbounded call payoff.
+def _put_coefficients(u, a, b):
+
+    # Put payoff K (1 - e^y) on [a, min(b, 0)]
+    top = min(max(0.0, a), b)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+
+        chi = (
+            np.cos(u * (top - a)) * np.exp(top)
+            - np.exp(a)
+            + u * np.sin(u * (top - a)) * np.exp(top)
+        ) / (1 + u * u)
+
+        psi = np.where(u == 0, top - a, np.sin(u * (top - a)) / u)
+
+    return 2 / (b - a) * (psi - chi)
+
+
+def heston_cos_slice(
+    F,
+    K,
+    T,
+    discount,
+    params,
+    option_type="call",
+    n_terms=COS_TERMS,
+    width=COS_WIDTH,
+    gradient=False
+):
+    """
+    Heston prices of every strike of one expiry from a single transform.
+    `F` and `discount` are the expiry's forward and discount factor.
+    With `gradient`, also returns d price / d params, shape (n, 5).
+    """
+
+    K = np.atleast_1d(np.asarray(K, dtype=np.float64))
+    phi_flag = np.broadcast_to(option_flag(option_type), K.shape)
+
+    x = np.log(F / K)
+
+    c1, c2 = heston_cumulants(T, params)
+    half = width * np.sqrt(c2)
+
+    a = c1 + x.min() - half
+    b = c1 + x.max() + half
+
+    u = np.arange(n_terms) * np.pi / (b - a)
+
+    U = _put_coefficients(u, a, b)
+    U[0] *= 0.5
+
+    phase = np.exp(1j * np.outer(x - a, u))
+    scale = K * discount
+
+    if gradient:
+        phi, dphi = heston_charfn(u, T, params, gradient=True)
+    else:
+        phi = heston_charfn(u, T, params)
+
+    put = scale * (phase @ (phi * U)).real
+
+    price = np.where(phi_flag == CALL, put + discount * (F - K), put)
+
+    if not gradient:
+        return price
+
+    jac = scale[:, None] * (phase @ (dphi * U).T).real
+
+    return price, jac
+
+
+def heston_option_price(
+    S,
+    K,
+    T,
+    r,
+    params,
+    q=0.0,
+    option_type="call",
+    n_terms=COS_TERMS
+):
+    """
+    European prices under Heston for any batch of contracts. Contracts
+    sharing (S, T, r, q) are priced by one transform (see
+    heston_cos_slice). Returns a float for scalar inputs.
+    """
+
+    scalar = all(np.ndim(x) == 0 for x in (S, K, T, r, q, option_type))
+
+    S, K, T, r, q = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=np.float64)) for x in (S, K, T, r, q))
+    )
+    flag = np.broadcast_to(option_flag(option_type), K.shape)
+
+    price = np.full(K.shape, np.nan)
+
+    slices, slot = np.unique(
+        np.stack([S.ravel(), T.ravel(), r.ravel(), q.ravel()], axis=1),
+        axis=0,
+        return_inverse=True
+    )
+    slot = slot.reshape(K.shape)
+
+    for i, (spot, t, rate, carry) in enumerate(slices):
+
+        rows = slot == i
+
+        if t <= 0:
+            price[rows] = np.maximum(flag[rows] * (spot - K[rows]), 0.0)
+            continue
+
+        price[rows] = heston_cos_slice(
+            spot * np.exp((rate - carry) * t),
+            K[rows],
+            t,
+            np.exp(-rate * t),
+            params,
+            flag[rows],
+            n_terms=n_terms
+        )
+
+    return float(price[0]) if scalar else price
+
+
+# -----------------------------------
+# Calibration
+# -----------------------------------
+# Least squares on vega-scaled price errors, (model - mid) / vega, which
+# approximates implied-vol errors without inverting model prices. Each
+# residual evaluation is one transform per expiry for all its strikes,
+# and the Jacobian comes from the analytic gradient of the
+# characteristic function on the same terms, so an iteration costs
+# about two pricings of the chain. The Feller condition is not imposed.
+MIN_VEGA = 1e-3
+
+
+def _initial_guess(T, k, iv):
+
+    order = np.lexsort((k, T))
+    T, k, iv = T[order], k[order], iv[order]
+
+    expiries, start = np.unique(T, return_index=True)
+    atm = np.array([
+        np.interp(0.0, k[i:j], iv[i:j])
+        for i, j in zip(start, np.r_[start[1:], T.size])
+    ])
+
+    return np.array([atm[0] ** 2, 2.0, atm[-1] ** 2, 0.5, -0.5])
+
+
+def calibrate_heston(
+    options_df,
+    S=None,
+    T=None,
+    r=0.0,
+    q=0.0,
+    forwards=None,
+    parity=True,
+    initial=None,
+    moneyness=(0.8, 1.2),
+    min_volume=None,
+    n_terms=128,
+    max_nfev=100
+) -> dict:
+    """
+    Fit Heston to the mid prices of a get_option_chain-style DataFrame,
+    or a get_full_chain frame spanning several expiries. Only OTM quotes
+    are used (puts below the forward, calls above), each expiry at its
+    parity-implied rate and carry when `parity` is set.
+
+    Returns a dict with the parameters (HESTON_PARAMETERS), "params" (an
+    array in that order), "iv_rmse" (vega-scaled RMSE, in vol units),
+    "quotes", "nfev", "success" and "seconds".
+    """
+
+    from scipy.optimize import least_squares
+
+    start = time.perf_counter()
+
+    chain = OptionChain.from_frame(options_df, spot=S, T=T).filter(
+        min_volume=min_volume, moneyness=moneyness
+    )
+
+    if forwards is None and parity:
+        forwards = implied_forwards(chain, r=r)
+
+    if forwards is not None:
+        rate, carry = forward_carry(chain, forwards, r, q)
+    else:
+        rate = np.array(np.broadcast_to(r, len(chain)), dtype=np.float64)
+        carry = np.array(np.broadcast_to(q, len(chain)), dtype=np.float64)
+
+    k = chain.forward_moneyness(rate, carry)
+    otm = np.where(chain.is_call, k >= 0, k < 0)
+
+    iv = option_chain_implied_vol(chain, rate, carry)
+
+    keep = np.flatnonzero(otm & np.isfinite(iv) & (chain.T > 0))
+
+    if keep.size < len(HESTON_PARAMETERS):
+        raise ValueError("Not enough quotes to calibrate Heston")
+
+    chain = chain.select(keep)
+    rate, carry, k, iv = rate[keep], carry[keep], k[keep], iv[keep]
+
+    vega = black_scholes_greeks_batch(
+        chain.spot, chain.strike, chain.T, rate, iv, carry, chain.flag
+    )["vega"]
+    weight = 1.0 / np.maximum(vega, MIN_VEGA)
+
+    # One slice per expiry: forward, discount and its rows
+    ids, _ = chain.expiry_groups()
+    order = np.argsort(ids, kind="stable")
+    bounds = np.flatnonzero(np.r_[True, np.diff(ids[order]) != 0, True])
+
+    slices = []
+
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        rows = order[lo:hi]
+        i = rows[0]
+        t = chain.T[i]
+        slices.append((
+            rows,
+            chain.spot[i] * np.exp((rate[i] - carry[i]) * t),
+            t,
+            np.exp(-rate[i] * t)
+        ))
+
+    mid = chain.mid
+    residual = np.empty(len(chain))
+    jacobian = np.empty((len(chain), len(HESTON_PARAMETERS)))
+
+    def evaluate(x):
+
+        for rows, F, t, discount in slices:
+            price, jac = heston_cos_slice(
+                F, chain.strike[rows], t, discount, x, chain.flag[rows],
+                n_terms=n_terms,
+                gradient=True
+            )
+            residual[rows] = (price - mid[rows]) * weight[rows]
+            jacobian[rows] = jac * weight[rows, None]
+
+    # least_squares asks for the residuals, then the Jacobian, at the
+    # same point; both come from one transform per expiry
+    cache = {}
+
+    def fill(x):
+        if cache.get("x") is None or not np.array_equal(cache["x"], x):
+            evaluate(x)
+            cache["x"] = x.copy()
+
+    def residuals(x):
+        fill(x)
+        return residual.copy()
+
+    def jac(x):
+        fill(x)
+        return jacobian.copy()
+
+    lower, upper = HESTON_BOUNDS
+
+    x0 = _initial_guess(chain.T, k, iv) if initial is None else np.asarray(
+        _unpack(initial)
+    )
+    x0 = np.clip(x0, np.add(lower, 1e-9), np.subtract(upper, 1e-9))
+
+    result = least_squares(
+        residuals, x0,
+        jac=jac,
+        bounds=(lower, upper),
+        method="trf",
+        x_scale="jac",
+        max_nfev=max_nfev
+    )
+
+    fitted = dict(zip(HESTON_PARAMETERS, map(float, result.x)))
+
+    return {
+        **fitted,
+        "params": result.x,
+        "iv_rmse": float(np.sqrt(np.mean(result.fun ** 2))),
+        "quotes": len(chain),
+        "nfev": int(result.nfev),
+        "success": bool(result.success),
+        "seconds": time.perf_counter() - start
+    }
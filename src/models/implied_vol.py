@@ -1,9 +1,14 @@
 import numpy as np
 
+from src.data.option_chain import OptionChain
 from src.models.black_scholes import (
     black_scholes_price,
-    black_scholes_greeks
+    black_scholes_greeks,
+    black_scholes_price_batch,
+    norm_pdf,
+    option_flag
 )
+from src.models.forwards import forward_carry
 
 
 # ----------------------------
@@ -60,59 +65,136 @@ def implied_volatility(
     )
 
 
+# ----------------------------
+# Vectorized solver
+# ----------------------------
+def implied_volatility_batch(
+    market_price,
+    S,
+    K,
+    T,
+    r,
+    q=0.0,
+    option_type="call",
+    initial_guess=0.2,
+    tolerance=1e-6,
+    max_iterations=100,
+    sigma_bounds=(0.0001, 5.0)
+):
+    """
+    Newton-Raphson on whole arrays, safeguarded by a bisection bracket
+    inside `sigma_bounds`. Contracts that do not converge (or whose
+    price is outside the no-arbitrage bounds) come back as NaN.
+    """
+
+    price, S, K, T, r, q, sigma = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64)
+          for x in (market_price, S, K, T, r, q, initial_guess))
+    )
+    phi = np.broadcast_to(option_flag(option_type), price.shape)
+
+    shape = price.shape
+    price, S, K, T, r, q, phi = (
+        x.ravel() for x in (price, S, K, T, r, q, phi)
+    )
+
+    lo = np.full(price.size, sigma_bounds[0])
+    hi = np.full(price.size, sigma_bounds[1])
+    sigma = np.clip(sigma.ravel(), lo, hi)
+
+    iv = np.full(price.size, np.nan)
+
+    # Solvable only strictly between the discounted bounds
+    with np.errstate(invalid="ignore"):
+        lower = np.maximum(phi * (S * np.exp(-q * T) - K * np.exp(-r * T)), 0)
+        upper = np.where(phi > 0, S * np.exp(-q * T), K * np.exp(-r * T))
+        active = np.flatnonzero(
+            (T > 0) & (price >= lower) & (price < upper)
+        )
+
+    for _ in range(max_iterations):
+
+        if active.size == 0:
+            break
+
+        s = sigma[active]
+        sqrt_T = np.sqrt(T[active])
+
+        model = black_scholes_price_batch(
+            S[active], K[active], T[active], r[active], s, q[active],
+            phi[active]
+        )
+
+        diff = model - price[active]
+
+        done = np.abs(diff) < tolerance
+        iv[active[done]] = s[done]
+
+        # Price is increasing in sigma: shrink the bracket
+        hi[active] = np.where(diff > 0, s, hi[active])
+        lo[active] = np.where(diff < 0, s, lo[active])
+
+        d1 = (
+            np.log(S[active] / K[active])
+            + (r[active] - q[active] + 0.5 * s ** 2) * T[active]
+        ) / (s * sqrt_T)
+
+        vega = S[active] * np.exp(-q[active] * T[active]) * norm_pdf(d1) * sqrt_T
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            step = s - diff / vega
+
+        # Fall back to bisection when Newton leaves the bracket
+        outside = ~((step > lo[active]) & (step < hi[active])) | (vega < 1e-8)
+        step = np.where(outside, 0.5 * (lo[active] + hi[active]), step)
+
+        sigma[active] = step
+        active = active[~done]
+
+    return iv.reshape(shape)
+
+
 # ----------------------------
 # Batch solver for options chain
 # ----------------------------
+def option_chain_implied_vol(chain, r, q=0.0, forwards=None, **kwargs):
+    """
+    Implied vols for an OptionChain from its mid prices.
+    Quotes below intrinsic value return NaN. With `forwards` (see
+    implied_forwards) each expiry is inverted at its parity-implied
+    rate and carry, falling back to `r` and `q` where none was found.
+    """
+
+    if forwards is not None:
+        r, q = forward_carry(chain, forwards, r, q)
+
+    iv = implied_volatility_batch(
+        chain.mid, chain.spot, chain.strike, chain.T, r, q,
+        chain.flag, **kwargs
+    )
+
+    iv[chain.mid < chain.intrinsic] = np.nan
+
+    return iv
+
+
 def implied_volatility_chain(
     options_df,
     S,
     T,
     r,
     q=0.0,
-    option_type="call"
+    option_type="call",
+    forwards=None
 ):
 
-    iv_list = []
-
-    for _, row in options_df.iterrows():
-
-        strike = row["strike"]
-
-        # Use mid-price instead of last trade
-        if row["bid"] > 0 and row["ask"] > 0:
-            market_price = (row["bid"] + row["ask"]) / 2
-        else:
-            market_price = row["lastPrice"]
-
-        # ----------------------------
-        # No-arbitrage intrinsic check
-        # ----------------------------
-        if option_type.lower() == "call":
-            intrinsic = max(S - strike, 0)
-        else:
-            intrinsic = max(strike - S, 0)
-
-        # If price violates arbitrage bound → no IV
-        if market_price < intrinsic:
-            iv_list.append(np.nan)
-            continue
-
-        try:
-            iv = implied_volatility(
-                market_price,
-                S,
-                strike,
-                T,
-                r,
-                q,
-                option_type
-            )
-        except:
-            iv = np.nan
-
-        iv_list.append(iv)
+    chain = OptionChain.from_frame(
+        options_df, spot=S, T=T, option_type=option_type
+    )
 
     options_df = options_df.copy()
-    options_df["impliedVol"] = iv_list
+    options_df["impliedVol"] = option_chain_implied_vol(
+        chain, r, q, forwards=forwards
+    )
 
-    return options_df
\ No newline at end of file
+    return options_df
@@ -0,0 +1,226 @@
+import hashlib
+import threading
+
+import numpy as np
+
+from src.data.option_chain import OptionChain
+from src.models.forwards import implied_forwards
+from src.models.implied_vol import option_chain_implied_vol
+from src.models.vol_surface import (
+    MIN_SLICE_POINTS,
+    VolatilitySurface,
+    fit_svi_slice,
+    svi_total_variance
+)
+
+
+def chain_hash(chain: OptionChain, *inputs) -> str:
+    """Content hash of a chain's quotes plus any scalar pricing inputs."""
+
+    digest = hashlib.blake2b(digest_size=16)
+
+    for arr in (chain.strike, chain.bid, chain.ask, chain.last, chain.flag):
+        digest.update(np.ascontiguousarray(arr).tobytes())
+
+    digest.update(np.asarray(inputs, dtype=np.float64).tobytes())
+
+    return digest.hexdigest()
+
+
+# -----------------------------------
+# Stateful surface with cached slices
+# -----------------------------------
+class IncrementalVolSurface:
+    """
+    Volatility surface kept as one calibrated SVI slice per expiry.
+
+    Each slice is keyed by a content hash of its expiry's chain and the
+    inputs used to invert it (spot, rate, carry, T). refresh()
+    re-inverts and refits only the slices whose key changed, warm
+    starting from their previous parameters, so the cost of an update is
+    proportional to what changed. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        option_type="call",
+        min_volume=0,
+        moneyness=(0.8, 1.2)
+    ):
+
+        self.option_type = option_type
+        self.min_volume = min_volume
+        self.moneyness = moneyness
+
+        self.slices = {}
+        self._skipped = {}
+        self.version = 0
+        self.spot = None
+
+        self._surface = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+
+        return len(self.slices)
+
+    def _prepare(self, chain, S, T):
+
+        if not isinstance(chain, OptionChain):
+            chain = OptionChain.from_frame(chain, spot=S, T=T)
+
+        return chain
+
+    def _select(self, chain):
+
+        return chain.filter(
+            option_type=self.option_type,
+            min_volume=self.min_volume,
+            moneyness=self.moneyness
+        )
+
+    def _fit(self, entry, previous=None):
+
+        floor = None
+
+        if previous is not None:
+            floor = lambda grid, p=previous["params"]: svi_total_variance(grid, *p)
+
+        entry["params"] = fit_svi_slice(
+            entry["k"], entry["w"],
+            initial=entry.get("params"),
+            floor=floor
+        )
+
+    def refresh(self, chains, S, r, q, maturities, prune=True, parity=False):
+        """
+        Bring the surface up to date with `chains` ({expiry: chain}),
+        given as get_option_chain DataFrames or OptionChain objects.
+        `maturities` maps each expiry to its time to expiry in years.
+        With `parity`, each expiry uses the rate and carry implied by
+        put–call parity on its full chain, and `r` and `q` are only
+        fallbacks; `q` may then be a callable, called at most once and
+        only if some expiry needs it. Returns the list of expiries that
+        were recalibrated.
+        """
+
+        with self._lock:
+
+            updated = []
+
+            for expiry, raw in chains.items():
+
+                T = float(maturities[expiry])
+                chain = self._prepare(raw, S, T)
+
+                rate, carry = r, None
+
+                if parity:
+                    implied = implied_forwards(chain, r=r)
+                    if implied["forward"].size and np.isfinite(implied["forward"][0]):
+                        rate = float(implied["rate"][0])
+                        carry = float(implied["carry"][0])
+
+                if carry is None:
+                    if callable(q):
+                        q = q()
+                    carry = q
+
+                chain = self._select(chain)
+                key = chain_hash(chain, S, rate, carry, T)
+
+                entry = self.slices.get(expiry)
+
+                if entry is not None and entry["key"] == key:
+                    continue
+
+                if self._skipped.get(expiry) == key:
+                    continue
+
+                iv = option_chain_implied_vol(chain, rate, carry)
+                ok = ~np.isnan(iv)
+
+                # Too few quotes: remember the key but keep no slice
+                if ok.sum() < MIN_SLICE_POINTS:
+                    self._skipped[expiry] = key
+                    if self.slices.pop(expiry, None) is not None:
+                        updated.append(expiry)
+                    continue
+
+                self._skipped.pop(expiry, None)
+
+                forward = S * np.exp((rate - carry) * T)
+
+                entry = {
+                    "key": key,
+                    "T": T,
+                    "forward": forward,
+                    "k": np.log(chain.strike[ok] / forward),
+                    "w": iv[ok] ** 2 * T,
+                    "params": None if entry is None else entry["params"]
+                }
+
+                self.slices[expiry] = entry
+                updated.append(expiry)
+
+            if prune:
+                for expiry in set(self.slices) - set(chains):
+                    del self.slices[expiry]
+                    updated.append(expiry)
+
+                for expiry in set(self._skipped) - set(chains):
+                    del self._skipped[expiry]
+
+            if updated:
+                self._calibrate(set(updated))
+                self.spot = S
+                self.version += 1
+                self._surface = None
+
+            return updated
+
+    def _calibrate(self, updated):
+
+        previous = None
+
+        # Walk in maturity order so each refit slice is kept above the
+        # one before it. An unchanged slice is only refit when a change
+        # before it introduced a calendar violation.
+        for expiry, entry in sorted(self.slices.items(), key=lambda e: e[1]["T"]):
+
+            needs_fit = expiry in updated or entry["params"] is None
+
+            if not needs_fit and previous is not None:
+                grid = np.linspace(entry["k"].min(), entry["k"].max(), 21)
+                needs_fit = bool(np.any(
+                    svi_total_variance(grid, *entry["params"])
+                    < svi_total_variance(grid, *previous["params"]) - 1e-10
+                ))
+
+            if needs_fit:
+                self._fit(entry, previous)
+
+            previous = entry
+
+    def surface(self) -> VolatilitySurface:
+        """Current calibrated VolatilitySurface (rebuilt only after changes)."""
+
+        with self._lock:
+
+            if not self.slices:
+                raise ValueError("Surface has no calibrated expiries")
+
+            if self._surface is None:
+
+                entries = sorted(self.slices.values(), key=lambda e: e["T"])
+
+                self._surface = VolatilitySurface(
+                    self.spot,
+                    [e["T"] for e in entries],
+                    [e["forward"] for e in entries],
+                    [e["params"] for e in entries],
+                    model="svi",
+                    version=self.version
+                )
+
+            return self._surface
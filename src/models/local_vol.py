@@ -0,0 +1,243 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+# -----------------------------------
+# Dupire local volatility
+# -----------------------------------
+# In terms of total implied variance w(k, T) at log-forward moneyness
+# k = log(K / F(T)) (Gatheral, "The Volatility Surface", eq. 1.10):
+#
+#                              dw/dT
+#   sigma_loc^2 = -------------------------------------------------
+#                 1 - k/w w_k + 1/4 (-1/4 - 1/w + k^2/w^2) w_k^2
+#                   + 1/2 w_kk
+#
+# evaluated at K = S and T = t gives the local vol of the spot at time t.
+def dupire_local_variance(k, w, w_k, w_kk, w_T):
+    """Dupire local variance from total variance and its derivatives."""
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+
+        denominator = (
+            1
+            - k / w * w_k
+            + 0.25 * (-0.25 - 1 / w + k ** 2 / w ** 2) * w_k ** 2
+            + 0.5 * w_kk
+        )
+
+        return w_T / denominator
+
+
+class LocalVolGrid:
+    """
+    Local volatility tabulated on a grid of time intervals and regular
+    log-spot nodes, with the forward curve of the implied surface it
+    came from.
+
+    Interval edges include every expiry of the surface, so the jumps of
+    dw/dT at expiries fall on edges; within an interval local vol is
+    constant in t and linear in log S. local_vol(S, t) works on any
+    batch of points and is flat beyond the grid. drift(t) is the
+    forward curve's carry d log F / dt, which Monte Carlo and PDE
+    engines use as the spot drift so that forwards match the surface.
+    """
+
+    def __init__(self, spot, times, log_spots, local_vol, log_forwards):
+
+        self.spot = float(spot)
+        self.times = np.asarray(times, dtype=np.float64)
+        self.log_spots = np.asarray(log_spots, dtype=np.float64)
+        self.values = np.asarray(local_vol, dtype=np.float64)
+        self.log_forwards = np.asarray(log_forwards, dtype=np.float64)
+
+        self._dx = self.log_spots[1] - self.log_spots[0]
+
+        # Carry of each interval
+        self._carry = np.diff(self.log_forwards) / np.diff(self.times)
+
+    def __repr__(self):
+
+        return (
+            f"LocalVolGrid({self.values.shape[0]} intervals x "
+            f"{self.log_spots.size} spots, T <= {self.times[-1]:.3f})"
+        )
+
+    def _interval(self, t):
+
+        return np.clip(
+            np.searchsorted(self.times, t, side="right") - 1,
+            0, self.values.shape[0] - 1
+        )
+
+    def local_vol(self, S, t):
+        """Local volatility at spot S and time t (broadcast)."""
+
+        x, t = np.broadcast_arrays(
+            np.log(np.asarray(S, dtype=np.float64)),
+            np.asarray(t, dtype=np.float64)
+        )
+
+        i = self._interval(t)
+
+        u = np.clip((x - self.log_spots[0]) / self._dx, 0, self.log_spots.size - 1 - 1e-12)
+        j = u.astype(np.intp)
+        b = u - j
+
+        return (1 - b) * self.values[i, j] + b * self.values[i, j + 1]
+
+    def forward(self, t):
+
+        return np.exp(np.interp(t, self.times, self.log_forwards))
+
+    def drift(self, t):
+        """Instantaneous carry d log F / dt at time t."""
+
+        return self._carry[self._interval(t)]
+
+
+# -----------------------------------
+# Grid construction
+# -----------------------------------
+def build_local_vol_grid(
+    surface,
+    T_max=None,
+    n_times=100,
+    n_spots=201,
+    width=4.0,
+    min_vol=0.01,
+    max_vol=3.0
+) -> LocalVolGrid:
+    """
+    Tabulate Dupire local vol of an implied surface (VolatilitySurface
+    or SplineVolSurface) up to T_max (default: last expiry) on about
+    `n_times` intervals, split at every expiry, and `n_spots` log-spaced
+    spots covering +/- `width` ATM standard deviations at T_max.
+    Derivatives of w are finite differences evaluated on whole grid
+    arrays at once, at interval midpoints. Points where the denominator
+    is not positive (butterfly arbitrage) fall back to implied variance;
+    results are clipped to [min_vol, max_vol].
+    """
+
+    T_max = float(surface.expiries[-1] if T_max is None else T_max)
+
+    expiries = surface.expiries[surface.expiries < T_max]
+    times = np.unique(np.concatenate([
+        np.linspace(0.0, T_max, n_times + 1), expiries
+    ]))
+
+    atm_vol = float(np.sqrt(surface.total_variance(0.0, T_max) / T_max))
+    half_width = max(width * atm_vol * np.sqrt(T_max), 0.5)
+
+    log_spots = np.log(surface.spot) + np.linspace(
+        -half_width, half_width, n_spots
+    )
+
+    mid = 0.5 * (times[:-1] + times[1:])
+
+    t = mid[:, None]
+    k = log_spots[None, :] - np.log(surface.forward(mid))[:, None]
+
+    # Steps small enough to stay inside each interval
+    h = 1e-3
+    dt = 0.25 * np.diff(times)[:, None]
+
+    w = surface.total_variance(k, t)
+    w_up = surface.total_variance(k + h, t)
+    w_down = surface.total_variance(k - h, t)
+
+    w_k = (w_up - w_down) / (2 * h)
+    w_kk = (w_up - 2 * w + w_down) / h ** 2
+    w_T = (
+        surface.total_variance(k, t + dt) - surface.total_variance(k, t - dt)
+    ) / (2 * dt)
+
+    local_var = dupire_local_variance(k, w, w_k, w_kk, w_T)
+
+    fallback = ~np.isfinite(local_var) | (local_var <= 0)
+    local_var = np.where(fallback, w / t, local_var)
+
+    local_vol = np.clip(np.sqrt(local_var), min_vol, max_vol)
+
+    return LocalVolGrid(
+        surface.spot, times, log_spots, local_vol,
+        np.log(surface.forward(times))
+    )
+
+
+# -----------------------------------
+# Cache keyed on surface version
+# -----------------------------------
+# A recalibrated surface gets a new version, so its grid is rebuilt;
+# callers pricing many exotics off one calibration reuse the same grid.
+# The key also hashes the surface's node arrays so independent surfaces
+# that happen to share a version number never collide.
+_GRID_CACHE = OrderedDict()
+_GRID_CACHE_SIZE = 16
+_cache_lock = threading.Lock()
+
+
+def _surface_key(surface):
+
+    digest = hashlib.blake2b(digest_size=16)
+
+    for name, value in sorted(vars(surface).items()):
+        if name.startswith("_"):
+            continue
+        if isinstance(value, np.ndarray):
+            digest.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, (int, float, str)):
+            digest.update(repr(value).encode())
+
+    return (type(surface).__name__, surface.version, digest.hexdigest())
+
+
+def local_vol_grid(surface, **kwargs) -> LocalVolGrid:
+    """
+    Cached build_local_vol_grid: the grid is built once per surface
+    version (and grid settings) and shared afterwards.
+    """
+
+    key = (_surface_key(surface), tuple(sorted(kwargs.items())))
+
+    with _cache_lock:
+        grid = _GRID_CACHE.get(key)
+        if grid is not None:
+            _GRID_CACHE.move_to_end(key)
+            return grid
+
+    grid = build_local_vol_grid(surface, **kwargs)
+
+    with _cache_lock:
+        _GRID_CACHE[key] = grid
+        while len(_GRID_CACHE) > _GRID_CACHE_SIZE:
+            _GRID_CACHE.popitem(last=False)
+
+    return grid
+
+
+def as_local_vol(model, T):
+    """
+    A LocalVolGrid for pricing to maturity T: `model` itself when it is
+    one, otherwise the cached grid of an implied surface, extended to T
+    when T is beyond its last expiry.
+    """
+
+    if hasattr(model, "local_vol"):
+        return model
+
+    T_max = max(float(np.max(T)), float(model.expiries[-1]))
+
+    if T_max == float(model.expiries[-1]):
+        return local_vol_grid(model)
+
+    return local_vol_grid(model, T_max=T_max)
+
+
+def clear_local_vol_cache():
+
+    with _cache_lock:
+        _GRID_CACHE.clear()
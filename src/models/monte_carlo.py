@@ -1,11 +1,83 @@
 import numpy as np
 
+from src.models.black_scholes import option_flag, resolve_sigma
+
+MC_GREEKS = ("delta", "gamma", "vega", "rho")
+
+GREEK_METHODS = ("pathwise", "likelihood_ratio")
+
+
+# ----------------------------
+# Greeks from the pricing draws
+# ----------------------------
+# With ST = S exp((r - q - sigma^2 / 2) T + sigma sqrt(T) Z) and discount
+# D = exp(-r T), every Greek is an expectation over the same draws:
+#
+#   pathwise:   differentiate the discounted payoff along each path
+#               (needs a payoff that is continuous in ST);
+#               delta = D 1{ITM} phi ST / S
+#               vega  = D 1{ITM} phi ST (sqrt(T) Z - sigma T)
+#               rho   = D 1{ITM} phi ST T - T D payoff
+#   likelihood ratio: weight the payoff by the score of the lognormal
+#               density (any payoff, higher variance);
+#               delta = D payoff Z / (S sigma sqrt(T))
+#               vega  = D payoff ((Z^2 - 1) / sigma - Z sqrt(T))
+#               rho   = D payoff (Z sqrt(T) / sigma - T)
+#
+# Gamma mixes the two: the likelihood ratio applied to the pathwise delta,
+# D 1{ITM} phi ST / S^2 (Z / (sigma sqrt(T)) - 1), whose variance is far
+# below the pure likelihood-ratio estimator's; the likelihood_ratio method
+# uses the pure one,
+#               D payoff ((Z^2 - 1) / (sigma^2 T) - Z / (sigma sqrt(T))) / S^2
+def _greek_samples(S, K, T, r, sigma, q, phi, Z, ST, method):
+
+    discount = np.exp(-r * T)
+    sqrt_T = np.sqrt(T)
+
+    payoff = discount * np.maximum(phi * (ST - K), 0.0)
+
+    if method == "pathwise":
+
+        slope = discount * phi * ST * (phi * (ST - K) > 0)
+
+        return {
+            "delta": slope / S,
+            "gamma": slope / S ** 2 * (Z / (sigma * sqrt_T) - 1),
+            "vega": slope * (sqrt_T * Z - sigma * T),
+            "rho": T * (slope - payoff)
+        }
+
+    return {
+        "delta": payoff * Z / (S * sigma * sqrt_T),
+        "gamma": payoff * (
+            (Z ** 2 - 1) / (sigma ** 2 * T) - Z / (sigma * sqrt_T)
+        ) / S ** 2,
+        "vega": payoff * ((Z ** 2 - 1) / sigma - Z * sqrt_T),
+        "rho": payoff * (Z * sqrt_T / sigma - T)
+    }
+
+
 def monte_carlo_option_price(
     S, K, T, r, sigma,
     option_type="call",
     simulations=100000,
-    antithetic=True
+    antithetic=True,
+    q=0.0,
+    greeks=False,
+    greek_method="pathwise"
 ):
+    """
+    European price by simulation of the terminal spot, with a 95% CI.
+    With greeks=True, delta, gamma, vega and rho (per unit of spot, vol
+    and rate) are estimated from the same draws, each with its standard
+    error under "<greek>_std_error"; `greek_method` picks pathwise (gamma
+    mixed likelihood-ratio / pathwise) or likelihood-ratio estimators.
+    """
+
+    if greek_method not in GREEK_METHODS:
+        raise ValueError(f"greek_method must be one of {GREEK_METHODS}")
+
+    sigma = float(resolve_sigma(sigma, K, T))
 
     if antithetic:
         Z = np.random.randn(simulations // 2)
@@ -14,7 +86,7 @@ def monte_carlo_option_price(
         Z = np.random.randn(simulations)
 
     ST = S * np.exp(
-        (r - 0.5 * sigma**2) * T +
+        (r - q - 0.5 * sigma**2) * T +
         sigma * np.sqrt(T) * Z
     )
 
@@ -28,9 +100,193 @@ def monte_carlo_option_price(
     price = np.mean(discounted)
     std_error = np.std(discounted) / np.sqrt(len(discounted))
 
+    result = {
+        "price": price,
+        "std_error": std_error,
+        "ci_low": price - 1.96 * std_error,
+        "ci_high": price + 1.96 * std_error
+    }
+
+    if greeks:
+
+        samples = _greek_samples(
+            S, K, T, r, sigma, q, option_flag(option_type), Z, ST, greek_method
+        )
+
+        for name in MC_GREEKS:
+
+            values = samples[name]
+
+            # Antithetic partners are not independent: average the pairs
+            if antithetic:
+                half = Z.size // 2
+                values = 0.5 * (values[:half] + values[half:])
+
+            result[name] = float(values.mean())
+            result[f"{name}_std_error"] = float(
+                values.std() / np.sqrt(values.size)
+            )
+
+    return result
+
+
+# ----------------------------
+# Many contracts, shared draws
+# ----------------------------
+def monte_carlo_option_price_batch(
+    S, K, T, r, sigma, q=0.0,
+    option_type="call",
+    simulations=20000,
+    antithetic=True,
+    seed=None,
+    chunk_size=256
+):
+    """
+    European prices for many contracts from one set of normal draws
+    (common random numbers), so errors are smooth across strikes.
+    Contracts are simulated `chunk_size` at a time to bound memory.
+    Antithetic pairs are averaged before the standard error is taken.
+    Returns {"price", "std_error"} arrays; invalid contracts are NaN.
+    """
+
+    sigma = resolve_sigma(sigma, K, T)
+
+    S, K, T, r, sigma, q = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=np.float64))
+          for x in (S, K, T, r, sigma, q))
+    )
+    phi = np.broadcast_to(option_flag(option_type), S.shape)
+
+    shape = S.shape
+    S, K, T, r, sigma, q, phi = (
+        x.ravel() for x in (S, K, T, r, sigma, q, phi)
+    )
+
+    rng = np.random.default_rng(seed)
+
+    if antithetic:
+        Z = rng.standard_normal(max(simulations // 2, 1))
+        Z = np.concatenate([Z, -Z])
+    else:
+        Z = rng.standard_normal(simulations)
+
+    price = np.full(S.size, np.nan)
+    std_error = np.full(S.size, np.nan)
+
+    valid = np.flatnonzero((T > 0) & (sigma > 0))
+
+    for start in range(0, valid.size, chunk_size):
+
+        idx = valid[start:start + chunk_size]
+
+        s = sigma[idx, None]
+        t = T[idx, None]
+
+        ST = S[idx, None] * np.exp(
+            (r[idx, None] - q[idx, None] - 0.5 * s ** 2) * t
+            + s * np.sqrt(t) * Z
+        )
+
+        payoffs = np.exp(-r[idx, None] * t) * np.maximum(
+            phi[idx, None] * (ST - K[idx, None]), 0.0
+        )
+
+        if antithetic:
+            half = Z.size // 2
+            payoffs = 0.5 * (payoffs[:, :half] + payoffs[:, half:])
+
+        price[idx] = payoffs.mean(axis=1)
+        std_error[idx] = payoffs.std(axis=1) / np.sqrt(payoffs.shape[1])
+
+    return {
+        "price": price.reshape(shape),
+        "std_error": std_error.reshape(shape)
+    }
+
+
+# ----------------------------
+# Local volatility
+# ----------------------------
+def monte_carlo_local_vol_price(
+    S, K, T, r, local_vol,
+    option_type="call",
+    simulations=50000,
+    steps=100,
+    antithetic=True,
+    seed=None,
+    payoff=None
+):
+    """
+    Price under a Dupire local volatility model by log-Euler simulation.
+    `local_vol` is a LocalVolGrid or an implied surface (its grid is
+    built once per surface version and cached, see local_vol_grid).
+    The spot drifts along the surface's forward curve; `r` discounts.
+
+    `K` may be an array of strikes sharing the same paths. For exotics,
+    `payoff(paths)` receives the (simulations, steps + 1) spot paths and
+    returns one undiscounted payoff per path; K and option_type are then
+    ignored. Returns {"price", "std_error", "ci_low", "ci_high"}.
+    """
+
+    from src.models.local_vol import as_local_vol
+
+    grid = as_local_vol(local_vol, T)
+
+    rng = np.random.default_rng(seed)
+
+    n = simulations // 2 if antithetic else simulations
+    dt = T / steps
+
+    X = np.full(2 * n if antithetic else n, np.log(S), dtype=np.float64)
+
+    paths = None
+
+    if payoff is not None:
+        paths = np.empty((X.size, steps + 1))
+        paths[:, 0] = S
+
+    for step in range(steps):
+
+        t = step * dt
+
+        Z = rng.standard_normal(n)
+
+        if antithetic:
+            Z = np.concatenate([Z, -Z])
+
+        sigma = grid.local_vol(np.exp(X), t)
+
+        X += (grid.drift(t) - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * Z
+
+        if paths is not None:
+            paths[:, step + 1] = np.exp(X)
+
+    ST = np.exp(X)
+
+    if payoff is not None:
+        payoffs = np.asarray(payoff(paths), dtype=np.float64)[None, :]
+    else:
+        K = np.asarray(K, dtype=np.float64)
+        phi = option_flag(option_type)
+        payoffs = np.maximum(
+            np.reshape(phi, (-1, 1)) * (ST[None, :] - np.reshape(K, (-1, 1))),
+            0.0
+        )
+
+    discounted = np.exp(-r * T) * payoffs
+
+    if antithetic:
+        discounted = 0.5 * (discounted[:, :n] + discounted[:, n:])
+
+    price = discounted.mean(axis=1)
+    std_error = discounted.std(axis=1) / np.sqrt(discounted.shape[1])
+
+    if payoff is not None or np.ndim(K) == 0:
+        price, std_error = float(price[0]), float(std_error[0])
+
     return {
         "price": price,
         "std_error": std_error,
         "ci_low": price - 1.96 * std_error,
         "ci_high": price + 1.96 * std_error
-    }
\ No newline at end of file
+    }
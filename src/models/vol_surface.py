@@ -0,0 +1,610 @@
+import numpy as np
+
+
+# -----------------------------------
+# SVI / SSVI parametrisations
+# -----------------------------------
+# Both return total implied variance w = sigma_iv^2 * T as a function of
+# log-forward moneyness k = log(K / F).
+def svi_total_variance(k, a, b, rho, m, sigma):
+
+    k = np.asarray(k, dtype=np.float64)
+
+    return a + b * (rho * (k - m) + np.sqrt((k - m) ** 2 + sigma ** 2))
+
+
+def ssvi_phi(theta, eta, gamma=0.5):
+
+    theta = np.asarray(theta, dtype=np.float64)
+
+    return eta / (theta ** gamma * (1 + theta) ** (1 - gamma))
+
+
+def ssvi_total_variance(k, theta, rho, eta, gamma=0.5):
+    """
+    Surface SVI (Gatheral & Jacquier). Free of static arbitrage when
+    theta is non-decreasing in T, 0 < gamma <= 0.5 and
+    eta * (1 + |rho|) <= 2.
+    """
+
+    k = np.asarray(k, dtype=np.float64)
+    theta = np.asarray(theta, dtype=np.float64)
+
+    phi_k = ssvi_phi(theta, eta, gamma) * k
+
+    return 0.5 * theta * (
+        1 + rho * phi_k + np.sqrt((phi_k + rho) ** 2 + 1 - rho ** 2)
+    )
+
+
+def ssvi_to_svi(theta, rho, eta, gamma=0.5):
+    """Raw SVI parameters (a, b, rho, m, sigma) of one SSVI slice."""
+
+    phi = float(ssvi_phi(theta, eta, gamma))
+
+    return np.array([
+        0.5 * theta * (1 - rho ** 2),
+        0.5 * theta * phi,
+        rho,
+        -rho / phi,
+        np.sqrt(1 - rho ** 2) / phi
+    ])
+
+
+# -----------------------------------
+# No-arbitrage diagnostics
+# -----------------------------------
+def svi_butterfly_density(k, a, b, rho, m, sigma):
+    """
+    Durrleman's g(k) for a raw SVI slice. The slice is free of
+    butterfly arbitrage when g(k) >= 0 for every k.
+    """
+
+    k = np.asarray(k, dtype=np.float64)
+
+    x = k - m
+    root = np.sqrt(x ** 2 + sigma ** 2)
+
+    w = a + b * (rho * x + root)
+    w1 = b * (rho + x / root)
+    w2 = b * sigma ** 2 / root ** 3
+
+    return (
+        (1 - k * w1 / (2 * w)) ** 2
+        - 0.25 * w1 ** 2 * (1 / w + 0.25)
+        + 0.5 * w2
+    )
+
+
+# -----------------------------------
+# Calibration
+# -----------------------------------
+# Penalty weight on arbitrage violations in the least-squares residuals
+ARBITRAGE_PENALTY = 100.0
+
+# Minimum number of quotes needed to calibrate a slice
+MIN_SLICE_POINTS = 5
+
+
+def _check_grids(k):
+    """
+    Grids for the arbitrage penalties: butterfly over the data range
+    widened to at least [-1, 1], calendar over the data range plus a
+    margin (further out it would only compare two extrapolations).
+    """
+
+    span = max(np.ptp(k), 0.2)
+
+    low = k.min() - 0.5 * span
+    high = k.max() + 0.5 * span
+
+    butterfly = np.linspace(min(low, -1.0), max(high, 1.0), 61)
+    calendar = np.linspace(low, high, 41)
+
+    return butterfly, calendar
+
+
+def _svi_initial_guess(k, w):
+
+    atm = np.interp(0.0, np.sort(k), w[np.argsort(k)])
+
+    return np.array([0.5 * atm, 0.1, -0.3, 0.0, 0.1])
+
+
+def fit_svi_slice(k, w, weights=None, initial=None, floor=None):
+    """
+    Fit raw SVI (a, b, rho, m, sigma) to total variances `w` at
+    log-moneyness `k` by vectorized least squares.
+
+    Butterfly arbitrage (g(k) < 0) and, when `floor` is given (the
+    previous slice's total variance on the check grid), calendar
+    arbitrage (w < floor) are penalised on a grid spanning the data.
+    """
+
+    from scipy.optimize import least_squares
+
+    k = np.asarray(k, dtype=np.float64)
+    w = np.asarray(w, dtype=np.float64)
+    weights = np.ones_like(w) if weights is None else np.asarray(weights)
+
+    grid, calendar_grid = _check_grids(k)
+    scale = max(float(np.mean(w)), 1e-8)
+
+    floor_grid = None if floor is None else floor(calendar_grid)
+
+    def residuals(x):
+
+        a, b, rho, m, sigma = x
+
+        fit = svi_total_variance(k, a, b, rho, m, sigma)
+        out = [weights * (fit - w) / scale]
+
+        w_grid = svi_total_variance(grid, a, b, rho, m, sigma)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            g = svi_butterfly_density(grid, a, b, rho, m, sigma)
+
+        out.append(ARBITRAGE_PENALTY * np.minimum(np.nan_to_num(g, nan=-1.0), 0))
+        out.append(ARBITRAGE_PENALTY * np.minimum(w_grid, 0) / scale)
+
+        if floor is not None:
+            gap = svi_total_variance(calendar_grid, a, b, rho, m, sigma) - floor_grid
+            out.append(ARBITRAGE_PENALTY * np.minimum(gap, 0) / scale)
+
+        return np.concatenate(out)
+
+    w_max = float(np.max(w))
+
+    lower = [-w_max, 1e-6, -0.999, k.min() - 1.0, 1e-4]
+    upper = [w_max, 2.0, 0.999, k.max() + 1.0, 2.0]
+
+    x0 = _svi_initial_guess(k, w) if initial is None else np.asarray(initial)
+    x0 = np.clip(x0, np.add(lower, 1e-9), np.subtract(upper, 1e-9))
+
+    result = least_squares(
+        residuals, x0,
+        bounds=(lower, upper),
+        method="trf",
+        x_scale="jac",
+        max_nfev=200
+    )
+
+    return result.x
+
+
+def fit_ssvi(k, w, T):
+    """
+    Fit SSVI jointly across expiries. Inputs are flat arrays (one entry
+    per quote). Returns (theta per unique T, rho, eta, gamma).
+
+    Arbitrage-freeness holds by construction: theta is a cumulative sum
+    of non-negative increments and eta = s * 2 / (1 + |rho|), 0 < s <= 1.
+    """
+
+    from scipy.optimize import least_squares
+
+    k = np.asarray(k, dtype=np.float64)
+    w = np.asarray(w, dtype=np.float64)
+    T = np.asarray(T, dtype=np.float64)
+
+    expiries, slot = np.unique(T, return_inverse=True)
+    n = expiries.size
+
+    # ATM total variance per expiry as a starting point
+    atm = np.array([
+        np.interp(0.0, *zip(*sorted(zip(k[slot == i], w[slot == i]))))
+        for i in range(n)
+    ])
+    atm = np.maximum.accumulate(np.maximum(atm, 1e-6))
+
+    scale = max(float(np.mean(w)), 1e-8)
+
+    def unpack(x):
+
+        rho, s, gamma = x[:3]
+        theta = np.cumsum(x[3:])
+        eta = s * 2 / (1 + abs(rho))
+
+        return theta, rho, eta, gamma
+
+    def residuals(x):
+
+        theta, rho, eta, gamma = unpack(x)
+
+        return (ssvi_total_variance(k, theta[slot], rho, eta, gamma) - w) / scale
+
+    x0 = np.concatenate([[-0.3, 0.5, 0.4], np.diff(atm, prepend=0.0)])
+    x0[3:] = np.maximum(x0[3:], 1e-8)
+
+    lower = np.concatenate([[-0.999, 1e-4, 0.01], np.full(n, 0.0)])
+    upper = np.concatenate([[0.999, 1.0, 0.5], np.full(n, np.inf)])
+    lower[3] = 1e-8
+
+    result = least_squares(residuals, x0, bounds=(lower, upper), method="trf")
+
+    theta, rho, eta, gamma = unpack(result.x)
+
+    return expiries, theta, rho, eta, gamma
+
+
+# -----------------------------------
+# Calibrated surface
+# -----------------------------------
+class VolatilitySurface:
+    """
+    Implied volatility surface stored as one raw SVI slice per expiry.
+
+    Between expiries total variance is interpolated linearly in T at
+    fixed log-forward moneyness (which preserves the absence of calendar
+    arbitrage); before the first expiry it scales proportionally to T.
+    Forwards are interpolated log-linearly from the spot. `version`
+    identifies the calibration, so derived objects can be cached on it.
+    """
+
+    def __init__(self, spot, expiries, forwards, params, model="svi", version=0):
+
+        order = np.argsort(expiries)
+
+        self.spot = float(spot)
+        self.expiries = np.asarray(expiries, dtype=np.float64)[order]
+        self.forwards = np.asarray(forwards, dtype=np.float64)[order]
+        self.params = np.asarray(params, dtype=np.float64).reshape(-1, 5)[order]
+        self.model = model
+        self.version = version
+
+        self._log_forward_nodes = np.concatenate(
+            [[np.log(self.spot)], np.log(self.forwards)]
+        )
+        self._T_nodes = np.concatenate([[0.0], self.expiries])
+
+    def __len__(self):
+
+        return self.expiries.size
+
+    def __repr__(self):
+
+        return f"VolatilitySurface({self.model}, {len(self)} expiries)"
+
+    def forward(self, T):
+
+        T = np.asarray(T, dtype=np.float64)
+
+        carry = (self._log_forward_nodes[-1] - np.log(self.spot)) / self.expiries[-1]
+
+        inside = np.interp(T, self._T_nodes, self._log_forward_nodes)
+        beyond = np.log(self.spot) + carry * T
+
+        return np.exp(np.where(T > self.expiries[-1], beyond, inside))
+
+    def slice_variance(self, i, k):
+
+        return svi_total_variance(k, *self.params[i])
+
+    def total_variance(self, k, T):
+        """Total implied variance at log-forward moneyness k and maturity T."""
+
+        k, T = np.broadcast_arrays(
+            np.asarray(k, dtype=np.float64),
+            np.asarray(T, dtype=np.float64)
+        )
+
+        upper = np.clip(np.searchsorted(self.expiries, T), 0, len(self) - 1)
+        lower = np.maximum(upper - 1, 0)
+
+        w_up = svi_total_variance(k, *np.moveaxis(self.params[upper], -1, 0))
+        w_lo = svi_total_variance(k, *np.moveaxis(self.params[lower], -1, 0))
+
+        T_up = self.expiries[upper]
+        T_lo = self.expiries[lower]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weight = np.where(upper > lower, (T - T_lo) / (T_up - T_lo), 0.0)
+
+        w = np.where(
+            T <= self.expiries[0],
+            w_up * T / self.expiries[0],
+            np.where(
+                T >= self.expiries[-1],
+                w_up * T / self.expiries[-1],
+                (1 - weight) * w_lo + weight * w_up
+            )
+        )
+
+        return w
+
+    def implied_vol(self, K, T):
+        """Implied volatility for strikes K and maturities T (broadcast)."""
+
+        K, T = np.broadcast_arrays(
+            np.asarray(K, dtype=np.float64),
+            np.asarray(T, dtype=np.float64)
+        )
+
+        k = np.log(K / self.forward(T))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.sqrt(np.maximum(self.total_variance(k, T), 0) / T)
+
+    def grid(self, strikes, expiries):
+        """IV matrix with one row per expiry and one column per strike."""
+
+        K, T = np.meshgrid(strikes, expiries)
+
+        return self.implied_vol(K, T)
+
+    def arbitrage_report(self, k=None):
+        """Minimum butterfly density and calendar spread on a k grid."""
+
+        k = np.linspace(-1.0, 1.0, 201) if k is None else np.asarray(k)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            butterfly = min(
+                float(np.nanmin(svi_butterfly_density(k, *p)))
+                for p in self.params
+            )
+
+        w = np.array([self.slice_variance(i, k) for i in range(len(self))])
+        calendar = float(np.min(np.diff(w, axis=0))) if len(self) > 1 else 0.0
+
+        return {"butterfly": butterfly, "calendar": calendar}
+
+
+def fit_volatility_surface(
+    strikes,
+    T,
+    iv,
+    spot,
+    forwards=None,
+    r=0.0,
+    q=0.0,
+    model="svi",
+    weights=None
+):
+    """
+    Calibrate a VolatilitySurface to quotes given as flat arrays
+    (strike, maturity, implied vol), e.g. the long-format table built
+    from implied_volatility_chain.
+
+    `forwards` maps each maturity to its forward; by default
+    F = S * exp((r - q) * T). model="svi" fits one slice per expiry
+    (in increasing T, each slice kept above the previous one);
+    model="ssvi" fits a single SSVI surface across expiries.
+    Expiries with fewer than MIN_SLICE_POINTS quotes are skipped.
+    """
+
+    strikes, T, iv = (
+        np.asarray(x, dtype=np.float64).ravel() for x in (strikes, T, iv)
+    )
+
+    ok = np.isfinite(iv) & (iv > 0) & (T > 0)
+    weights = None if weights is None else np.asarray(weights)[ok]
+    strikes, T, iv = strikes[ok], T[ok], iv[ok]
+
+    expiries, counts = np.unique(T, return_counts=True)
+    expiries = expiries[counts >= MIN_SLICE_POINTS]
+
+    if expiries.size == 0:
+        raise ValueError("Not enough quotes to calibrate a surface")
+
+    if forwards is None:
+        forward_of = dict(zip(expiries, spot * np.exp((r - q) * expiries)))
+    else:
+        forward_of = dict(forwards)
+
+    keep = np.isin(T, expiries)
+    strikes, T, iv = strikes[keep], T[keep], iv[keep]
+    weights = None if weights is None else weights[keep]
+
+    F = np.array([forward_of[t] for t in T])
+    k = np.log(strikes / F)
+    w = iv ** 2 * T
+
+    if model == "ssvi":
+
+        _, theta, rho, eta, gamma = fit_ssvi(k, w, T)
+        params = [ssvi_to_svi(t, rho, eta, gamma) for t in theta]
+
+    elif model == "svi":
+
+        params = []
+        floor = None
+
+        for t in expiries:
+
+            mask = T == t
+
+            x = fit_svi_slice(
+                k[mask], w[mask],
+                weights=None if weights is None else weights[mask],
+                initial=params[-1] if params else None,
+                floor=floor
+            )
+
+            params.append(x)
+            floor = (lambda p: lambda grid: svi_total_variance(grid, *p))(x)
+
+    else:
+        raise ValueError("model must be svi or ssvi")
+
+    return VolatilitySurface(
+        spot,
+        expiries,
+        [forward_of[t] for t in expiries],
+        params,
+        model=model
+    )
+
+
+# -----------------------------------
+# Spline interpolator for pricing
+# -----------------------------------
+def _natural_spline_coefficients(x, y):
+    """
+    Piecewise-cubic coefficients (in powers of x - x_i) of natural cubic
+    splines through every row of `y` on the shared knots `x`.
+    Returns an array of shape (rows, len(x) - 1, 4).
+    """
+
+    h = np.diff(x)
+    n = x.size
+
+    # Second derivatives: tridiagonal system shared by every row
+    A = np.zeros((n - 2, n - 2))
+    np.fill_diagonal(A, (h[:-1] + h[1:]) / 3)
+    np.fill_diagonal(A[1:], h[1:-1] / 6)
+    np.fill_diagonal(A[:, 1:], h[1:-1] / 6)
+
+    slopes = np.diff(y, axis=1) / h
+    rhs = np.diff(slopes, axis=1)
+
+    M = np.zeros_like(y)
+    M[:, 1:-1] = np.linalg.solve(A, rhs.T).T
+
+    return np.stack([
+        y[:, :-1],
+        slopes - h * (2 * M[:, :-1] + M[:, 1:]) / 6,
+        M[:, :-1] / 2,
+        (M[:, 1:] - M[:, :-1]) / (6 * h)
+    ], axis=-1)
+
+
+class SplineVolSurface:
+    """
+    Pricing-side volatility surface: natural cubic splines of total
+    variance in log-forward moneyness, one per expiry on a shared knot
+    grid, with coefficients precomputed at construction. Lookups are a
+    single vectorized gather + Horner evaluation for any batch of
+    (K, T); total variance is linear in T between expiries and flat-slope
+    extrapolated beyond the knots.
+
+    Any pricer accepting `sigma` takes this object instead of a number
+    (see black_scholes.resolve_sigma). Strikes are read sticky-strike
+    against the calibration forwards.
+    """
+
+    def __init__(self, spot, expiries, forwards, k_nodes, w_nodes, version=0):
+
+        order = np.argsort(expiries)
+
+        self.spot = float(spot)
+        self.expiries = np.asarray(expiries, dtype=np.float64)[order]
+        self.forwards = np.asarray(forwards, dtype=np.float64)[order]
+        self.k_nodes = np.asarray(k_nodes, dtype=np.float64)
+        self.w_nodes = np.asarray(w_nodes, dtype=np.float64)[order]
+        self.version = version
+
+        self._coef = _natural_spline_coefficients(self.k_nodes, self.w_nodes)
+
+        # End slopes for linear extrapolation in k
+        h = self.k_nodes[-1] - self.k_nodes[-2]
+        c = self._coef[:, -1]
+        self._left_slope = self._coef[:, 0, 1]
+        self._right_slope = c[:, 1] + 2 * c[:, 2] * h + 3 * c[:, 3] * h ** 2
+
+        self._T_nodes = np.concatenate([[0.0], self.expiries])
+        self._log_forward_nodes = np.concatenate(
+            [[np.log(self.spot)], np.log(self.forwards)]
+        )
+
+    @classmethod
+    def from_surface(cls, surface, k_nodes=None):
+        """Sample a calibrated VolatilitySurface onto spline knots."""
+
+        k_nodes = np.linspace(-1.5, 1.5, 61) if k_nodes is None else k_nodes
+
+        w_nodes = np.array([
+            surface.slice_variance(i, k_nodes) for i in range(len(surface))
+        ])
+
+        return cls(
+            surface.spot,
+            surface.expiries,
+            surface.forwards,
+            k_nodes,
+            w_nodes,
+            version=surface.version
+        )
+
+    def __len__(self):
+
+        return self.expiries.size
+
+    def __repr__(self):
+
+        return (
+            f"SplineVolSurface({len(self)} expiries, "
+            f"{self.k_nodes.size} knots)"
+        )
+
+    def forward(self, T):
+
+        T = np.asarray(T, dtype=np.float64)
+
+        carry = (self._log_forward_nodes[-1] - np.log(self.spot)) / self.expiries[-1]
+
+        inside = np.interp(T, self._T_nodes, self._log_forward_nodes)
+        beyond = np.log(self.spot) + carry * T
+
+        return np.exp(np.where(T > self.expiries[-1], beyond, inside))
+
+    def _slice_variance(self, i, k):
+
+        knots = self.k_nodes
+
+        j = np.clip(np.searchsorted(knots, k) - 1, 0, knots.size - 2)
+        t = k - knots[j]
+
+        c = self._coef[i, j]
+        w = c[..., 0] + t * (c[..., 1] + t * (c[..., 2] + t * c[..., 3]))
+
+        w = np.where(
+            k < knots[0],
+            self.w_nodes[i, 0] + self._left_slope[i] * (k - knots[0]),
+            w
+        )
+        w = np.where(
+            k > knots[-1],
+            self.w_nodes[i, -1] + self._right_slope[i] * (k - knots[-1]),
+            w
+        )
+
+        return w
+
+    def total_variance(self, k, T):
+
+        k, T = np.broadcast_arrays(
+            np.asarray(k, dtype=np.float64),
+            np.asarray(T, dtype=np.float64)
+        )
+
+        upper = np.clip(np.searchsorted(self.expiries, T), 0, len(self) - 1)
+        lower = np.maximum(upper - 1, 0)
+
+        w_up = self._slice_variance(upper, k)
+        w_lo = self._slice_variance(lower, k)
+
+        T_up = self.expiries[upper]
+        T_lo = self.expiries[lower]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weight = np.where(upper > lower, (T - T_lo) / (T_up - T_lo), 0.0)
+
+        w = np.where(
+            (T <= self.expiries[0]) | (T >= self.expiries[-1]),
+            w_up * T / T_up,
+            (1 - weight) * w_lo + weight * w_up
+        )
+
+        return np.maximum(w, 1e-12)
+
+    def implied_vol(self, K, T):
+
+        K, T = np.broadcast_arrays(
+            np.asarray(K, dtype=np.float64),
+            np.asarray(T, dtype=np.float64)
+        )
+
+        k = np.log(K / self.forward(T))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.sqrt(self.total_variance(k, T) / T)
@@ -0,0 +1,245 @@
+import numpy as np
+import pandas as pd
+
+from src.data import data_scraper
+from src.models.black_scholes import black_scholes_price_batch, norm_cdf, option_flag
+
+
+# Rebalance every 1, 2, 5, 10 and 21 trading days
+FREQUENCIES = (1, 2, 5, 10, 21)
+
+STEPS_PER_YEAR = 252
+
+# Paths x steps x frequencies evaluated per chunk (bounds peak memory)
+MAX_CHUNK_ELEMENTS = 4_000_000
+
+
+def _n_steps(T, steps_per_year):
+
+    return max(int(round(T * steps_per_year)), 1)
+
+
+# -----------------------------------
+# Spot paths
+# -----------------------------------
+# Paths are (n_paths, n_steps + 1) spot arrays on a regular grid from
+# today (column 0, the spot) to expiry, one step per trading day.
+def simulate_paths(
+    S,
+    T,
+    sigma,
+    mu=0.0,
+    q=0.0,
+    n_paths=10000,
+    steps_per_year=STEPS_PER_YEAR,
+    antithetic=True,
+    seed=None
+) -> np.ndarray:
+    """Geometric Brownian motion paths with drift mu - q and vol sigma."""
+
+    n_steps = _n_steps(T, steps_per_year)
+    dt = T / n_steps
+
+    rng = np.random.default_rng(seed)
+
+    if antithetic:
+        Z = rng.standard_normal(((n_paths + 1) // 2, n_steps))
+        Z = np.concatenate([Z, -Z])[:n_paths]
+    else:
+        Z = rng.standard_normal((n_paths, n_steps))
+
+    log_returns = (mu - q - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * Z
+
+    return _from_returns(S, log_returns)
+
+
+def bootstrap_paths(
+    returns,
+    S,
+    T,
+    n_paths=10000,
+    steps_per_year=STEPS_PER_YEAR,
+    demean=False,
+    seed=None
+) -> np.ndarray:
+    """
+    Paths built by resampling daily log `returns` with replacement, so
+    they carry the fat tails and skew of the history. With demean=True
+    the historical drift is removed.
+    """
+
+    returns = np.asarray(returns, dtype=np.float64)
+    returns = returns[np.isfinite(returns)]
+
+    if demean:
+        returns = returns - returns.mean()
+
+    n_steps = _n_steps(T, steps_per_year)
+
+    rng = np.random.default_rng(seed)
+
+    return _from_returns(S, rng.choice(returns, (n_paths, n_steps)))
+
+
+def historical_paths(
+    ticker,
+    T,
+    n_paths=10000,
+    S=None,
+    period="1y",
+    demean=False,
+    seed=None
+) -> np.ndarray:
+    """bootstrap_paths from the daily closes of get_historical_data."""
+
+    hist = data_scraper.get_historical_data(ticker, period=period)
+    close = hist["Close"].to_numpy(dtype=np.float64)
+
+    return bootstrap_paths(
+        np.diff(np.log(close)),
+        close[-1] if S is None else S,
+        T,
+        n_paths=n_paths,
+        demean=demean,
+        seed=seed
+    )
+
+
+def _from_returns(S, log_returns):
+
+    paths = np.empty((log_returns.shape[0], log_returns.shape[1] + 1))
+    paths[:, 0] = 0.0
+    np.cumsum(log_returns, axis=1, out=paths[:, 1:])
+
+    return S * np.exp(paths)
+
+
+# -----------------------------------
+# Discrete delta hedging
+# -----------------------------------
+# The option position is delta-hedged from today to expiry, the hedge
+# being reset every f steps for each rebalance frequency f. Deltas are
+# computed once, as one array over every path and step; a frequency
+# only changes which of them are held, delta[:, (i // f) * f] over step
+# i, so all frequencies are gathered from the same array.
+#
+# In money discounted to today, the P&L of `quantity` options bought at
+# the model premium V0 and hedged with -quantity * delta shares is
+#
+#   quantity * (D(T) payoff - V0 - sum_i delta_i dG_i)
+#
+# where dG_i = D(t_i+1) S_i+1 exp(q dt) - D(t_i) S_i is the discounted
+# gain on one share held over step i, dividend included, minus
+# proportional costs on every change of the share holding (including
+# the initial trade and the unwind at expiry). Results are reported in
+# money at expiry.
+def _deltas(paths, K, T, r, sigma, q, phi):
+
+    n_steps = paths.shape[1] - 1
+    tau = T - np.arange(n_steps) * (T / n_steps)
+
+    S = paths[:, :-1]
+    vol_t = sigma * np.sqrt(tau)
+
+    with np.errstate(divide="ignore"):
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * tau) / vol_t
+
+    return phi * np.exp(-q * tau) * norm_cdf(phi * d1)
+
+
+def hedge_backtest(
+    paths,
+    K,
+    T,
+    r,
+    sigma,
+    q=0.0,
+    option_type="call",
+    frequencies=FREQUENCIES,
+    sigma_price=None,
+    quantity=-1.0,
+    cost=0.0,
+    max_elements=MAX_CHUNK_ELEMENTS
+) -> dict:
+    """
+    Delta-hedging P&L of an option on every path for every rebalance
+    frequency (in steps) at once. `sigma` is the hedging vol (e.g.
+    sigma_hist or an implied vol); the premium is charged at
+    `sigma_price` (default: `sigma`). `quantity` is the option position,
+    short one by default; `cost` is a proportional transaction cost on
+    traded share notional.
+
+    Returns a dict with "pnl" (n_frequencies x n_paths, money at
+    expiry), "frequencies", "premium" and a "summary" DataFrame of the
+    P&L distribution per frequency.
+    """
+
+    paths = np.asarray(paths, dtype=np.float64)
+    frequencies = np.atleast_1d(np.asarray(frequencies, dtype=np.intp))
+
+    n_paths, n_steps = paths.shape[0], paths.shape[1] - 1
+    dt = T / n_steps
+    t = np.arange(n_steps + 1) * dt
+
+    phi = option_flag(option_type)
+    sigma_price = sigma if sigma_price is None else sigma_price
+
+    premium = float(black_scholes_price_batch(
+        paths[0, 0], K, T, r, sigma_price, q, phi
+    ))
+
+    # Which step's delta is held over each step, per frequency
+    held = (np.arange(n_steps)[None, :] // frequencies[:, None]) * frequencies[:, None]
+
+    pnl = np.empty((frequencies.size, n_paths))
+
+    chunk_size = max(1, max_elements // (n_steps * frequencies.size))
+
+    for start in range(0, n_paths, chunk_size):
+
+        chunk = paths[start:start + chunk_size]
+
+        delta = _deltas(chunk, K, T, r, sigma, q, phi)
+
+        # (paths, frequencies, steps)
+        holding = delta[:, held]
+
+        notional = np.exp(-r * t) * chunk
+        gains = notional[:, 1:] * np.exp(q * dt) - notional[:, :-1]
+        hedge = (holding @ gains[:, :, None])[:, :, 0].T
+
+        payoff = np.exp(-r * T) * np.maximum(phi * (chunk[:, -1] - K), 0.0)
+
+        result = quantity * (payoff[None, :] - premium - hedge)
+
+        if cost:
+            # Shares traded at each t_i, from the first purchase to the unwind
+            traded = np.abs(np.diff(holding, axis=2, prepend=0.0, append=0.0))
+            result -= abs(quantity) * cost * (traded @ notional[:, :, None])[:, :, 0].T
+
+        pnl[:, start:start + chunk_size] = np.exp(r * T) * result
+
+    return {
+        "pnl": pnl,
+        "frequencies": frequencies,
+        "premium": premium,
+        "summary": hedge_summary(pnl, frequencies)
+    }
+
+
+def hedge_summary(pnl, frequencies) -> pd.DataFrame:
+    """Mean, dispersion and tail of the P&L per rebalance frequency."""
+
+    return pd.DataFrame(
+        {
+            "mean": pnl.mean(axis=1),
+            "std": pnl.std(axis=1),
+            "p5": np.quantile(pnl, 0.05, axis=1),
+            "median": np.median(pnl, axis=1),
+            "p95": np.quantile(pnl, 0.95, axis=1),
+            "es5": np.array([
+                row[row <= np.quantile(row, 0.05)].mean() for row in pnl
+            ])
+        },
+        index=pd.Index(frequencies, name="rebalance_steps")
+    )
@@ -0,0 +1,286 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.data.option_chain import _column, _factorize
+from src.models.black_scholes import option_flag, price_and_greeks_batch, resolve_sigma
+from src.models.binomial_tree import binomial_greeks_batch
+
+
+GREEKS = ("delta", "gamma", "vega", "theta", "rho")
+
+# Same floor as data_scraper.time_to_expiry
+MIN_T = 0.0001
+
+
+def years_to_expiry(expiry, as_of=None):
+    """
+    time_to_expiry for an array of YYYY-MM-DD dates: whole days from
+    `as_of` (default: now) to each expiry, in years.
+    """
+
+    now = np.datetime64(
+        datetime.datetime.today() if as_of is None else as_of, "s"
+    )
+
+    expiry = np.asarray(expiry).astype("datetime64[s]")
+    days = np.floor((expiry - now) / np.timedelta64(1, "D"))
+
+    return np.maximum(days / 365, MIN_T)
+
+
+def revalue_positions(S, K, T, r, sigma, q, flag, american, steps=100) -> dict:
+    """
+    Price and Greeks per unit for per-position arrays: one Black–Scholes
+    batch over the European rows, one lattice batch over the American
+    rows (`american` is a boolean mask).
+    """
+
+    result = {name: np.full(K.size, np.nan) for name in ("price",) + GREEKS}
+
+    for rows, engine in (
+        (np.flatnonzero(~american), "european"),
+        (np.flatnonzero(american), "american")
+    ):
+
+        if rows.size == 0:
+            continue
+
+        args = (S[rows], K[rows], T[rows], r[rows], sigma[rows], q[rows])
+
+        if engine == "european":
+            values = price_and_greeks_batch(*args, flag[rows])
+        else:
+            values = binomial_greeks_batch(
+                *args, steps=steps, option_type=flag[rows], american=True
+            )
+
+        for name in result:
+            result[name][rows] = values[name]
+
+    return result
+
+
+def _style_mask(style, n):
+
+    arr = np.asarray(style)
+
+    if arr.dtype.kind == "b":
+        american = arr
+    else:
+        labels = np.char.lower(arr.astype(str))
+        american = labels == "american"
+
+        if not (american | (labels == "european")).all():
+            raise ValueError("style must be european or american")
+
+    return np.ascontiguousarray(np.broadcast_to(american, (n,)))
+
+
+# -----------------------------------
+# Array-backed option book
+# -----------------------------------
+class Portfolio:
+    """
+    Book of option positions stored column-wise, one array per field:
+    underlying, strike, expiry, CALL / PUT flag, quantity (signed),
+    exercise style and contract multiplier. `expiry` holds YYYY-MM-DD
+    labels (T is computed at valuation time) or year fractions.
+
+    Valuation runs one Black–Scholes batch over the European positions
+    and one lattice batch over the American ones; Greeks are then summed
+    per underlying with grouped sums, so the cost of a refresh is a few
+    array passes whatever the size of the book.
+    """
+
+    def __init__(
+        self,
+        underlying,
+        strike,
+        expiry,
+        option_type,
+        quantity,
+        style="european",
+        multiplier=1.0
+    ):
+
+        self.strike = np.ascontiguousarray(strike, dtype=np.float64)
+
+        n = self.strike.size
+
+        self.underlying = _column(underlying, n, object)
+        self.expiry = np.ascontiguousarray(np.broadcast_to(expiry, (n,)))
+        self.flag = np.ascontiguousarray(
+            np.broadcast_to(option_flag(option_type), (n,))
+        )
+        self.quantity = _column(quantity, n)
+        self.american = _style_mask(style, n)
+        self.multiplier = _column(multiplier, n)
+
+        # Integer code per position into the sorted underlying names
+        self.codes, self.underlyings = _factorize(self.underlying)
+
+    def __len__(self):
+
+        return self.strike.size
+
+    def __repr__(self):
+
+        return (
+            f"Portfolio({len(self)} positions on {len(self.underlyings)} "
+            f"underlyings, {int(self.american.sum())} American)"
+        )
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Build from a DataFrame with underlying (or ticker), strike,
+        expiry, optionType and quantity columns, and optional style and
+        multiplier columns.
+        """
+
+        underlying = "underlying" if "underlying" in df.columns else "ticker"
+
+        return cls(
+            underlying=df[underlying].to_numpy(),
+            strike=df["strike"].to_numpy(),
+            expiry=df["expiry"].to_numpy(),
+            option_type=df["optionType"].to_numpy(),
+            quantity=df["quantity"].to_numpy(),
+            style=df["style"].to_numpy() if "style" in df.columns else "european",
+            multiplier=(
+                df["multiplier"].to_numpy() if "multiplier" in df.columns else 1.0
+            )
+        )
+
+    def to_frame(self):
+
+        return pd.DataFrame({
+            "underlying": self.underlying,
+            "strike": self.strike,
+            "expiry": self.expiry,
+            "optionType": np.where(self.flag > 0, "call", "put"),
+            "quantity": self.quantity,
+            "style": np.where(self.american, "american", "european"),
+            "multiplier": self.multiplier
+        })
+
+    # -----------------------------------
+    # Market inputs
+    # -----------------------------------
+    def T(self, as_of=None):
+        """Time to expiry of every position, in years."""
+
+        if self.expiry.dtype.kind in "iuf":
+            return self.expiry.astype(np.float64)
+
+        return years_to_expiry(self.expiry, as_of)
+
+    def per_position(self, values):
+        """
+        Spread market inputs over positions: a dict (or Series) keyed by
+        underlying is looked up once per underlying, anything else is
+        broadcast as is.
+        """
+
+        if isinstance(values, (dict, pd.Series)):
+            return np.array(
+                [values[name] for name in self.underlyings], dtype=np.float64
+            )[self.codes]
+
+        return np.ascontiguousarray(
+            np.broadcast_to(np.asarray(values, dtype=np.float64), (len(self),))
+        )
+
+    def _sigma(self, vol, T):
+
+        # Surfaces (or numbers) per underlying, each read at its strikes
+        if isinstance(vol, dict):
+            sigma = np.empty(len(self))
+            for code, name in enumerate(self.underlyings):
+                rows = self.codes == code
+                sigma[rows] = resolve_sigma(vol[name], self.strike[rows], T[rows])
+            return sigma
+
+        return np.ascontiguousarray(
+            np.broadcast_to(resolve_sigma(vol, self.strike, T), (len(self),)),
+            dtype=np.float64
+        )
+
+    def inputs(self, spot, vol, r, q=0.0, as_of=None) -> dict:
+        """
+        Per-position pricing inputs S, K, T, r, sigma, q. `spot`, `vol`,
+        `r` and `q` may be numbers, per-position arrays or dicts keyed
+        by underlying (`vol` values may also be surfaces).
+        """
+
+        T = self.T(as_of)
+
+        return {
+            "S": self.per_position(spot),
+            "K": self.strike,
+            "T": T,
+            "r": self.per_position(r),
+            "sigma": self._sigma(vol, T),
+            "q": self.per_position(q)
+        }
+
+    # -----------------------------------
+    # Valuation
+    # -----------------------------------
+    def revalue(self, spot, vol, r, q=0.0, as_of=None, steps=100) -> dict:
+        """
+        Price and Greeks per unit of every position (market inputs as in
+        `inputs`). European positions are priced by Black–Scholes,
+        American ones on the binomial lattice with `steps` steps.
+        Returns a dict of arrays.
+        """
+
+        market = self.inputs(spot, vol, r, q, as_of)
+
+        return revalue_positions(
+            **market, flag=self.flag, american=self.american, steps=steps
+        )
+
+    def exposures(self, spot, vol, r, q=0.0, as_of=None, steps=100) -> dict:
+        """
+        Position-level value and Greeks: per-unit figures from revalue
+        scaled by quantity * multiplier.
+        """
+
+        unit = self.revalue(spot, vol, r, q, as_of=as_of, steps=steps)
+
+        size = self.quantity * self.multiplier
+
+        exposure = {"value": unit["price"] * size}
+        exposure.update({name: unit[name] * size for name in GREEKS})
+
+        return exposure
+
+    def aggregate(self, spot, vol, r, q=0.0, as_of=None, steps=100) -> pd.DataFrame:
+        """
+        Net value and Greeks per underlying, plus a TOTAL row. Positions
+        that could not be valued (NaN) are left out of the sums and
+        counted in the "unpriced" column.
+        """
+
+        exposure = self.exposures(spot, vol, r, q, as_of=as_of, steps=steps)
+
+        n = len(self.underlyings)
+        unpriced = np.isnan(exposure["value"])
+
+        table = {
+            name: np.bincount(
+                self.codes, weights=np.nan_to_num(values), minlength=n
+            )
+            for name, values in exposure.items()
+        }
+
+        table["positions"] = np.bincount(self.codes, minlength=n)
+        table["unpriced"] = np.bincount(self.codes, weights=unpriced, minlength=n)
+
+        table = pd.DataFrame(table, index=pd.Index(self.underlyings, name="underlying"))
+        table.loc["TOTAL"] = table.sum()
+
+        return table.astype({"positions": int, "unpriced": int})
@@ -0,0 +1,321 @@
+import numpy as np
+import pandas as pd
+
+from src.data.option_chain import OptionChain, _factorize
+from src.models.black_scholes import norm_cdf, resolve_sigma
+from src.models.binomial_tree import binomial_option_price_batch
+from src.risk.portfolio import Portfolio
+
+
+# Default grid: spot -20% .. +20%, vol -10 .. +10 points, 21 x 21
+SPOT_SHOCKS = np.linspace(-0.2, 0.2, 21)
+VOL_SHOCKS = np.linspace(-0.1, 0.1, 21)
+
+# Positions x scenarios evaluated per chunk (bounds peak memory)
+MAX_CHUNK_ELEMENTS = 1_000_000
+
+MIN_VOL = 1e-4
+
+
+# -----------------------------------
+# Positions as flat arrays
+# -----------------------------------
+def scenario_positions(book, spot=None, vol=None, r=0.0, q=0.0, as_of=None) -> dict:
+    """
+    Flat per-position arrays for the scenario engines from a Portfolio
+    (market inputs as in Portfolio.inputs) or an OptionChain, taken as
+    one long unit of every contract at the chain's own spot and T with
+    `vol` per contract (e.g. implied vols) or a surface.
+    """
+
+    if isinstance(book, Portfolio):
+
+        positions = book.inputs(spot, vol, r, q, as_of)
+        positions.update(
+            flag=book.flag,
+            american=book.american,
+            size=book.quantity * book.multiplier,
+            codes=book.codes,
+            underlyings=book.underlyings
+        )
+
+        return positions
+
+    if isinstance(book, OptionChain):
+
+        n = len(book)
+
+        if book.ticker is None:
+            codes, names = np.zeros(n, dtype=np.intp), np.array(["chain"])
+        else:
+            codes, names = _factorize(book.ticker)
+
+        def column(x):
+            return np.ascontiguousarray(
+                np.broadcast_to(np.asarray(x, dtype=np.float64), (n,))
+            )
+
+        return {
+            "S": book.spot if spot is None else column(spot),
+            "K": book.strike,
+            "T": book.T,
+            "r": column(r),
+            "sigma": column(resolve_sigma(vol, book.strike, book.T)),
+            "q": column(q),
+            "flag": book.flag,
+            "american": np.zeros(n, dtype=bool),
+            "size": np.ones(n),
+            "codes": codes,
+            "underlyings": names
+        }
+
+    raise TypeError("book must be a Portfolio or an OptionChain")
+
+
+# -----------------------------------
+# Revaluation tensor
+# -----------------------------------
+# Scenario axes are (spot shock, vol shock, days forward, rate shock).
+# A chunk of c positions is revalued on the whole grid at once as one
+# (c, n_spot, n_vol, n_days, n_rate) broadcast; chunks are sized so
+# that tensor stays under MAX_CHUNK_ELEMENTS, and only the P&L sums
+# per underlying are kept.
+#
+# American positions are repriced as Black–Scholes plus their base
+# early-exercise premium (lattice minus Black–Scholes at the base point)
+# held fixed across scenarios, floored at intrinsic value. Pass
+# american="lattice" to reprice every scenario on the lattice instead,
+# at the lattice's cost per scenario; scenarios past expiry are worth
+# intrinsic value either way.
+def _revalue(S, K, T, r, sigma, q, flag):
+    """
+    Black–Scholes on scenario axes. Each term is computed on the axes it
+    depends on (log-moneyness on spot, sigma * sqrt(T) on vol and time)
+    and only d1, d2 and the price span the full tensor. Contracts
+    expired by the scenario horizon are worth intrinsic value.
+    """
+
+    sqrt_T = np.sqrt(T)
+    vol_t = sigma * sqrt_T
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+
+        # d1 and d2 signed by the option flag
+        scale = flag / vol_t
+        d1 = np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T
+        d1 = d1 * scale
+        d2 = d1 - flag * vol_t
+
+        price = S * np.exp(-q * T) * norm_cdf(d1)
+        price -= K * np.exp(-r * T) * norm_cdf(d2)
+        price *= flag
+
+    expired = T <= 0
+
+    if expired.any():
+        intrinsic = np.maximum(flag * (S - K), 0.0)
+        price = np.where(expired, intrinsic, price)
+
+    return price
+
+
+def base_values(positions, steps=100):
+    """
+    Base value of every position (lattice for American rows) and the
+    early-exercise premium over Black–Scholes (zero for European rows).
+    """
+
+    S, K, T, rate, sigma, carry, flag = (
+        positions[name] for name in ("S", "K", "T", "r", "sigma", "q", "flag")
+    )
+
+    base = _revalue(S, K, T, rate, sigma, carry, flag)
+    premium = np.zeros_like(base)
+
+    rows = np.flatnonzero(positions["american"])
+
+    if rows.size:
+        lattice = binomial_option_price_batch(
+            S[rows], K[rows], T[rows], rate[rows], sigma[rows], carry[rows],
+            steps=steps, option_type=flag[rows], american=True
+        )
+        premium[rows] = lattice - base[rows]
+        base[rows] = lattice
+
+    return base, premium
+
+
+def scenario_grid(
+    book,
+    spot=None,
+    vol=None,
+    r=0.0,
+    q=0.0,
+    spot_shocks=SPOT_SHOCKS,
+    vol_shocks=VOL_SHOCKS,
+    days=(0,),
+    rate_shocks=(0.0,),
+    as_of=None,
+    american="premium",
+    steps=100,
+    max_elements=MAX_CHUNK_ELEMENTS
+) -> dict:
+    """
+    P&L of a Portfolio or OptionChain on the full product of relative
+    spot shocks, absolute vol shocks, calendar days forward and absolute
+    rate shocks. Returns a dict with "pnl" (total, shape n_spot x n_vol
+    x n_days x n_rate), "by_underlying" (same with a leading underlying
+    axis), "underlyings", "base_value", the four shock axes and
+    "skipped", the indices of positions left out of the P&L because
+    they have no base value (e.g. a missing spot or vol).
+    """
+
+    if american not in ("premium", "lattice"):
+        raise ValueError("american must be premium or lattice")
+
+    positions = scenario_positions(book, spot, vol, r, q, as_of)
+
+    axes = {
+        "spot_shocks": np.atleast_1d(np.asarray(spot_shocks, dtype=np.float64)),
+        "vol_shocks": np.atleast_1d(np.asarray(vol_shocks, dtype=np.float64)),
+        "days": np.atleast_1d(np.asarray(days, dtype=np.float64)),
+        "rate_shocks": np.atleast_1d(np.asarray(rate_shocks, dtype=np.float64))
+    }
+
+    grid_shape = tuple(a.size for a in axes.values())
+    n_scenarios = int(np.prod(grid_shape))
+
+    S, K, T, rate, sigma, carry, flag, american_rows, size = (
+        positions[name] for name in
+        ("S", "K", "T", "r", "sigma", "q", "flag", "american", "size")
+    )
+
+    base, premium = base_values(positions, steps)
+
+    # A position without a base value would make its underlying's whole
+    # grid NaN: leave it out and report it
+    valid = np.isfinite(base)
+
+    # Sorting by underlying makes each chunk's groups contiguous runs
+    order = np.flatnonzero(valid)
+    order = order[np.argsort(positions["codes"][order], kind="stable")]
+    codes = positions["codes"][order]
+    n_groups = len(positions["underlyings"])
+
+    by_underlying = np.zeros((n_groups, n_scenarios))
+
+    # Scenario axes as broadcastable (1, n_spot, n_vol, n_days, n_rate)
+    spot_axis = 1 + axes["spot_shocks"].reshape(1, -1, 1, 1, 1)
+    vol_axis = axes["vol_shocks"].reshape(1, 1, -1, 1, 1)
+    time_axis = axes["days"].reshape(1, 1, 1, -1, 1) / 365
+    rate_axis = axes["rate_shocks"].reshape(1, 1, 1, 1, -1)
+
+    chunk_size = max(1, max_elements // n_scenarios)
+
+    for start in range(0, order.size, chunk_size):
+
+        rows = order[start:start + chunk_size]
+
+        def column(x):
+            return x[rows].reshape(-1, 1, 1, 1, 1)
+
+        S_c = column(S) * spot_axis
+        T_c = np.maximum(column(T) - time_axis, 0.0)
+        sigma_c = np.maximum(column(sigma) + vol_axis, MIN_VOL)
+        rate_c = column(rate) + rate_axis
+
+        args = (S_c, column(K), T_c, rate_c, sigma_c, column(carry), column(flag))
+
+        values = _revalue(*args)
+
+        early = np.flatnonzero(american_rows[rows])
+
+        if early.size and american == "lattice":
+            lattice = binomial_option_price_batch(
+                *(a[early] for a in args[:-1]),
+                steps=steps,
+                option_type=args[-1][early],
+                american=True
+            )
+            intrinsic = np.maximum(args[-1][early] * (S_c[early] - args[1][early]), 0.0)
+            values[early] = np.where(T_c[early] > 0, lattice, intrinsic)
+
+        elif early.size:
+            intrinsic = np.maximum(args[-1][early] * (S_c[early] - args[1][early]), 0.0)
+            values[early] = np.maximum(values[early] + column(premium)[early], intrinsic)
+
+        values -= column(base)
+        values *= column(size)
+        pnl = values.reshape(rows.size, n_scenarios)
+
+        # Sum the runs of each underlying within the chunk
+        chunk_codes = codes[start:start + chunk_size]
+        heads = np.flatnonzero(np.r_[True, chunk_codes[1:] != chunk_codes[:-1]])
+
+        by_underlying[chunk_codes[heads]] += np.add.reduceat(pnl, heads, axis=0)
+
+    by_underlying = by_underlying.reshape((n_groups,) + grid_shape)
+
+    return {
+        "pnl": by_underlying.sum(axis=0),
+        "by_underlying": by_underlying,
+        "underlyings": np.asarray(positions["underlyings"]),
+        "base_value": float(np.nansum(base[valid] * size[valid])),
+        "skipped": np.flatnonzero(~valid),
+        **axes
+    }
+
+
+# -----------------------------------
+# Tables for display
+# -----------------------------------
+def _nearest(values, target=0.0):
+
+    return int(np.argmin(np.abs(values - target)))
+
+
+def pnl_table(result, underlying=None, day=0, rate_shock=0.0) -> pd.DataFrame:
+    """
+    Spot x vol P&L grid (rows: vol shock, columns: spot shock) at the
+    given days forward and rate shock, for one underlying or the total.
+    """
+
+    grid = result["pnl"] if underlying is None else result["by_underlying"][
+        list(result["underlyings"]).index(underlying)
+    ]
+
+    grid = grid[
+        :, :,
+        _nearest(result["days"], day),
+        _nearest(result["rate_shocks"], rate_shock)
+    ]
+
+    return pd.DataFrame(
+        grid.T,
+        index=pd.Index(result["vol_shocks"], name="vol_shock"),
+        columns=pd.Index(result["spot_shocks"], name="spot_shock")
+    )
+
+
+def spot_ladder(result, vol_shock=0.0, day=0, rate_shock=0.0) -> pd.DataFrame:
+    """
+    P&L per underlying (rows, plus TOTAL) across spot shocks (columns)
+    at one vol shock, days forward and rate shock.
+    """
+
+    index = (
+        slice(None),
+        slice(None),
+        _nearest(result["vol_shocks"], vol_shock),
+        _nearest(result["days"], day),
+        _nearest(result["rate_shocks"], rate_shock)
+    )
+
+    ladder = pd.DataFrame(
+        result["by_underlying"][index],
+        index=pd.Index(result["underlyings"], name="underlying"),
+        columns=pd.Index(result["spot_shocks"], name="spot_shock")
+    )
+    ladder.loc["TOTAL"] = ladder.sum()
+
+    return ladder
@@ -0,0 +1,385 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.data import data_scraper
+from src.risk.portfolio import revalue_positions
+from src.risk.scenarios import MAX_CHUNK_ELEMENTS, _revalue, base_values, scenario_positions
+
+
+METHODS = ("historical", "parametric")
+MODES = ("full", "delta_gamma")
+
+
+# -----------------------------------
+# Underlying moves
+# -----------------------------------
+# Scenarios are log returns over the horizon, one column per underlying.
+# Historical scenarios are the overlapping horizon-day returns of the
+# aligned close history; parametric ones are drawn from a zero-mean
+# normal with the historical daily covariance scaled to the horizon.
+def historical_returns(tickers, period="1y") -> pd.DataFrame:
+    """
+    Daily log returns of each ticker's closes from get_historical_data,
+    aligned on dates common to all of them.
+    """
+
+    closes = {}
+
+    for ticker in tickers:
+
+        hist = data_scraper.get_historical_data(ticker, period=period)
+
+        dates = pd.to_datetime(hist["Date"])
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_localize(None)
+
+        closes[ticker] = pd.Series(
+            hist["Close"].to_numpy(), index=dates.dt.normalize().to_numpy()
+        )
+
+    closes = pd.DataFrame(closes).dropna()
+
+    return np.log(closes).diff().dropna()
+
+
+def horizon_returns(returns, horizon=1) -> np.ndarray:
+    """Overlapping `horizon`-day log returns (rows) from daily ones."""
+
+    daily = np.asarray(returns, dtype=np.float64)
+
+    if horizon <= 1:
+        return daily
+
+    cumulative = np.vstack([np.zeros(daily.shape[1]), np.cumsum(daily, axis=0)])
+
+    return cumulative[horizon:] - cumulative[:-horizon]
+
+
+def parametric_returns(returns, n_scenarios=10000, horizon=1, seed=None) -> np.ndarray:
+    """
+    Correlated normal horizon log returns with the covariance of the
+    daily `returns` (mean zero, scaled by `horizon`).
+    """
+
+    daily = np.asarray(returns, dtype=np.float64)
+    cov = np.atleast_2d(np.cov(daily, rowvar=False)) * horizon
+
+    # Eigen-decomposition tolerates the singular covariances of short or
+    # collinear histories, where Cholesky would fail
+    eigval, eigvec = np.linalg.eigh(cov)
+    root = eigvec * np.sqrt(np.clip(eigval, 0.0, None))
+
+    rng = np.random.default_rng(seed)
+
+    return rng.standard_normal((n_scenarios, cov.shape[0])) @ root.T
+
+
+# -----------------------------------
+# Full revaluation
+# -----------------------------------
+# Every position is repriced under every scenario: spots move by the
+# scenario's return for their underlying, time moves forward by the
+# horizon, and vols are held at their current (sticky-strike) level.
+# American positions keep their base early-exercise premium, as in
+# scenario_grid. Scenarios are split into tasks for a process pool and
+# each task walks the positions in chunks of bounded size, reducing the
+# (positions x scenarios) values to one P&L per scenario with a
+# matrix-vector product.
+_STATE = {}
+
+
+def _init_worker(state):
+
+    _STATE.clear()
+    _STATE.update(state)
+
+
+def _full_pnl(state, moves, max_elements):
+
+    positions = state["positions"]
+    base, premium = state["base"], state["premium"]
+
+    S, K, T, rate, sigma, carry, flag, american, size, codes = (
+        positions[name] for name in
+        ("S", "K", "T", "r", "sigma", "q", "flag", "american", "size", "codes")
+    )
+
+    T_h = np.maximum(T - state["horizon"] / 365, 0.0)
+
+    n_scenarios = moves.shape[0]
+    pnl = np.zeros(n_scenarios)
+
+    chunk_size = max(1, max_elements // n_scenarios)
+
+    for start in range(0, K.size, chunk_size):
+
+        rows = np.arange(start, min(start + chunk_size, K.size))
+
+        def column(x):
+            return x[rows, None]
+
+        S_c = column(S) * np.exp(moves[:, codes[rows]].T)
+
+        values = _revalue(
+            S_c, column(K), column(T_h), column(rate),
+            column(sigma), column(carry), column(flag)
+        )
+
+        early = np.flatnonzero(american[rows])
+
+        if early.size:
+            intrinsic = np.maximum(
+                column(flag)[early] * (S_c[early] - column(K)[early]), 0.0
+            )
+            values[early] = np.maximum(values[early] + column(premium)[early], intrinsic)
+
+        pnl += size[rows] @ values - size[rows] @ base[rows]
+
+    return pnl
+
+
+def _worker_pnl(moves, max_elements):
+
+    return _full_pnl(_STATE, moves, max_elements)
+
+
+def _finite_rows(positions, *values):
+    """
+    `positions` and per-position `values` restricted to the rows where
+    every value is finite, and the indices of the rows left out. One
+    position without a value would otherwise make every scenario NaN.
+    """
+
+    keep = np.logical_and.reduce([np.isfinite(v) for v in values])
+    skipped = np.flatnonzero(~keep)
+
+    if not skipped.size:
+        return positions, values, skipped
+
+    n = keep.size
+
+    positions = {
+        name: x[keep] if isinstance(x, np.ndarray) and x.shape[:1] == (n,) and name != "underlyings"
+        else x
+        for name, x in positions.items()
+    }
+
+    return positions, tuple(v[keep] for v in values), skipped
+
+
+def _full_revaluation(positions, moves, horizon, steps, workers, max_elements):
+
+    base, premium = base_values(positions, steps)
+    positions, (base, premium), skipped = _finite_rows(positions, base, premium)
+
+    state = {
+        "positions": positions,
+        "base": base,
+        "premium": premium,
+        "horizon": horizon
+    }
+
+    workers = os.cpu_count() if workers is None else workers
+    moves = np.asarray(moves, dtype=np.float64)
+
+    if workers <= 1 or moves.shape[0] < 2 * workers:
+        return _full_pnl(state, moves, max_elements), skipped
+
+    # A few blocks per worker keeps the pool busy to the end
+    blocks = np.array_split(moves, 4 * workers)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(state,)
+    ) as pool:
+        parts = list(pool.map(_worker_pnl, blocks, [max_elements] * len(blocks)))
+
+    return np.concatenate(parts), skipped
+
+
+def full_revaluation_pnl(
+    positions,
+    moves,
+    horizon=1,
+    steps=100,
+    workers=None,
+    max_elements=MAX_CHUNK_ELEMENTS
+) -> np.ndarray:
+    """
+    P&L per scenario by full revaluation. `positions` comes from
+    scenario_positions; `moves` holds one row of horizon log returns per
+    scenario, one column per underlying (in positions["underlyings"]
+    order). With more than one worker (None = one per CPU), scenario
+    blocks run on a process pool. Positions without a finite base value
+    are left out.
+    """
+
+    return _full_revaluation(positions, moves, horizon, steps, workers, max_elements)[0]
+
+
+# -----------------------------------
+# Delta-gamma approximation
+# -----------------------------------
+# P&L ~ sum_u D_u x_u + 1/2 G_u x_u^2 + theta * horizon, with x_u the
+# relative spot move of underlying u, D_u = sum size * delta * S and
+# G_u = sum size * gamma * S^2 over its positions. One Greeks pass and
+# a few (scenarios x underlyings) array operations, whatever the book.
+def _delta_gamma(positions, moves, horizon, steps):
+
+    greeks = revalue_positions(
+        *(positions[name] for name in ("S", "K", "T", "r", "sigma", "q", "flag", "american")),
+        steps=steps
+    )
+
+    size = positions["size"]
+    S = positions["S"]
+
+    positions, (dollar_delta, dollar_gamma, theta), skipped = _finite_rows(
+        positions,
+        size * greeks["delta"] * S,
+        size * greeks["gamma"] * S ** 2,
+        size * greeks["theta"]
+    )
+
+    codes = positions["codes"]
+    n = len(positions["underlyings"])
+
+    dollar_delta = np.bincount(codes, weights=dollar_delta, minlength=n)
+    dollar_gamma = np.bincount(codes, weights=dollar_gamma, minlength=n)
+
+    x = np.expm1(np.asarray(moves, dtype=np.float64))
+
+    pnl = x @ dollar_delta + 0.5 * (x ** 2) @ dollar_gamma + theta.sum() * horizon / 365
+
+    return pnl, skipped
+
+
+def delta_gamma_pnl(positions, moves, horizon=1, steps=100) -> np.ndarray:
+    """
+    Delta-gamma P&L per scenario. Positions without finite Greeks are
+    left out.
+    """
+
+    return _delta_gamma(positions, moves, horizon, steps)[0]
+
+
+# -----------------------------------
+# Risk measures
+# -----------------------------------
+def var_es(pnl, level=0.99, ci=0.95) -> dict:
+    """
+    VaR and Expected Shortfall of a P&L sample, as positive losses at
+    `level`, with `ci` confidence intervals. The VaR interval is the
+    distribution-free order-statistic interval (ranks from the normal
+    approximation to the binomial count of losses below VaR); the ES
+    interval uses the asymptotic standard error of the tail mean.
+    """
+
+    from scipy.special import ndtri
+
+    losses = np.sort(-np.asarray(pnl, dtype=np.float64))
+    losses = losses[np.isfinite(losses)]
+    n = losses.size
+
+    if n == 0:
+        raise ValueError("No finite P&L scenarios")
+
+    var = float(np.quantile(losses, level))
+    tail = losses[losses >= var]
+    es = float(tail.mean())
+
+    z = float(ndtri(0.5 + ci / 2))
+
+    spread = z * np.sqrt(n * level * (1 - level))
+    lo = int(np.floor(n * level - spread))
+    hi = int(np.ceil(n * level + spread))
+
+    # Ranks are 1-based order statistics
+    var_ci = (float(losses[max(lo - 1, 0)]), float(losses[min(hi - 1, n - 1)]))
+
+    se = np.sqrt(
+        (tail.var() + level * (es - var) ** 2) / (n * (1 - level))
+    ) if tail.size > 1 else np.nan
+
+    return {
+        "var": var,
+        "es": es,
+        "var_ci": var_ci,
+        "es_ci": (es - z * se, es + z * se),
+        "level": level,
+        "scenarios": n
+    }
+
+
+def portfolio_var(
+    book,
+    spot,
+    vol,
+    r,
+    q=0.0,
+    returns=None,
+    method="historical",
+    mode="full",
+    level=0.99,
+    ci=0.95,
+    horizon=1,
+    n_scenarios=10000,
+    period="1y",
+    seed=None,
+    as_of=None,
+    workers=None,
+    steps=100,
+    max_elements=MAX_CHUNK_ELEMENTS
+) -> dict:
+    """
+    VaR and ES of a Portfolio (or OptionChain) over `horizon` days.
+    `returns` are daily log returns, one column per underlying (default:
+    historical_returns over `period`). `method` picks historical or
+    parametric scenarios, `mode` full revaluation or the delta-gamma
+    approximation. Returns var_es's dict plus the P&L
+    sample, method, mode, run time and "skipped", the indices of
+    positions left out because they have no finite value or Greeks
+    (as in scenario_grid).
+    """
+
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+
+    start = time.perf_counter()
+
+    positions = scenario_positions(book, spot, vol, r, q, as_of)
+    underlyings = list(positions["underlyings"])
+
+    if returns is None:
+        returns = historical_returns(underlyings, period)
+
+    daily = pd.DataFrame(returns)[underlyings]
+
+    if method == "historical":
+        moves = horizon_returns(daily, horizon)
+    else:
+        moves = parametric_returns(daily, n_scenarios, horizon, seed)
+
+    if mode == "full":
+        pnl, skipped = _full_revaluation(
+            positions, moves, horizon, steps, workers, max_elements
+        )
+    else:
+        pnl, skipped = _delta_gamma(positions, moves, horizon, steps)
+
+    return {
+        **var_es(pnl, level, ci),
+        "pnl": pnl,
+        "method": method,
+        "mode": mode,
+        "skipped": skipped,
+        "seconds": time.perf_counter() - start
+    }
@@ -0,0 +1,506 @@
+"""
+Command-line batch pricer for CSV and Parquet contract files.
+
+    python -m src.service.batch_pricer contracts.parquet priced.parquet \\
+        --workers 4 --chunk-size 500000
+
+The input is read in chunks of --chunk-size rows and every chunk is
+priced by the vectorized engines, one array call per engine, then
+appended to the output, so memory stays at a few chunks whatever the
+size of the file. With --workers > 1, chunks are priced on a process
+pool (at most two in flight per worker) and written in input order.
+
+Input columns (aliases in brackets; missing optional columns take the
+command-line defaults):
+
+    S [spot], K [strike], T in years or expiry (YYYY-MM-DD, with --as-of)
+    sigma [vol]                   needed by every engine but iv
+    market_price [mid]            needed by iv
+    r [rate], q, option_type [optionType], style, engine   optional
+
+Each row goes to one engine: bs (Black–Scholes price and Greeks),
+binomial (American CRR lattice price and Greeks), mc (Monte Carlo price
+and standard error) or iv (implied vol from the market price, with
+Black–Scholes Greeks at that vol). --engine picks one for every row;
+by default (auto) a row uses its `engine` column if there is one, iv
+when there is a market price column and the row has no vol, binomial
+when its style is american, and bs otherwise. The output is the input
+plus the engine and result columns; a throughput summary is printed
+at the end.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.data.storage import FORMATS, check_format
+from src.models.binomial_tree import binomial_greeks_batch
+from src.models.black_scholes import option_flag, price_and_greeks_batch
+from src.models.implied_vol import implied_volatility_batch
+from src.models.monte_carlo import monte_carlo_option_price_batch
+from src.risk.portfolio import _style_mask, years_to_expiry
+
+
+ENGINES = ("bs", "binomial", "mc", "iv")
+ROUTES = ("auto",) + ENGINES
+
+RESULT_COLUMNS = (
+    "engine", "impliedVol", "price", "delta", "gamma", "vega", "theta", "rho", "std_error"
+)
+
+# Input column -> accepted names, first match wins
+ALIASES = {
+    "S": ("S", "spot"),
+    "K": ("K", "strike"),
+    "T": ("T",),
+    "expiry": ("expiry",),
+    "sigma": ("sigma", "vol"),
+    "market_price": ("market_price", "mid"),
+    "r": ("r", "rate"),
+    "q": ("q",),
+    "option_type": ("option_type", "optionType"),
+    "style": ("style",),
+    "engine": ("engine",)
+}
+
+# Inputs read from CSV as numbers; every other column is kept as text
+NUMERIC_INPUTS = ("S", "K", "T", "sigma", "market_price", "r", "q")
+
+CHUNK_ROWS = 250_000
+
+
+def _format_of(path, fmt=None):
+
+    if fmt is None:
+        fmt = "parquet" if path.endswith((".parquet", ".pq")) else "csv"
+
+    check_format(fmt)
+
+    return fmt
+
+
+# -----------------------------------
+# One chunk
+# -----------------------------------
+def _inputs(frame):
+
+    found = {}
+
+    for name, candidates in ALIASES.items():
+        for candidate in candidates:
+            if candidate in frame.columns:
+                found[name] = frame[candidate]
+                break
+
+    return found
+
+
+def _routes(columns, engine, n):
+
+    if engine != "auto":
+        return np.full(n, engine, dtype=object)
+
+    if "engine" in columns:
+
+        routes = columns["engine"].astype(str).str.lower().to_numpy(dtype=object)
+        unknown = set(routes) - set(ENGINES)
+
+        if unknown:
+            raise ValueError(f"Unknown engines {sorted(unknown)}; expected {ENGINES}")
+
+        return routes
+
+    routes = np.full(n, "bs", dtype=object)
+
+    if "style" in columns:
+        routes[_style_mask(columns["style"].to_numpy(), n)] = "binomial"
+
+    if "market_price" in columns:
+
+        sigma = (
+            columns["sigma"].to_numpy(dtype=np.float64) if "sigma" in columns
+            else np.full(n, np.nan)
+        )
+        routes[np.isnan(sigma)] = "iv"
+
+    return routes
+
+
+def price_chunk(
+    frame,
+    engine="auto",
+    r=0.04,
+    q=0.0,
+    option_type="call",
+    as_of=None,
+    steps=100,
+    simulations=20000,
+    seed=0
+) -> pd.DataFrame:
+    """
+    `frame` with the engine and result columns added. Rows are grouped
+    by engine and each group is priced with one vectorized call. Rows
+    an engine cannot value (e.g. no-arbitrage violations for iv) get
+    NaN results.
+    """
+
+    if engine not in ROUTES:
+        raise ValueError(f"engine must be one of {ROUTES}")
+
+    n = len(frame)
+    columns = _inputs(frame)
+
+    def column(name, default=None):
+
+        if name in columns:
+            return columns[name].to_numpy(dtype=np.float64)
+
+        if default is None:
+            raise ValueError(f"Missing input column {name} ({' or '.join(ALIASES[name])})")
+
+        return np.full(n, float(default))
+
+    if "T" in columns:
+        T = column("T")
+    elif "expiry" in columns:
+        T = years_to_expiry(columns["expiry"].astype(str).to_numpy(), as_of)
+    else:
+        raise ValueError("Missing input column T (or expiry)")
+
+    S, K = column("S"), column("K")
+    rate, carry = column("r", r), column("q", q)
+
+    flag = option_flag(
+        columns["option_type"].to_numpy() if "option_type" in columns else option_type
+    )
+    flag = np.ascontiguousarray(np.broadcast_to(flag, (n,)))
+
+    routes = _routes(columns, engine, n)
+
+    result = {name: np.full(n, np.nan) for name in RESULT_COLUMNS[1:]}
+
+    for name in ENGINES:
+
+        rows = np.flatnonzero(routes == name)
+
+        if rows.size == 0:
+            continue
+
+        args = (S[rows], K[rows], T[rows], rate[rows])
+
+        if name == "iv":
+            sigma = implied_volatility_batch(
+                column("market_price")[rows], *args, carry[rows], flag[rows]
+            )
+            result["impliedVol"][rows] = sigma
+        else:
+            sigma = column("sigma")[rows]
+
+        if name in ("bs", "iv"):
+            values = price_and_greeks_batch(*args, sigma, carry[rows], flag[rows])
+        elif name == "binomial":
+            values = binomial_greeks_batch(
+                *args, sigma, carry[rows],
+                steps=steps,
+                option_type=flag[rows],
+                american=True
+            )
+        else:
+            # Same seed for every chunk: common random numbers file-wide,
+            # so results do not depend on chunking or worker count
+            values = monte_carlo_option_price_batch(
+                *args, sigma, carry[rows],
+                option_type=flag[rows],
+                simulations=simulations,
+                seed=seed
+            )
+
+        for key, array in values.items():
+            result[key][rows] = array
+
+    return frame.assign(engine=routes.astype(str), **result)
+
+
+# -----------------------------------
+# Chunked reading and writing
+# -----------------------------------
+def read_chunks(path, chunk_size=CHUNK_ROWS, fmt=None):
+    """DataFrames of at most `chunk_size` rows from a CSV or Parquet file."""
+
+    fmt = _format_of(path, fmt)
+
+    if fmt == "csv":
+
+        # Fixed dtypes, so a column that is blank in one chunk and filled
+        # in the next has the same type in both
+        numeric = {name for key in NUMERIC_INPUTS for name in ALIASES[key]}
+        header = pd.read_csv(path, nrows=0).columns
+
+        yield from pd.read_csv(
+            path,
+            chunksize=chunk_size,
+            dtype={name: np.float64 if name in numeric else str for name in header}
+        )
+        return
+
+    import pyarrow.parquet as pq
+
+    with pq.ParquetFile(path) as source:
+        for batch in source.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+
+def _parquet_schema(frame):
+    """
+    Arrow schema of the first chunk, with columns that are entirely
+    blank in it typed as strings rather than null.
+    """
+
+    import pyarrow as pa
+
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pa.string()))
+
+    return schema
+
+
+def _conform(frame, schema):
+    """
+    `frame` with every column converted to the pandas dtype matching its
+    schema field, through the nullable dtypes, so a column whose
+    inferred dtype changes between chunks (blanks read as float in one
+    chunk, integers or text in the next) still fits the first schema.
+    """
+
+    import pyarrow as pa
+
+    columns = {}
+
+    for field in schema:
+
+        values = frame[field.name]
+
+        if pa.types.is_integer(field.type):
+            values = values.astype("Int64")
+        elif pa.types.is_floating(field.type):
+            values = pd.to_numeric(values).astype(np.float64)
+        elif pa.types.is_boolean(field.type):
+            values = values.astype("boolean")
+        elif pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            values = values.astype("string")
+
+        columns[field.name] = values
+
+    return pd.DataFrame(columns)
+
+
+class ChunkWriter:
+    """
+    Appends DataFrames to one CSV or Parquet file. Chunks go to a
+    temporary file that replaces `path` on close(); abort() discards it
+    instead, so readers never see a half-written result and a failed
+    run leaves any earlier output in place. Parquet chunks are
+    conformed to the first chunk's schema.
+    """
+
+    def __init__(self, path, fmt=None):
+
+        self.path = path
+        self.fmt = _format_of(path, fmt)
+        self.rows = 0
+
+        self._tmp = path + ".tmp"
+        self._writer = None
+        self._schema = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, frame):
+
+        if self.fmt == "csv":
+            frame.to_csv(self._tmp, mode="w" if self.rows == 0 else "a",
+                         header=self.rows == 0, index=False)
+
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._writer is None:
+                self._schema = _parquet_schema(frame)
+                self._writer = pq.ParquetWriter(self._tmp, self._schema)
+
+            self._writer.write_table(pa.Table.from_pandas(
+                _conform(frame, self._schema), schema=self._schema, preserve_index=False
+            ))
+
+        self.rows += len(frame)
+
+    def close(self):
+        """Publish the chunks written so far as `path`."""
+
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+        if os.path.exists(self._tmp):
+            os.replace(self._tmp, self.path)
+
+    def abort(self):
+        """Discard the chunks written so far; `path` is left untouched."""
+
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+
+# -----------------------------------
+# Driver
+# -----------------------------------
+def price_file(
+    source,
+    out,
+    engine="auto",
+    chunk_size=CHUNK_ROWS,
+    workers=1,
+    in_format=None,
+    out_format=None,
+    **pricing
+) -> dict:
+    """
+    Price every contract of `source` into `out` chunk by chunk (keyword
+    arguments are passed to price_chunk). Returns the throughput
+    summary: rows, chunks, rows per engine, seconds and rows per second.
+    """
+
+    if engine not in ROUTES:
+        raise ValueError(f"engine must be one of {ROUTES}")
+
+    start = time.perf_counter()
+
+    writer = ChunkWriter(out, out_format)
+    counts = dict.fromkeys(ENGINES, 0)
+    chunks = 0
+
+    def finish(priced):
+
+        nonlocal chunks
+
+        writer.write(priced)
+        chunks += 1
+
+        for name, count in priced["engine"].value_counts().items():
+            counts[name] += int(count)
+
+    reader = read_chunks(source, chunk_size, in_format)
+
+    try:
+        if workers <= 1:
+            for frame in reader:
+                finish(price_chunk(frame, engine, **pricing))
+
+        else:
+            # Bounded in-flight chunks keep memory flat; results are
+            # collected in submission order so the output keeps the input's
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+
+                pending = deque()
+
+                for frame in reader:
+
+                    pending.append(pool.submit(price_chunk, frame, engine, **pricing))
+
+                    if len(pending) >= 2 * workers:
+                        finish(pending.popleft().result())
+
+                while pending:
+                    finish(pending.popleft().result())
+
+    except BaseException:
+        writer.abort()
+        raise
+
+    writer.close()
+
+    seconds = time.perf_counter() - start
+
+    return {
+        "rows": writer.rows,
+        "chunks": chunks,
+        "engines": {name: count for name, count in counts.items() if count},
+        "seconds": seconds,
+        "rows_per_second": writer.rows / seconds if seconds > 0 else float("nan")
+    }
+
+
+# -----------------------------------
+# Command line
+# -----------------------------------
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("input", help="CSV or Parquet file of contracts")
+    parser.add_argument("output", help="CSV or Parquet file to write")
+    parser.add_argument("--engine", choices=ROUTES, default="auto")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--input-format", choices=FORMATS, default=None,
+                        help="default: from the file extension")
+    parser.add_argument("--output-format", choices=FORMATS, default=None)
+    parser.add_argument("--rate", type=float, default=0.04,
+                        help="r for rows without one")
+    parser.add_argument("--q", type=float, default=0.0,
+                        help="dividend yield for rows without one")
+    parser.add_argument("--option-type", choices=("call", "put"), default="call")
+    parser.add_argument("--as-of", default=None,
+                        help="valuation date for expiry columns (default: now)")
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--simulations", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+
+    summary = price_file(
+        args.input,
+        args.output,
+        engine=args.engine,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        in_format=args.input_format,
+        out_format=args.output_format,
+        r=args.rate,
+        q=args.q,
+        option_type=args.option_type,
+        as_of=args.as_of,
+        steps=args.steps,
+        simulations=args.simulations,
+        seed=args.seed
+    )
+
+    engines = ", ".join(f"{name} {count:,}" for name, count in summary["engines"].items())
+
+    print(
+        f"{summary['rows']:,} contracts in {summary['chunks']} chunks "
+        f"({engines}) in {summary['seconds']:.1f}s: "
+        f"{summary['rows_per_second']:,.0f} rows/s",
+        file=sys.stderr
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,563 @@
+"""
+Local HTTP/JSON pricing service.
+
+Exposes the batch pricers to other services, many contracts per call:
+
+    POST /bs        S, K, T, r, sigma [, q, option_type]
+                    -> price, delta, gamma, vega, theta, rho
+    POST /binomial  S, K, T, r, sigma [, q, option_type, american, steps]
+                    -> price
+    POST /iv        price, S, K, T, r [, q, option_type]
+                    -> impliedVol
+    POST /mc        S, K, T, r, sigma [, q, option_type, simulations, seed]
+                    -> price, std_error
+    GET  /stats     per-endpoint latency histograms (priced requests)
+                    and batch sizes
+    GET  /health
+
+Contract inputs are JSON numbers or arrays (broadcast against each
+other); steps, simulations and seed are per-request options. Undefined
+results (e.g. prices outside the no-arbitrage bounds) come back as null.
+
+Requests for the same endpoint and options that arrive within
+`interval` seconds of each other are micro-batched: their contracts are
+concatenated into one vectorized call, run on a process pool, and the
+results split back per request.
+
+Run with:
+    python -m src.service.pricing_server --port 8766 --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.models.binomial_tree import binomial_option_price_batch
+from src.models.black_scholes import option_flag, price_and_greeks_batch
+from src.models.implied_vol import implied_volatility_batch
+from src.models.monte_carlo import monte_carlo_option_price_batch
+
+
+# Default micro-batch window, in seconds
+BATCH_INTERVAL = 0.005
+
+# A pending batch is flushed early once it holds this many contracts
+MAX_BATCH = 100_000
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"))
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+# -----------------------------------
+# Endpoints
+# -----------------------------------
+# Kernels run in the pool workers, so they are plain module functions
+# of whole arrays returning a dict of arrays.
+def _bs(S, K, T, r, sigma, q, option_type):
+
+    return price_and_greeks_batch(S, K, T, r, sigma, q, option_type)
+
+
+def _binomial(S, K, T, r, sigma, q, option_type, american, steps):
+
+    return {"price": binomial_option_price_batch(
+        S, K, T, r, sigma, q,
+        steps=steps,
+        option_type=option_type,
+        american=american
+    )}
+
+
+def _iv(price, S, K, T, r, q, option_type):
+
+    return {"impliedVol": implied_volatility_batch(price, S, K, T, r, q, option_type)}
+
+
+def _mc(S, K, T, r, sigma, q, option_type, simulations, seed):
+
+    return monte_carlo_option_price_batch(
+        S, K, T, r, sigma, q,
+        option_type=option_type,
+        simulations=simulations,
+        seed=seed
+    )
+
+
+Endpoint = namedtuple("Endpoint", ["kernel", "required", "defaults", "options"])
+
+_CONTRACT = ("S", "K", "T", "r", "sigma")
+_OPTIONAL = {"q": 0.0, "option_type": "call"}
+
+ENDPOINTS = {
+    "/bs": Endpoint(_bs, _CONTRACT, _OPTIONAL, {}),
+    "/binomial": Endpoint(_binomial, _CONTRACT, {**_OPTIONAL, "american": True}, {"steps": 100}),
+    "/iv": Endpoint(_iv, ("price", "S", "K", "T", "r"), _OPTIONAL, {}),
+    "/mc": Endpoint(_mc, _CONTRACT, _OPTIONAL, {"simulations": 20000, "seed": None})
+}
+
+
+def _evaluate(path, columns, options):
+
+    return ENDPOINTS[path].kernel(**columns, **options)
+
+
+def parse_request(path, body) -> tuple:
+    """
+    (columns, options) of a request body: every contract input as a 1-D
+    array of the common broadcast length, and the request options.
+    Raises ValueError for missing or malformed inputs.
+    """
+
+    endpoint = ENDPOINTS[path]
+
+    if not isinstance(body, dict):
+        raise ValueError("Request body must be a JSON object")
+
+    missing = [name for name in endpoint.required if name not in body]
+
+    if missing:
+        raise ValueError(f"Missing inputs: {', '.join(missing)}")
+
+    names = list(endpoint.required) + list(endpoint.defaults)
+
+    values = []
+
+    for name in names:
+
+        value = body.get(name, endpoint.defaults.get(name))
+
+        try:
+            if name == "option_type":
+                # Labels become +1 / -1 flags here, so bad ones are a 400
+                values.append(np.atleast_1d(option_flag(value)))
+            else:
+                values.append(np.atleast_1d(np.asarray(value, dtype=np.float64)))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid {name}")
+
+        if values[-1].ndim != 1:
+            raise ValueError(f"{name} must be a number or a flat array")
+
+    try:
+        columns = dict(zip(names, (np.ascontiguousarray(x) for x in np.broadcast_arrays(*values))))
+    except ValueError:
+        raise ValueError("Input arrays have different lengths")
+
+    options = {}
+
+    for name, default in endpoint.options.items():
+
+        value = body.get(name, default)
+
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value <= 0):
+            raise ValueError(f"{name} must be a positive integer")
+
+        options[name] = value
+
+    return columns, options
+
+
+def _json_values(values):
+
+    values = np.asarray(values, dtype=np.float64)
+
+    return [v if np.isfinite(v) else None for v in values.tolist()]
+
+
+# -----------------------------------
+# Latency histograms
+# -----------------------------------
+class LatencyHistogram:
+    """Request counts per latency bucket (LATENCY_BUCKETS_MS)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+
+        self.buckets = np.asarray(buckets, dtype=np.float64)
+        self.counts = np.zeros(self.buckets.size, dtype=np.int64)
+
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @property
+    def count(self):
+
+        return int(self.counts.sum())
+
+    def observe(self, seconds):
+
+        ms = 1e3 * seconds
+
+        self.counts[np.searchsorted(self.buckets, ms)] += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, level) -> float:
+        """Upper bound of the bucket holding the `level` quantile."""
+
+        if self.count == 0:
+            return float("nan")
+
+        rank = np.searchsorted(np.cumsum(self.counts), level * self.count)
+
+        return float(min(self.buckets[rank], self.max_ms))
+
+    def summary(self) -> dict:
+
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "p50_ms": self.quantile(0.5) if self.count else None,
+            "p99_ms": self.quantile(0.99) if self.count else None,
+            "max_ms": self.max_ms,
+            "buckets": {
+                ("+Inf" if np.isinf(le) else f"{le:g}"): int(n)
+                for le, n in zip(self.buckets, np.cumsum(self.counts))
+            }
+        }
+
+
+# -----------------------------------
+# Micro-batching
+# -----------------------------------
+class MicroBatcher:
+    """
+    Coalesces concurrent calls of one endpoint. The first request of a
+    batch opens an `interval` window; requests with the same options
+    that arrive in it join the batch, which then runs as one kernel call
+    on `executor` (None = the loop's default thread pool).
+    """
+
+    def __init__(self, path, executor=None, interval=BATCH_INTERVAL, max_batch=MAX_BATCH):
+
+        self.path = path
+        self.executor = executor
+        self.interval = interval
+        self.max_batch = max_batch
+
+        self.batches = 0
+        self.contracts = 0
+
+        self._pending = {}
+
+    async def submit(self, columns, options) -> dict:
+
+        loop = asyncio.get_running_loop()
+
+        key = tuple(sorted(options.items()))
+        future = loop.create_future()
+
+        batch = self._pending.get(key)
+
+        if batch is None:
+            batch = self._pending[key] = {"items": [], "size": 0}
+            loop.create_task(self._flush_later(key, batch))
+
+        batch["items"].append((columns, future))
+        batch["size"] += len(next(iter(columns.values())))
+
+        if batch["size"] >= self.max_batch:
+            del self._pending[key]
+            loop.create_task(self._run(batch, dict(key)))
+
+        return await future
+
+    async def _flush_later(self, key, batch):
+
+        await asyncio.sleep(self.interval)
+
+        # Already flushed if it filled up during the window
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+            await self._run(batch, dict(key))
+
+    async def _run(self, batch, options):
+
+        items = batch["items"]
+
+        sizes = [len(next(iter(columns.values()))) for columns, _ in items]
+        columns = {
+            name: np.concatenate([c[name] for c, _ in items])
+            for name in items[0][0]
+        }
+
+        self.batches += 1
+        self.contracts += sum(sizes)
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self.executor, _evaluate, self.path, columns, options
+            )
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offsets = np.cumsum([0] + sizes)
+
+        for (_, future), start, stop in zip(items, offsets[:-1], offsets[1:]):
+            if not future.done():
+                future.set_result({
+                    name: np.asarray(values)[start:stop] for name, values in result.items()
+                })
+
+
+# -----------------------------------
+# Server
+# -----------------------------------
+class PricingServer:
+    """
+    asyncio HTTP/1.1 server (keep-alive, JSON bodies) over the batch
+    pricers. `workers` pool processes run the kernels (None = one per
+    CPU, 0 = threads of the event loop's process, for tests).
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        workers=None,
+        interval=BATCH_INTERVAL,
+        max_batch=MAX_BATCH
+    ):
+
+        self.host = host
+        self.port = port
+        self.workers = os.cpu_count() if workers is None else workers
+        self.interval = interval
+        self.max_batch = max_batch
+
+        self.latency = {path: LatencyHistogram() for path in ENDPOINTS}
+        self.batchers = {}
+
+        self._pool = None
+        self._server = None
+
+    @property
+    def base_url(self):
+
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+
+        if self.workers > 0:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        self.batchers = {
+            path: MicroBatcher(path, self._pool, self.interval, self.max_batch)
+            for path in ENDPOINTS
+        }
+
+        self._server = await asyncio.start_server(self._connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+        return self
+
+    async def close(self):
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    def stats(self) -> dict:
+
+        return {
+            path: {
+                **self.latency[path].summary(),
+                "batches": self.batchers[path].batches if self.batchers else 0,
+                "contracts": self.batchers[path].contracts if self.batchers else 0
+            }
+            for path in ENDPOINTS
+        }
+
+    async def handle(self, method, path, body) -> tuple:
+        """(status, payload) of one request."""
+
+        if path == "/health" and method == "GET":
+            return 200, {"status": "ok"}
+
+        if path == "/stats" and method == "GET":
+            return 200, self.stats()
+
+        if path not in ENDPOINTS:
+            return 404, {"error": f"Unknown endpoint {path}"}
+
+        if method != "POST":
+            return 405, {"error": f"{path} expects POST"}
+
+        start = time.perf_counter()
+
+        try:
+            columns, options = parse_request(path, json.loads(body or b"null"))
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+        try:
+            result = await self.batchers[path].submit(columns, options)
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+        payload = {name: _json_values(values) for name, values in result.items()}
+
+        self.latency[path].observe(time.perf_counter() - start)
+
+        return 200, payload
+
+    async def _connection(self, reader, writer):
+
+        try:
+            while True:
+
+                request_line = await reader.readline()
+
+                if not request_line:
+                    break
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, False)
+                    break
+
+                headers = {}
+
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = headers.get("content-length", "0")
+
+                # Digits only: no sign, so never negative
+                if not (length.isascii() and length.isdigit()):
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length"}, False)
+                    break
+
+                length = int(length)
+
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Request body too large"}, False)
+                    break
+
+                body = await reader.readexactly(length) if length else b""
+
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and version == "HTTP/1.1"
+                )
+
+                status, payload = await self.handle(method, target.split("?")[0], body)
+
+                await self._respond(writer, status, payload, keep_alive)
+
+                if not keep_alive:
+                    break
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+
+        body = json.dumps(payload).encode()
+
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n".encode() + body
+        )
+
+        await writer.drain()
+
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error"
+}
+
+
+def start_pricing_server(host="127.0.0.1", port=0, workers=None, interval=BATCH_INTERVAL):
+    """
+    Run a PricingServer on an event loop in a daemon thread. Port 0
+    picks a free port; the URL is `server.base_url` and
+    `server.stop()` shuts it down.
+    """
+
+    server = PricingServer(host, port, workers, interval)
+
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def target():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+        loop.run_until_complete(server.close())
+        loop.close()
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    started.wait()
+
+    def stop(timeout=None):
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+
+    server.stop = stop
+
+    return server
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="pricing processes (default: one per CPU)")
+    parser.add_argument("--batch-ms", type=float, default=1e3 * BATCH_INTERVAL,
+                        help="micro-batch window")
+
+    args = parser.parse_args(argv)
+
+    server = PricingServer(args.host, args.port, args.workers, args.batch_ms / 1000)
+
+    async def serve():
+        await server.start()
+        print(f"Pricing service on {server.base_url} ({server.workers} workers)")
+        try:
+            await server._server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,170 @@ import plotly.graph_objects as go
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
+import pandas as pd
+
+
+# Most candles drawn for one price history
+MAX_BARS = 1500
+
+# Most points drawn per line series
+MAX_LINE_POINTS = 5000
+
+# Series longer than this are drawn with WebGL
+WEBGL_POINTS = 1000
+
+# Candle widths tried in order, with their approximate length; the first
+# one giving at most MAX_BARS candles over the history is used
+OHLC_RULES = (
+    ("1min", pd.Timedelta(minutes=1)),
+    ("5min", pd.Timedelta(minutes=5)),
+    ("15min", pd.Timedelta(minutes=15)),
+    ("30min", pd.Timedelta(minutes=30)),
+    ("1h", pd.Timedelta(hours=1)),
+    ("4h", pd.Timedelta(hours=4)),
+    ("1D", pd.Timedelta(days=1)),
+    ("W-FRI", pd.Timedelta(days=7)),
+    ("MS", pd.Timedelta(days=31)),
+    ("QS", pd.Timedelta(days=92)),
+    ("YS", pd.Timedelta(days=366))
+)
+
+OHLC_AGGREGATES = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Volume": "sum"
+}
+
+
+# ----------------------------
+# Downsampling
+# ----------------------------
+# Charts are reduced on the server so their payload stays bounded
+# whatever the size of the data: price histories are resampled into
+# wider candles, line series are thinned with LTTB.
+def _date_column(frame):
+
+    for name in ("Date", "Datetime"):
+        if name in frame.columns:
+            return name
+
+    return None
+
+
+def resample_ohlc(hist_df, max_bars=MAX_BARS):
+    """
+    OHLCV history with at most `max_bars` candles: the finest width of
+    OHLC_RULES that fits the span of the Date (or Datetime) column, or
+    equal row buckets when there are no dates. Empty periods (nights,
+    weekends) are dropped.
+    """
+
+    if len(hist_df) <= max_bars:
+        return hist_df
+
+    date = _date_column(hist_df)
+    columns = {name: how for name, how in OHLC_AGGREGATES.items() if name in hist_df.columns}
+
+    if date is not None:
+
+        dates = pd.to_datetime(hist_df[date])
+        span = dates.max() - dates.min()
+
+        for rule, width in OHLC_RULES:
+            if span // width < max_bars:
+                bars = (
+                    hist_df.assign(**{date: dates})
+                    .resample(rule, on=date)
+                    .agg(columns)
+                    .dropna(subset=["Close"])
+                )
+                if len(bars) <= max_bars:
+                    return bars.reset_index()
+
+    # Fixed number of rows per candle, labelled with its first date
+    size = -(-len(hist_df) // max_bars)
+    buckets = np.arange(len(hist_df)) // size
+
+    if date is not None:
+        columns = {date: "first", **columns}
+
+    return hist_df.groupby(buckets).agg(columns).reset_index(drop=True)
+
+
+def lttb(x, y, n_out):
+    """
+    Indices of the `n_out` points of (x, y), x sorted, kept by
+    Largest-Triangle-Three-Buckets: first and last points, then in each
+    bucket the point making the largest triangle with the point kept
+    before it and the mean of the next bucket.
+    """
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    n = x.size
+
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Interior points split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+
+    kept = np.empty(n_out, dtype=np.intp)
+    kept[0], kept[-1] = 0, n - 1
+
+    a = 0
+
+    for i in range(n_out - 2):
+
+        lo, hi = edges[i], edges[i + 1]
+
+        if i + 2 < edges.size:
+            cx = x[hi:edges[i + 2]].mean()
+            cy = y[hi:edges[i + 2]].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+
+        area = np.abs(
+            (x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a])
+        )
+
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+
+    return kept
+
+
+def downsample_line(x, y, max_points=MAX_LINE_POINTS):
+    """(x, y) sorted by x, without non-finite y, thinned to `max_points`."""
+
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+
+    keep = np.isfinite(y)
+    x, y = x[keep], y[keep]
+
+    order = np.argsort(x, kind="stable")
+    x, y = x[order], y[order]
+
+    if x.size <= max_points:
+        return x, y
+
+    position = x.astype("datetime64[ns]").astype(np.int64) if x.dtype.kind == "M" else x
+
+    kept = lttb(position, y, max_points)
+
+    return x[kept], y[kept]
+
+
+def _scatter(n_points, **kwargs):
+
+    trace = go.Scattergl if n_points > WEBGL_POINTS else go.Scatter
+
+    return trace(**kwargs)
+
 
 # ----------------------------
 # 3D Volatility Surface
@@ -36,14 +200,15 @@ def plot_volatility_surface(strikes, expiries, iv_matrix, ticker):
 # ----------------------------
 def plot_volatility_smile(options_df, ticker, expiry):
 
-    df = options_df.dropna(subset=["impliedVol"])
+    strikes, iv = downsample_line(options_df["strike"], options_df["impliedVol"])
 
     fig = go.Figure()
 
     fig.add_trace(
-        go.Scatter(
-            x=df["strike"],
-            y=df["impliedVol"],
+        _scatter(
+            strikes.size,
+            x=strikes,
+            y=iv,
             mode="lines+markers"
         )
     )
@@ -203,7 +368,12 @@ def plot_vega_curve(S, K, T, r, q, option_type):
 # -----------------------------------
 # Historic Price + Volume plot
 # -----------------------------------
-def plot_price_volume_chart(hist_df, ticker):
+def plot_price_volume_chart(hist_df, ticker, max_bars=MAX_BARS):
+
+    hist_df = resample_ohlc(hist_df, max_bars)
+
+    date = _date_column(hist_df)
+    x = hist_df.index if date is None else hist_df[date]
 
     fig = make_subplots(
         rows=2,
@@ -216,7 +386,7 @@ def plot_price_volume_chart(hist_df, ticker):
     # Candlestick
     fig.add_trace(
         go.Candlestick(
-            x=hist_df.index,
+            x=x,
             open=hist_df["Open"],
             high=hist_df["High"],
             low=hist_df["Low"],
@@ -230,7 +400,7 @@ def plot_price_volume_chart(hist_df, ticker):
     # Volume
     fig.add_trace(
         go.Bar(
-            x=hist_df.index,
+            x=x,
             y=hist_df["Volume"],
             name="Volume"
         ),
@@ -257,25 +427,29 @@ def plot_model_errors(results_df, ticker, expiry):
 
     fig = go.Figure()
 
-    # Black-Scholes Error
-    fig.add_trace(
-        go.Scatter(
-            x=results_df["strike"],
-            y=results_df["bs_error"],
-            mode="lines+markers",
-            name="Market − Black-Scholes"
-        )
-    )
+    errors = [
+        ("bs_error", "Market − Black-Scholes"),
+        ("binomial_error", "Market − Binomial"),
+        ("heston_error", "Market − Heston")
+    ]
 
-    # Binomial Error
-    fig.add_trace(
-        go.Scatter(
-            x=results_df["strike"],
-            y=results_df["binomial_error"],
-            mode="lines+markers",
-            name="Market − Binomial"
+    # Heston errors are only there when a calibration was available
+    for column, name in errors:
+
+        if column not in results_df.columns:
+            continue
+
+        strikes, error = downsample_line(results_df["strike"], results_df[column])
+
+        fig.add_trace(
+            _scatter(
+                strikes.size,
+                x=strikes,
+                y=error,
+                mode="lines+markers",
+                name=name
+            )
         )
-    )
 
     fig.add_hline(y=0, line_dash="dash")
 
@@ -286,4 +460,56 @@ def plot_model_errors(results_df, ticker, expiry):
         template="plotly_dark"
     )
 
-    return fig
\ No newline at end of file
+    return fig
+
+
+# ----------------------------
+# Scenario P&L Heatmap
+# ----------------------------
+def plot_scenario_heatmap(table, title):
+
+    fig = go.Figure(
+        data=go.Heatmap(
+            x=100 * table.columns.to_numpy(),
+            y=100 * table.index.to_numpy(),
+            z=table.to_numpy(),
+            colorscale="RdYlGn",
+            zmid=0,
+            colorbar=dict(title="P&L")
+        )
+    )
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="Spot Shock (%)",
+        yaxis_title="Vol Shock (vol points)",
+        template="plotly_dark"
+    )
+
+    return fig
+
+
+def plot_pnl_distribution(pnl, var, es, title):
+
+    fig = go.Figure(
+        data=go.Histogram(
+            x=pnl,
+            nbinsx=100,
+            marker_color="steelblue",
+            name="Scenario P&L"
+        )
+    )
+
+    fig.add_vline(x=-var, line_dash="dash", line_color="orange",
+                  annotation_text="VaR")
+    fig.add_vline(x=-es, line_dash="dash", line_color="red",
+                  annotation_text="ES")
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="P&L",
+        yaxis_title="Scenarios",
+        template="plotly_dark"
+    )
+
+    return fig
@@ -0,0 +1,109 @@
+import sys
+import os
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.attribution import (
+    attribute,
+    load_snapshot,
+    run_attribution,
+    value_snapshot
+)
+from src.data.snapshots import write_snapshot
+from src.data.synthetic import SyntheticProvider, ticker_params
+
+
+try:
+    import pyarrow  # noqa: F401
+    fmt = "parquet"
+except ImportError:
+    fmt = "csv"
+
+
+# ----------------------------
+# Synthetic market drifting day by day
+# ----------------------------
+class DriftingProvider(SyntheticProvider):
+    """Spot moves by `move` per day since 2026-01-05, vols stay on the SSVI curve."""
+
+    def __init__(self, as_of, move=0.01, **kwargs):
+
+        super().__init__(as_of=as_of, noise=0.0, spread=0.0, **kwargs)
+        self.days = (self.as_of - pd.Timestamp("2026-01-05").date()).days
+        self.move = move
+
+    def _params(self, ticker):
+
+        params = dict(ticker_params(ticker, self.seed))
+        params["spot"] = params["spot"] * (1 + self.move) ** self.days
+
+        return params
+
+    def get_expiry_dates(self, ticker):
+
+        return ["2026-02-20", "2026-03-20", "2026-06-18"]
+
+
+tickers = ["SYN00", "SYN01", "SYN02"]
+dates = ["2026-01-05", "2026-01-06", "2026-01-07", "2026-01-08"]
+
+with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as out:
+
+    for date in dates:
+        write_snapshot(
+            DriftingProvider(date),
+            tickers, root, as_of=date, expiries=None
+        )
+
+    # ----------------------------
+    # Snapshot valuation and explain on one day pair
+    # ----------------------------
+    before = value_snapshot(load_snapshot(root, dates[0]))
+    after = value_snapshot(load_snapshot(root, dates[1]))
+
+    report = attribute(before, after)
+
+    print(f"{len(report)} contracts on both days")
+    assert len(report) > 0.5 * len(before)
+
+    residual = report["unexplained"].abs().sum() / report["actual"].abs().sum()
+    print(f"Unexplained share: {residual:.4f}")
+    assert residual < 0.1
+
+    # Components add up
+    parts = report[[c for c in report.columns if c.endswith("_pnl")]].sum(axis=1)
+    assert np.allclose(parts, report["explained"])
+    assert np.allclose(report["explained"] + report["unexplained"], report["actual"])
+
+    # Spot up 1%: calls gain on delta, puts lose
+    calls = report[report["optionType"] == "call"]
+    assert (calls["delta_pnl"] > 0).all()
+    assert (report.loc[report["optionType"] == "put", "delta_pnl"] < 0).all()
+
+    # ----------------------------
+    # Full job over the series
+    # ----------------------------
+    start = time.perf_counter()
+    summary = run_attribution(root, out, fmt=fmt)
+    elapsed = time.perf_counter() - start
+
+    print(summary[["date", "ticker", "delta_pnl", "gamma_pnl", "theta_pnl",
+                   "actual", "unexplained", "unexplained_ratio"]])
+    print(f"{len(dates)} snapshots in {elapsed:.2f}s")
+
+    assert sorted(summary["date"].unique()) == dates[1:]
+    assert (summary["unexplained_ratio"] < 0.1).all()
+
+    written = sorted(os.listdir(out))
+    assert written == ["_summary.csv"] + [f"date={d}.{fmt}" for d in dates[1:]]
+
+print("Attribution OK")
@@ -0,0 +1,206 @@
+import sys
+import os
+import tempfile
+import tracemalloc
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+
+from src.models.binomial_tree import binomial_greeks_batch
+from src.models.black_scholes import price_and_greeks_batch
+from src.models.monte_carlo import monte_carlo_option_price_batch
+from src.service.batch_pricer import main, price_chunk, price_file
+
+
+rng = np.random.default_rng(0)
+
+
+def contracts(n, seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    return pd.DataFrame({
+        "id": np.arange(n),
+        "spot": 100.0,
+        "strike": rng.uniform(70, 130, n).round(1),
+        "T": rng.uniform(0.05, 1.5, n),
+        "vol": rng.uniform(0.1, 0.5, n),
+        "optionType": np.where(rng.random(n) < 0.5, "call", "put"),
+        "style": np.where(rng.random(n) < 0.1, "american", "european")
+    })
+
+
+# ----------------------------
+# Routing inside a chunk
+# ----------------------------
+frame = contracts(400)
+
+priced = price_chunk(frame, r=0.03, steps=50)
+
+american = frame["style"].to_numpy() == "american"
+
+assert (priced["engine"].to_numpy() == np.where(american, "binomial", "bs")).all()
+
+bs = price_and_greeks_batch(
+    100.0, frame["strike"], frame["T"], 0.03, frame["vol"], 0.0, frame["optionType"]
+)
+lattice = binomial_greeks_batch(
+    100.0, frame["strike"], frame["T"], 0.03, frame["vol"], 0.0,
+    steps=50, option_type=frame["optionType"].to_numpy(), american=True
+)
+
+for name in ("price", "delta", "gamma", "vega", "theta", "rho"):
+    assert np.allclose(priced[name].to_numpy()[~american], bs[name][~american]), name
+    assert np.allclose(priced[name].to_numpy()[american], lattice[name][american]), name
+
+# Market prices without vols go to iv, with Greeks at the implied vol
+quotes = frame.drop(columns=["vol", "style"]).assign(mid=bs["price"])
+quotes.loc[::3, "mid"] = np.nan
+
+implied = price_chunk(quotes, r=0.03)
+
+has_quote = quotes["mid"].notna().to_numpy()
+sensitive = has_quote & (bs["vega"] > 0.01)
+
+assert (implied["engine"] == "iv").all()
+assert implied.loc[~has_quote, ["impliedVol", "price"]].isna().all().all()
+assert np.allclose(
+    implied["impliedVol"].to_numpy()[sensitive], frame["vol"].to_numpy()[sensitive], atol=1e-5
+)
+assert np.allclose(implied["price"].to_numpy()[sensitive], bs["price"][sensitive], atol=1e-6)
+
+# A forced engine, and an engine column
+mc = price_chunk(frame, engine="mc", r=0.03, simulations=2000, seed=3)
+reference = monte_carlo_option_price_batch(
+    100.0, frame["strike"], frame["T"], 0.03, frame["vol"], 0.0,
+    option_type=frame["optionType"], simulations=2000, seed=3
+)
+assert np.allclose(mc["price"], reference["price"])
+assert mc["delta"].isna().all() and mc["std_error"].notna().all()
+
+mixed = frame.assign(engine=np.resize(["BS", "mc", "binomial"], len(frame)))
+assert set(price_chunk(mixed, simulations=1000)["engine"]) == {"bs", "mc", "binomial"}
+
+for bad, message in (
+    (frame.drop(columns="vol"), "Missing input column sigma"),
+    (frame.drop(columns="T"), "Missing input column T"),
+    (frame.assign(engine="heston"), "Unknown engines")
+):
+    try:
+        price_chunk(bad)
+        raise AssertionError(f"Accepted: {message}")
+    except ValueError as e:
+        assert message in str(e), e
+
+# Expiry dates instead of T
+dated = frame.drop(columns="T").assign(expiry="2025-12-19")
+assert np.allclose(
+    price_chunk(dated, as_of="2025-06-20")["price"],
+    price_chunk(frame.assign(T=182 / 365))["price"]
+)
+
+
+# ----------------------------
+# Files, chunk by chunk
+# ----------------------------
+with tempfile.TemporaryDirectory() as root:
+
+    source = os.path.join(root, "contracts.csv")
+    contracts(50000, seed=1).to_csv(source, index=False)
+
+    out = os.path.join(root, "out", "priced.csv")
+    summary = price_file(source, out, chunk_size=7000, steps=50)
+
+    print(
+        f"{summary['rows']} rows, {summary['chunks']} chunks, "
+        f"{summary['rows_per_second']:,.0f} rows/s, {summary['engines']}"
+    )
+
+    result = pd.read_csv(out)
+
+    assert summary["rows"] == 50000 and summary["chunks"] == 8
+    assert sum(summary["engines"].values()) == 50000
+    assert (result["id"].to_numpy() == np.arange(50000)).all()
+    assert not os.path.exists(out + ".tmp")
+
+    # Chunking does not change results
+    whole = price_chunk(pd.read_csv(source), steps=50)
+    assert np.allclose(result["price"], whole["price"])
+
+    # Worker processes give the same file, in input order
+    parallel = os.path.join(root, "parallel.csv")
+    price_file(source, parallel, chunk_size=7000, workers=2, steps=50)
+
+    assert pd.read_csv(parallel).equals(result)
+
+    # Memory follows the chunk size, not the file size
+    def peak(rows):
+
+        path = os.path.join(root, f"size{rows}.csv")
+        contracts(rows, seed=2).assign(style="european").to_csv(path, index=False)
+
+        tracemalloc.start()
+        price_file(path, os.path.join(root, f"priced{rows}.csv"), chunk_size=5000)
+        _, high = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return high
+
+    small, large = peak(20000), peak(200000)
+
+    print(f"Peak traced memory: 20k rows {small / 1e6:.1f}MB, 200k rows {large / 1e6:.1f}MB")
+
+    assert large < 2 * small
+
+    # A failing run leaves the previous output as it was
+    broken = os.path.join(root, "broken.csv")
+    contracts(3000, seed=4).assign(
+        engine=["bs"] * 2500 + ["heston"] * 500
+    ).to_csv(broken, index=False)
+
+    try:
+        price_file(broken, out, chunk_size=1000)
+        raise AssertionError("Unknown engine accepted")
+    except ValueError as e:
+        assert "Unknown engines" in str(e)
+
+    assert pd.read_csv(out).equals(result)
+    assert not os.path.exists(out + ".tmp")
+
+    # Parquet output keeps the first chunk's schema when a pass-through
+    # column is blank in one chunk and filled in the next
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        pyarrow = None
+
+    if pyarrow is not None:
+
+        drifting = contracts(2000, seed=5).assign(contractSymbol="")
+        drifting.loc[1000:, "contractSymbol"] = [f"C{i}" for i in range(1000)]
+        drifting.loc[:999, "id"] = np.nan
+
+        source_csv = os.path.join(root, "drifting.csv")
+        drifting.to_csv(source_csv, index=False)
+
+        parquet_out = os.path.join(root, "drifting.parquet")
+        price_file(source_csv, parquet_out, chunk_size=1000)
+
+        written = pd.read_parquet(parquet_out)
+
+        assert len(written) == 2000
+        assert written["contractSymbol"].iloc[:1000].isna().all()
+        assert (written["contractSymbol"].iloc[1000:] == [f"C{i}" for i in range(1000)]).all()
+
+    # Command line
+    cli_out = os.path.join(root, "cli.csv")
+    assert main([source, cli_out, "--engine", "bs", "--chunk-size", "20000"]) == 0
+    assert (pd.read_csv(cli_out)["engine"] == "bs").all()
+
+print("Batch pricer OK")
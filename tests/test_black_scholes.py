@@ -4,6 +4,8 @@ import os
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, PROJECT_ROOT)
 
+import numpy as np
+
 from src.models.black_scholes import *
 
 # Test parameters
@@ -22,4 +24,25 @@ print("put price:",
 print("Greeks:",
       black_scholes_greeks(S, K, T, r, sigma, q, "call"))
 print("Greeks:",
-      black_scholes_greeks(S, K, T, r, sigma, q, "put"))
\ No newline at end of file
+      black_scholes_greeks(S, K, T, r, sigma, q, "put"))
+
+# Put–call parity: C - P = S e^(-qT) - K e^(-rT), with and without carry
+for carry in (0.0, 0.03):
+    for strike in (80, 100, 120):
+
+        call = black_scholes_price(S, strike, T, r, sigma, carry, "call")
+        put = black_scholes_price(S, strike, T, r, sigma, carry, "put")
+
+        assert put > 0
+        assert np.isclose(
+            call - put,
+            S * np.exp(-carry * T) - strike * np.exp(-r * T)
+        )
+
+        # The scalar and vectorized prices agree
+        assert np.isclose(
+            put,
+            black_scholes_price_batch(S, strike, T, r, sigma, carry, "put")
+        )
+
+print("Put-call parity OK")
@@ -0,0 +1,75 @@
+import sys
+import os
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.analysis.chain_analytics import chain_analytics
+from src.analysis.model_comparison import compare_models
+from src.analysis.smile import smile_from_analytics
+from src.data.data_scraper import get_full_chain, get_risk_free_rate, set_provider
+from src.data.synthetic import SyntheticProvider
+from src.models.implied_vol import implied_volatility_chain
+
+
+set_provider(SyntheticProvider(n_strikes=81))
+
+try:
+
+    ticker = "NVDA"
+
+    full = get_full_chain(ticker)
+    r = get_risk_free_rate()
+
+    print(f"{len(full)} contracts across {full['expiry'].nunique()} expiries")
+
+
+    # ----------------------------
+    # Whole chain in one pass
+    # ----------------------------
+    start = time.perf_counter()
+    table = chain_analytics(full, r=r, steps=200)
+    print(f"Chain analytics in {time.perf_counter() - start:.3f}s")
+
+    print(table.columns.tolist())
+    print("Contracts with an implied vol:", int(table["impliedVol"].notna().sum()))
+    print(table.groupby("expiry")[["rate", "carry"]].first().head())
+
+
+    # ----------------------------
+    # Same numbers as the per-expiry path
+    # ----------------------------
+    expiry = table["expiry"].unique()[3]
+    rows = table[(table["expiry"] == expiry) & (table["optionType"] == "call")]
+
+    S, T = rows["spot"].iloc[0], rows["T"].iloc[0]
+    rate, carry = rows["rate"].iloc[0], rows["carry"].iloc[0]
+
+    calls = full[(full["expiry"] == expiry) & (full["optionType"] == "call")]
+    calls = implied_volatility_chain(calls, S, T, rate, carry)
+    results = compare_models(calls, S, T, rate, carry, steps=200)
+
+    merged = results.merge(rows, on="strike", suffixes=("", "_table"))
+    print("Max binomial difference vs compare_models:",
+          np.max(np.abs(merged["binomial"] - merged["binomial_table"])))
+
+
+    # ----------------------------
+    # Pages read from the table
+    # ----------------------------
+    smile = smile_from_analytics(table[table["expiry"] == expiry])
+    print(f"Smile for {expiry}: {len(smile)} strikes")
+
+    print("Largest early-exercise premia:")
+    print(table.nlargest(3, "early_exercise")[
+        ["expiry", "optionType", "strike", "mid", "black_scholes", "binomial"]
+    ])
+
+finally:
+    set_provider(None)
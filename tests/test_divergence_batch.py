@@ -0,0 +1,92 @@
+import sys
+import os
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+import pandas as pd
+
+from src.analysis.divergence_batch import (
+    divergence_task,
+    list_ticker_expiries,
+    read_divergence,
+    run_divergence_batch
+)
+from src.data import data_scraper
+from src.data.synthetic import SyntheticProvider
+
+
+try:
+    import pyarrow  # noqa: F401
+    fmt = "parquet"
+except ImportError:
+    fmt = "csv"
+
+tickers = [f"SYN{i:02d}" for i in range(12)]
+
+provider = SyntheticProvider(as_of="2030-01-02")
+default = data_scraper.get_provider()
+
+with tempfile.TemporaryDirectory() as out:
+
+    manifest = run_divergence_batch(
+        tickers,
+        out,
+        provider=provider,
+        workers=2,
+        steps=100,
+        simulations=5000,
+        max_expiries=6,
+        fmt=fmt
+    )
+
+    print(manifest.describe())
+    print("Failed tasks:", int(manifest["error"].notna().sum()))
+
+    results = read_divergence(out, fmt=fmt)
+
+    print(results.shape)
+    print(results.columns.tolist())
+
+    # The provider is passed to the tasks, not installed process-wide
+    assert data_scraper.get_provider() is default
+
+    # Times to expiry run from the provider's date, not today
+    days = (results["expiry"].astype("datetime64[s]") - np.datetime64("2030-01-02")).dt.days
+    assert np.allclose(results["T"], days / 365)
+    assert os.path.isdir(os.path.join(out, "as_of=2030-01-02"))
+
+    errors = results.groupby("optionType")[
+        ["bs_error", "binomial_error", "mc_error"]
+    ].apply(lambda df: df.abs().median())
+
+    print("Median |model - market| by side:")
+    print(errors)
+
+    assert manifest["error"].isna().all()
+    assert len(manifest) == len(tickers) * 6
+    assert int(manifest["rows"].sum()) == len(results)
+
+    # Same rows as running every task serially in this process
+    r = provider.get_risk_free_rate()
+    serial = []
+
+    for ticker in tickers:
+        _, S, expiries = list_ticker_expiries(ticker, provider)
+        for expiry in expiries[:6]:
+            serial.append(divergence_task(
+                ticker, expiry, S, r, "2030-01-02", provider=provider,
+                steps=100, simulations=5000
+            )[0])
+
+    keys = ["ticker", "expiry", "optionType", "strike"]
+    serial = pd.concat(serial, ignore_index=True).sort_values(keys, ignore_index=True)
+    batch = results.sort_values(keys, ignore_index=True)[serial.columns]
+
+    pd.testing.assert_frame_equal(batch, serial, check_dtype=False)
@@ -0,0 +1,182 @@
+import sys
+import os
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from src.visualizations.plots import (
+    MAX_BARS,
+    MAX_LINE_POINTS,
+    downsample_line,
+    lttb,
+    plot_model_errors,
+    plot_price_volume_chart,
+    plot_volatility_smile,
+    resample_ohlc
+)
+
+
+rng = np.random.default_rng(0)
+
+
+# ----------------------------
+# LTTB against a plain loop
+# ----------------------------
+def naive_lttb(x, y, n_out):
+
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+
+    kept = [0]
+    a = 0
+
+    for i in range(n_out - 2):
+
+        lo = int(np.floor(i * every)) + 1
+        hi = int(np.floor((i + 1) * every)) + 1
+
+        nlo = hi
+        nhi = min(int(np.floor((i + 2) * every)) + 1, n - 1)
+
+        if i == n_out - 3:
+            cx, cy = x[n - 1], y[n - 1]
+        else:
+            cx, cy = np.mean(x[nlo:nhi]), np.mean(y[nlo:nhi])
+
+        best, best_area = lo, -1.0
+
+        for j in range(lo, hi):
+            area = abs((x[a] - cx) * (y[j] - y[a]) - (x[a] - x[j]) * (cy - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+
+        kept.append(best)
+        a = best
+
+    kept.append(n - 1)
+
+    return np.array(kept)
+
+
+x = np.sort(rng.uniform(0, 100, 5003))
+y = np.cumsum(rng.standard_normal(x.size))
+
+kept = lttb(x, y, 500)
+
+assert kept.size == 500
+assert kept[0] == 0 and kept[-1] == x.size - 1
+assert np.all(np.diff(kept) > 0)
+assert np.array_equal(kept, naive_lttb(x, y, 500))
+
+# Spikes survive, where taking every n-th point would miss them
+spiky = np.zeros(100000)
+spiky[[12345, 54321, 99000]] = [5.0, -7.0, 3.0]
+
+kept = lttb(np.arange(spiky.size), spiky, 1000)
+
+assert {12345, 54321, 99000} <= set(kept)
+assert np.array_equal(lttb(x[:10], y[:10], 50), np.arange(10))
+
+# Unsorted strikes with gaps in the vols
+strikes = rng.permutation(np.linspace(50, 150, 20000))
+vols = 0.2 + 0.001 * (strikes - 100) ** 2 / 100
+vols[::7] = np.nan
+
+xs, ys = downsample_line(strikes, vols, 800)
+
+assert xs.size == 800
+assert np.all(np.diff(xs) > 0) and np.all(np.isfinite(ys))
+
+
+# ----------------------------
+# OHLC resampling
+# ----------------------------
+minutes = pd.date_range("2024-01-02 09:30", periods=300000, freq="1min")
+close = 100 * np.exp(np.cumsum(0.0005 * rng.standard_normal(minutes.size)))
+
+intraday = pd.DataFrame({
+    "Datetime": minutes,
+    "Open": np.concatenate([[100.0], close[:-1]]),
+    "High": close * 1.001,
+    "Low": close * 0.999,
+    "Close": close,
+    "Volume": rng.integers(100, 1000, minutes.size)
+})
+
+start = time.perf_counter()
+bars = resample_ohlc(intraday)
+elapsed = time.perf_counter() - start
+
+print(f"{len(intraday)} rows -> {len(bars)} candles in {elapsed:.3f}s")
+
+assert 0 < len(bars) <= MAX_BARS
+assert list(bars.columns) == ["Datetime", "Open", "High", "Low", "Close", "Volume"]
+assert bars["Volume"].sum() == intraday["Volume"].sum()
+assert bars["High"].max() == intraday["High"].max()
+assert bars["Low"].min() == intraday["Low"].min()
+assert bars["Open"].iloc[0] == intraday["Open"].iloc[0]
+assert bars["Close"].iloc[-1] == intraday["Close"].iloc[-1]
+
+# Each candle spans whole periods of one width
+width = bars["Datetime"].diff().dropna().min()
+first = intraday[intraday["Datetime"] < bars["Datetime"].iloc[0] + width]
+assert bars["High"].iloc[0] == first["High"].max()
+assert bars["Volume"].iloc[0] == first["Volume"].sum()
+
+# Short histories are untouched
+daily = intraday.iloc[:250]
+assert resample_ohlc(daily) is daily
+
+# Without dates, equal row buckets
+undated = intraday.drop(columns="Datetime")
+buckets = resample_ohlc(undated, max_bars=1000)
+
+assert len(buckets) == 1000
+assert buckets["Volume"].sum() == undated["Volume"].sum()
+assert buckets["Open"].iloc[1] == undated["Open"].iloc[300]
+
+
+# ----------------------------
+# Chart payloads stay bounded
+# ----------------------------
+small = len(plot_price_volume_chart(intraday.iloc[:MAX_BARS], "TEST").to_json())
+large = len(plot_price_volume_chart(intraday, "TEST").to_json())
+
+print(f"Price chart payload: {MAX_BARS} rows {small / 1e3:.0f}kB, "
+      f"{len(intraday)} rows {large / 1e3:.0f}kB")
+
+assert large < 1.5 * small
+
+chain = pd.DataFrame({"strike": strikes, "impliedVol": vols})
+
+smile = plot_volatility_smile(chain, "TEST", "2024-06-21")
+
+assert isinstance(smile.data[0], go.Scattergl)
+assert len(smile.data[0].x) == MAX_LINE_POINTS
+
+errors = chain.assign(
+    bs_error=rng.standard_normal(strikes.size),
+    binomial_error=rng.standard_normal(strikes.size)
+)
+
+fig = plot_model_errors(errors, "TEST", "2024-06-21")
+
+assert len(fig.data) == 2
+assert all(isinstance(trace, go.Scattergl) for trace in fig.data)
+assert all(len(trace.x) <= MAX_LINE_POINTS for trace in fig.data)
+
+# Small series keep every point on SVG traces
+fig = plot_model_errors(errors.iloc[:40], "TEST", "2024-06-21")
+
+assert all(type(trace) is go.Scatter for trace in fig.data)
+assert all(len(trace.x) == 40 for trace in fig.data)
+
+print("Downsampling OK")
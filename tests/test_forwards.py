@@ -0,0 +1,95 @@
+import sys
+import os
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.data.option_chain import OptionChain
+from src.data.synthetic import iter_synthetic_chains, ticker_params
+from src.models.forwards import forward_carry, implied_forwards
+from src.models.implied_vol import option_chain_implied_vol
+
+
+tickers = [f"SYN{i:03d}" for i in range(200)]
+r = 0.04
+
+frame = next(iter_synthetic_chains(tickers, r=r, chunk_size=1_000_000))
+chain = OptionChain.from_frame(frame)
+
+print(chain)
+
+
+# ----------------------------
+# Forwards for every ticker and expiry in one pass
+# ----------------------------
+start = time.perf_counter()
+forwards = implied_forwards(chain)
+print(f"{len(forwards['T'])} expiries in {time.perf_counter() - start:.3f}s")
+
+true_q = np.array([ticker_params(t)["dividend_yield"] for t in forwards["ticker"]])
+
+print("Rate implied for:", f"{forwards['fitted'].mean():.1%}", "of expiries")
+print("Median |rate - r|:", np.nanmedian(np.abs(forwards["rate"] - r)))
+print("Median |carry - q|:", np.nanmedian(np.abs(forwards["carry"] - true_q)))
+
+assert len(forwards["T"]) == len(tickers) * frame["expiry"].nunique()
+assert forwards["fitted"].mean() > 0.9
+assert np.nanmedian(np.abs(forwards["rate"] - r)) < 1e-3
+assert np.nanmedian(np.abs(forwards["carry"] - true_q)) < 1e-3
+
+# With a known rate every expiry gets a forward
+forwards = implied_forwards(chain, r=r)
+print("Missing forwards with r given:", int(np.isnan(forwards["forward"]).sum()))
+
+assert not np.isnan(forwards["forward"]).any()
+
+# A callable fallback carry is only fetched when some row needs it
+fetched = []
+
+def quoted_yield():
+    fetched.append(True)
+    return 0.5
+
+rate, carry = forward_carry(chain, forwards, r, quoted_yield)
+assert fetched == []
+assert np.isfinite(carry).all()
+
+unfitted = implied_forwards(chain)
+missing = int(np.isnan(unfitted["forward"]).sum())
+print("Expiries without a forward (no r):", missing)
+
+rate, carry = forward_carry(chain, unfitted, r, quoted_yield)
+assert len(fetched) == (missing > 0)
+assert (carry == 0.5).any() == (missing > 0)
+
+
+# ----------------------------
+# Call and put vols agree once inverted at the implied carry
+# ----------------------------
+def call_put_gap(iv):
+
+    quotes = frame.assign(iv=iv)[np.abs(np.log(chain.moneyness)) < 0.1]
+    keys = ["ticker", "expiry", "strike"]
+
+    pairs = quotes[quotes["optionType"] == "call"].merge(
+        quotes[quotes["optionType"] == "put"], on=keys, suffixes=("_call", "_put")
+    )
+
+    return np.nanmedian(np.abs(pairs["iv_call"] - pairs["iv_put"]))
+
+
+iv_flat = option_chain_implied_vol(chain, r, 0.0)
+iv_parity = option_chain_implied_vol(chain, r, 0.0, forwards=forwards)
+
+print("Median call/put vol gap (q = 0):", call_put_gap(iv_flat))
+print("Median call/put vol gap (implied carry):", call_put_gap(iv_parity))
+
+# Parity forwards remove most of the gap left by ignoring the carry
+assert call_put_gap(iv_parity) < 0.1 * call_put_gap(iv_flat)
+assert call_put_gap(iv_parity) < 1e-3
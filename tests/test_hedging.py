@@ -0,0 +1,104 @@
+import sys
+import os
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.models.black_scholes import black_scholes_greeks, black_scholes_price
+from src.risk.hedging import bootstrap_paths, hedge_backtest, simulate_paths
+
+
+S, K, T, r, sigma, q = 100.0, 100.0, 0.25, 0.03, 0.2, 0.01
+
+
+# ----------------------------
+# 20k GBM paths, five frequencies in one run
+# ----------------------------
+paths = simulate_paths(S, T, sigma, mu=0.08, q=q, n_paths=20000, seed=0)
+
+assert paths.shape == (20000, 64)
+assert np.allclose(paths[:, 0], S)
+
+start = time.perf_counter()
+result = hedge_backtest(paths, K, T, r, sigma, q)
+elapsed = time.perf_counter() - start
+
+print(f"20000 paths x 63 steps x 5 frequencies in {elapsed:.3f}s")
+print(result["summary"])
+
+summary = result["summary"]
+
+# Hedging at the true vol: mean ~ 0, error grows like sqrt(interval)
+assert (summary["mean"].abs() < 3 * summary["std"] / np.sqrt(20000)).all()
+assert np.allclose(summary["std"] / summary["std"].iloc[0],
+                   np.sqrt(summary.index / summary.index[0]), rtol=0.15)
+
+
+# ----------------------------
+# Matches a path-by-path loop over black_scholes_greeks
+# ----------------------------
+def naive(path, every):
+
+    n = path.size - 1
+    dt = T / n
+
+    cash = black_scholes_price(S, K, T, r, sigma, q, "call")
+    held = 0.0
+
+    for i in range(n):
+
+        if i % every == 0:
+            delta = black_scholes_greeks(path[i], K, T - i * dt, r, sigma, q, "call")["delta"]
+            cash -= (delta - held) * path[i]
+            held = delta
+
+        cash = cash * np.exp(r * dt) + held * path[i + 1] * (np.exp(q * dt) - 1)
+
+    return cash + held * path[-1] - max(path[-1] - K, 0.0)
+
+
+for row in (0, 7, 19999):
+    for j, every in enumerate(result["frequencies"]):
+        assert np.isclose(result["pnl"][j, row], naive(paths[row], every))
+
+print("Naive loop OK")
+
+
+# ----------------------------
+# Chunking, costs and mispriced vol
+# ----------------------------
+small = hedge_backtest(paths[:500], K, T, r, sigma, q, max_elements=3000)
+assert np.allclose(small["pnl"], result["pnl"][:, :500])
+
+costly = hedge_backtest(paths, K, T, r, sigma, q, cost=0.001)
+assert (costly["summary"]["mean"] < summary["mean"]).all()
+
+# Selling at 30 vol an option that realizes 20 earns the vol spread
+rich = hedge_backtest(paths, K, T, r, sigma, q, sigma_price=0.3)
+edge = black_scholes_price(S, K, T, r, 0.3, q, "call") - black_scholes_price(S, K, T, r, sigma, q, "call")
+
+assert abs(rich["summary"]["mean"].iloc[0] - edge * np.exp(r * T)) < 0.05
+
+print("Costs / vol edge OK")
+
+
+# ----------------------------
+# Bootstrapped paths
+# ----------------------------
+returns = np.random.default_rng(1).standard_t(4, 500) * 0.01
+
+boot = bootstrap_paths(returns, S, 0.5, n_paths=1000, seed=2)
+
+assert boot.shape == (1000, 127)
+assert np.isin(np.round(np.diff(np.log(boot[:3]), axis=1), 12), np.round(returns, 12)).all()
+
+put = hedge_backtest(boot, K, 0.5, r, sigma, option_type="put", quantity=2.0)
+assert put["pnl"].shape == (5, 1000)
+
+print("Bootstrap OK")
@@ -0,0 +1,92 @@
+import sys
+import os
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+
+from src.models.heston import (
+    HESTON_PARAMETERS,
+    calibrate_heston,
+    heston_charfn,
+    heston_option_price
+)
+
+
+# ----------------------------
+# Reference value (Fang & Oosterlee, 2008)
+# ----------------------------
+reference = (0.0175, 1.5768, 0.0398, 0.5751, -0.5711)
+
+price = heston_option_price(100, 100, 1.0, 0.0, reference)
+print(f"COS ATM call: {price:.8f}  reference: 5.78515545")
+assert abs(price - 5.785155450) < 1e-5
+
+
+# ----------------------------
+# Analytic gradient against finite differences
+# ----------------------------
+u = np.linspace(0.0, 40.0, 9)
+_, gradient = heston_charfn(u, 0.7, reference, gradient=True)
+
+for i, name in enumerate(HESTON_PARAMETERS):
+    up, down = list(reference), list(reference)
+    up[i] += 1e-6
+    down[i] -= 1e-6
+    numeric = (heston_charfn(u, 0.7, up) - heston_charfn(u, 0.7, down)) / 2e-6
+    error = np.max(np.abs(numeric - gradient[i]))
+    print(f"d phi / d {name}: max error {error:.2e}")
+    assert error < 1e-6
+
+
+# ----------------------------
+# Calibration to a five-expiry chain
+# ----------------------------
+S = 100.0
+r = 0.04
+q = 0.01
+true = (0.05, 2.5, 0.06, 0.7, -0.65)
+
+rows = []
+
+for days in (14, 30, 60, 120, 240):
+
+    T = days / 365
+    strikes = np.arange(80.0, 121.0, 2.5)
+
+    for option_type in ("call", "put"):
+        mid = heston_option_price(S, strikes, T, r, true, q, option_type)
+        rows.append(pd.DataFrame({
+            "expiry": f"{days}d",
+            "T": T,
+            "strike": strikes,
+            "bid": mid - 0.01,
+            "ask": mid + 0.01,
+            "lastPrice": mid,
+            "volume": 100,
+            "optionType": option_type
+        }))
+
+chain = pd.concat(rows, ignore_index=True)
+
+fit = calibrate_heston(chain, S=S, r=r)
+
+print(
+    "Calibrated:", {p: round(fit[p], 4) for p in HESTON_PARAMETERS},
+    f"IV RMSE {fit['iv_rmse']:.2e}, {fit['quotes']} quotes, "
+    f"{fit['nfev']} evaluations in {fit['seconds']:.3f}s"
+)
+
+assert fit["seconds"] < 1.0
+assert np.allclose(fit["params"], true, rtol=0.05, atol=0.005)
+
+# Prices from the fitted model reproduce the mids
+model = heston_option_price(
+    S, chain["strike"], chain["T"], r, fit, q, chain["optionType"]
+)
+assert np.max(np.abs(model - chain["lastPrice"])) < 0.01
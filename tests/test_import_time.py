@@ -0,0 +1,73 @@
+import sys
+import os
+import json
+import subprocess
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+
+# Modules that must not be loaded just by importing a module
+HEAVY = [
+    "scipy",
+    "pandas",
+    "yfinance",
+    "pandas_datareader",
+    "streamlit",
+    "plotly"
+]
+
+# Core modules -> heavy modules they are allowed to pull in
+MODULES = {
+    "src.models.black_scholes": [],
+    "src.models.binomial_tree": [],
+    "src.models.implied_vol": [],
+    "src.models.monte_carlo": [],
+    "src.models.vol_surface": [],
+    "src.models.forwards": [],
+    "src.models.heston": [],
+    "src.models.local_vol": [],
+    "src.models.pde": [],
+    "src.models.incremental_surface": [],
+    "src.data.option_chain": [],
+    "src.data.data_scraper": ["pandas"]
+}
+
+PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{
+    "seconds": elapsed,
+    "loaded": [m for m in {heavy!r} if m in sys.modules]
+}}))
+"""
+
+
+# ----------------------------
+# Cold import of each module in a fresh interpreter
+# ----------------------------
+for module, allowed in MODULES.items():
+
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+
+    unexpected = [m for m in result["loaded"] if m not in allowed]
+
+    print(
+        f"{module:<28} {result['seconds'] * 1000:8.1f} ms",
+        "heavy:", result["loaded"]
+    )
+
+    assert not unexpected, f"{module} imports {unexpected} eagerly"
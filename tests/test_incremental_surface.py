@@ -0,0 +1,78 @@
+import sys
+import os
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.data.synthetic import SyntheticProvider
+from src.models.incremental_surface import IncrementalVolSurface
+
+
+# 50 weekly expiries
+provider = SyntheticProvider(
+    as_of="2030-01-02",
+    expiry_days=range(7, 357, 7)
+)
+
+ticker = "NVDA"
+
+S = provider.get_spot_price(ticker)
+r = provider.get_risk_free_rate()
+q = provider.get_dividend_yield(ticker)
+
+expiries = provider.get_expiry_dates(ticker)
+chains = {e: provider.get_option_chain(ticker, e) for e in expiries}
+maturities = {e: (i + 1) * 7 / 365 for i, e in enumerate(expiries)}
+
+builder = IncrementalVolSurface()
+
+start = time.perf_counter()
+updated = builder.refresh(chains, S, r, q, maturities)
+full = time.perf_counter() - start
+
+print(f"Initial build: {len(updated)} expiries in {full:.3f}s")
+print(builder.surface(), "version", builder.version)
+
+assert set(updated) == set(builder.slices) and len(builder) > 0
+assert builder.version == 1
+
+
+# Nothing changed
+start = time.perf_counter()
+updated = builder.refresh(chains, S, r, q, maturities)
+print(f"No-op refresh: {len(updated)} expiries in {time.perf_counter() - start:.3f}s")
+
+assert updated == []
+assert builder.version == 1
+
+
+# One quote moves in one expiry
+expiry = expiries[10]
+before = {e: entry["params"].copy() for e, entry in builder.slices.items()}
+
+chains[expiry] = chains[expiry].copy()
+chains[expiry].loc[chains[expiry].index[20], ["bid", "ask"]] += 0.05
+
+start = time.perf_counter()
+updated = builder.refresh(chains, S, r, q, maturities)
+partial = time.perf_counter() - start
+
+print(f"One quote changed: {updated} in {partial:.3f}s ({full / partial:.0f}x faster)")
+print(builder.surface(), "version", builder.version)
+
+assert updated == [expiry]
+assert builder.version == 2
+assert not np.array_equal(builder.slices[expiry]["params"], before[expiry])
+
+for e, params in before.items():
+    if e != expiry:
+        assert np.array_equal(builder.slices[e]["params"], params), e
+
+# Over the quoted moneyness range (0.8 - 1.2)
+print("Arbitrage check:", builder.surface().arbitrage_report(np.linspace(-0.2, 0.2, 41)))
@@ -0,0 +1,142 @@
+import sys
+import os
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.analysis.iv_history import (
+    iv_percentile,
+    iv_rank,
+    last_processed_date,
+    read_iv_history,
+    update_iv_history
+)
+from src.data.snapshots import write_snapshot
+from src.data.synthetic import SyntheticProvider, ticker_params
+
+
+try:
+    import pyarrow  # noqa: F401
+    fmt = "parquet"
+except ImportError:
+    fmt = "csv"
+
+
+# ----------------------------
+# Snapshots with a vol level that rises day by day
+# ----------------------------
+class VolDriftProvider(SyntheticProvider):
+
+    def __init__(self, as_of, level, **kwargs):
+
+        super().__init__(as_of=as_of, noise=0.0, spread=0.0, **kwargs)
+        self.level = level
+
+    def _params(self, ticker):
+
+        params = dict(ticker_params(ticker, self.seed))
+        params["short_vol"] *= self.level
+        params["long_vol"] *= self.level
+
+        return params
+
+
+tickers = ["SYN00", "SYN01"]
+dates = [f"2026-03-{day:02d}" for day in (2, 3, 4, 5, 6, 9, 10, 11)]
+levels = [1.0, 1.05, 0.95, 1.1, 1.0, 0.9, 1.2, 1.15]
+
+expiry_days = (14, 30, 60, 90, 180, 365)
+
+with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as store:
+
+    for date, level in zip(dates[:5], levels[:5]):
+        write_snapshot(VolDriftProvider(date, level, expiry_days=expiry_days), tickers, root, as_of=date)
+
+    # ----------------------------
+    # Backfill
+    # ----------------------------
+    first = update_iv_history(root, store, fmt=fmt)
+
+    print(f"Backfill: {len(first['dates'])} snapshots in {first['seconds']:.2f}s")
+    assert first["dates"] == dates[:5]
+    assert last_processed_date(store, fmt) == dates[4]
+
+    daily = read_iv_history(store, "daily", fmt)
+    expiries = read_iv_history(store, "expiries", fmt)
+
+    print(daily[["date", "ticker", "iv_30d", "iv_90d", "skew_30d", "ssvi_rho"]])
+
+    assert len(daily) == 5 * len(tickers)
+    assert len(expiries) == 5 * len(tickers) * len(expiry_days)
+
+    # The synthetic 30-day ATM vol comes back from the chain
+    params = ticker_params("SYN00")
+    T = 30 / 365
+    v0, v_inf, kappa = params["short_vol"] ** 2, params["long_vol"] ** 2, params["kappa"]
+    atm = np.sqrt((v_inf * T + (v0 - v_inf) * (1 - np.exp(-kappa * T)) / kappa) / T)
+
+    row = daily[(daily["ticker"] == "SYN00") & (daily["date"] == dates[0])].iloc[0]
+    print(f"iv_30d {row['iv_30d']:.4f} vs SSVI ATM {atm:.4f}")
+    assert abs(row["iv_30d"] - atm) < 0.01
+
+    # Negative SSVI rho shows up as a positive put-minus-call skew
+    assert (daily["skew_30d"] > 0).all()
+    assert (daily["ssvi_rho"] < 0).all()
+
+    # ----------------------------
+    # Nightly increment touches only new snapshots
+    # ----------------------------
+    again = update_iv_history(root, store, fmt=fmt)
+    assert again["dates"] == []
+
+    for date, level in zip(dates[5:], levels[5:]):
+        write_snapshot(VolDriftProvider(date, level, expiry_days=expiry_days), tickers, root, as_of=date)
+
+    nightly = update_iv_history(root, store, fmt=fmt)
+
+    print(f"Increment: {len(nightly['dates'])} snapshots in {nightly['seconds']:.2f}s")
+    assert nightly["dates"] == dates[5:]
+    assert len(read_iv_history(store, "daily", fmt)) == len(dates) * len(tickers)
+
+    # One file per date and table
+    assert sorted(os.listdir(os.path.join(store, "daily"))) == [
+        f"date={date}.{fmt}" for date in dates
+    ]
+
+    # A crash after the expiries but before the daily rows of the last
+    # date: the rerun redoes that date without duplicating its expiries
+    os.remove(os.path.join(store, "daily", f"date={dates[-1]}.{fmt}"))
+    assert last_processed_date(store, fmt) == dates[-2]
+
+    resumed = update_iv_history(root, store, fmt=fmt)
+
+    assert resumed["dates"] == dates[-1:]
+    assert len(read_iv_history(store, "daily", fmt)) == len(dates) * len(tickers)
+    assert len(read_iv_history(store, "expiries", fmt)) == len(dates) * len(tickers) * len(expiry_days)
+
+    # ----------------------------
+    # Rank and percentile
+    # ----------------------------
+    rank = iv_rank(store, "SYN00", fmt=fmt)
+    percentile = iv_percentile(store, "SYN00", fmt=fmt)
+
+    series = read_iv_history(store, "daily", fmt)
+    series = series[series["ticker"] == "SYN00"].sort_values("date")["iv_30d"].to_numpy()
+
+    print(f"IV rank {rank:.3f}, percentile {percentile:.3f}")
+    assert np.isclose(rank, (series[-1] - series.min()) / (series.max() - series.min()))
+    assert np.isclose(percentile, np.mean(series[:-1] < series[-1]))
+
+    # Level 1.15 on the last day: below the 1.2 day only
+    assert percentile == 6 / 7
+
+    # As of the lowest day
+    assert iv_rank(store, "SYN00", as_of=dates[5], fmt=fmt) == 0.0
+
+print("IV history OK")
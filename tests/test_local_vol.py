@@ -0,0 +1,126 @@
+import sys
+import os
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.data.synthetic import atm_total_variance, ticker_params
+from src.models.black_scholes import black_scholes_price, black_scholes_price_batch
+from src.models.binomial_tree import binomial_option_price
+from src.models.local_vol import clear_local_vol_cache, local_vol_grid
+from src.models.monte_carlo import monte_carlo_local_vol_price
+from src.models.pde import local_vol_pde_price, pde_option_price
+from src.models.vol_surface import VolatilitySurface, ssvi_to_svi
+
+
+# ----------------------------
+# PDE engine against closed forms
+# ----------------------------
+for option_type in ("call", "put"):
+    pde = pde_option_price(100, 105, 0.5, 0.04, 0.3, 0.02, option_type)
+    bs = black_scholes_price(100, 105, 0.5, 0.04, 0.3, 0.02, option_type)
+    print(f"PDE {option_type}: {pde:.4f}  Black–Scholes: {bs:.4f}")
+    assert abs(pde - bs) < 1e-3
+
+pde = pde_option_price(100, 105, 1, 0.05, 0.3, option_type="put", american=True)
+lattice = binomial_option_price(
+    100, 105, 1, 0.05, 0.3, steps=2000, option_type="put", american=True
+)
+print(f"American put PDE: {pde:.4f}  binomial: {lattice:.4f}")
+assert abs(pde - lattice) < 0.02
+
+
+# ----------------------------
+# Arbitrage-free synthetic surface
+# ----------------------------
+params = ticker_params("NVDA")
+S = params["spot"]
+q = params["dividend_yield"]
+r = 0.04
+
+expiries = np.array([7, 14, 30, 60, 90, 180, 365, 730]) / 365
+
+surface = VolatilitySurface(
+    S,
+    expiries,
+    S * np.exp((r - q) * expiries),
+    [
+        ssvi_to_svi(atm_total_variance(T, params), params["rho"],
+                    params["eta"], params["gamma"])
+        for T in expiries
+    ],
+    version=1
+)
+
+
+# ----------------------------
+# Grid is built once per surface version
+# ----------------------------
+clear_local_vol_cache()
+
+start = time.perf_counter()
+grid = local_vol_grid(surface)
+built = time.perf_counter() - start
+
+start = time.perf_counter()
+again = local_vol_grid(surface)
+cached = time.perf_counter() - start
+
+print(grid)
+print(f"Grid built in {built:.4f}s, cached lookup {cached:.6f}s")
+assert again is grid
+
+surface.version += 1
+assert local_vol_grid(surface) is not grid
+
+
+# ----------------------------
+# Local vol reprices the implied surface
+# ----------------------------
+T = 0.5
+K = S * np.array([0.8, 0.9, 1.0, 1.1, 1.2])
+option_type = np.where(K < S, "put", "call")
+
+implied = black_scholes_price_batch(
+    S, K, T, r, surface.implied_vol(K, T), q, option_type
+)
+
+pde = np.array([
+    local_vol_pde_price(S, k, T, r, surface, o)
+    for k, o in zip(K, option_type)
+])
+
+print("Strike   implied BS   local vol PDE")
+for row in zip(K, implied, pde):
+    print("%8.2f  %10.4f  %12.4f" % row)
+
+assert np.max(np.abs(pde - implied) / S) < 2e-4
+
+calls = K >= S
+
+mc = monte_carlo_local_vol_price(
+    S, K[calls], T, r, surface, "call", simulations=100000, seed=1
+)
+
+print("MC calls:", np.round(mc["price"], 4), "+/-", np.round(mc["std_error"], 4))
+assert np.all(np.abs(mc["price"] - implied[calls]) < 4 * mc["std_error"])
+
+
+# ----------------------------
+# Exotic payoff on the same paths engine
+# ----------------------------
+barrier = monte_carlo_local_vol_price(
+    S, S, T, r, surface, simulations=50000, seed=1,
+    payoff=lambda paths: np.where(
+        paths.max(axis=1) < 1.3 * S, np.maximum(paths[:, -1] - S, 0.0), 0.0
+    )
+)
+
+print("Up-and-out call:", barrier["price"])
+assert barrier["price"] < implied[K == S][0]
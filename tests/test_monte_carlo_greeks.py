@@ -0,0 +1,68 @@
+import sys
+import os
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.models.black_scholes import black_scholes_greeks, black_scholes_price
+from src.models.monte_carlo import MC_GREEKS, monte_carlo_option_price
+
+
+S, K, T, r, sigma, q = 100, 105, 0.5, 0.03, 0.25, 0.01
+
+np.random.seed(0)
+
+
+# ----------------------------
+# Both estimators agree with Black–Scholes within their errors
+# ----------------------------
+for option_type in ("call", "put"):
+
+    exact = black_scholes_greeks(S, K, T, r, sigma, q, option_type)
+
+    for method in ("pathwise", "likelihood_ratio"):
+
+        start = time.perf_counter()
+        result = monte_carlo_option_price(
+            S, K, T, r, sigma, option_type,
+            simulations=200000, q=q,
+            greeks=True, greek_method=method
+        )
+        elapsed = time.perf_counter() - start
+
+        print(f"{option_type} {method} ({elapsed:.3f}s)")
+
+        for name in MC_GREEKS:
+
+            error = result[name] - exact[name]
+            se = result[f"{name}_std_error"]
+
+            print(f"  {name}: {result[name]:.4f} vs {exact[name]:.4f} (se {se:.5f})")
+            assert abs(error) < 4 * se
+
+        assert abs(result["price"] - black_scholes_price(S, K, T, r, sigma, q, option_type)) \
+            < 4 * result["std_error"]
+
+
+# ----------------------------
+# Pathwise is the low-variance choice for smooth payoffs
+# ----------------------------
+pathwise = monte_carlo_option_price(S, K, T, r, sigma, simulations=100000, q=q, greeks=True)
+ratio = monte_carlo_option_price(
+    S, K, T, r, sigma, simulations=100000, q=q,
+    greeks=True, greek_method="likelihood_ratio"
+)
+
+for name in MC_GREEKS:
+    assert pathwise[f"{name}_std_error"] < ratio[f"{name}_std_error"]
+
+# Greeks are opt-in
+assert "delta" not in monte_carlo_option_price(S, K, T, r, sigma, simulations=1000)
+
+print("Monte Carlo Greeks OK")
@@ -0,0 +1,98 @@
+import sys
+import os
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.data.option_chain import OptionChain
+from src.data.synthetic import iter_synthetic_chains
+from src.models.black_scholes import black_scholes_greeks
+from src.models.implied_vol import implied_volatility, option_chain_implied_vol
+from src.analysis.model_comparison import compare_models
+
+
+# ----------------------------
+# Multi-ticker, multi-expiry chunk as a columnar chain
+# ----------------------------
+frame = next(iter_synthetic_chains(
+    [f"SYN{i:03d}" for i in range(100)],
+    n_strikes=41,
+    chunk_size=200_000
+))
+
+start = time.perf_counter()
+chain = OptionChain.from_frame(frame)
+print(chain, f"built in {time.perf_counter() - start:.3f}s")
+
+liquid = chain.filter(min_volume=0, moneyness=(0.8, 1.2))
+print("Liquid contracts:", len(liquid))
+
+
+# ----------------------------
+# One vectorized IV pass over every contract
+# ----------------------------
+start = time.perf_counter()
+iv = option_chain_implied_vol(liquid, r=0.04, q=0.0)
+elapsed = time.perf_counter() - start
+
+print(f"IV for {len(liquid)} contracts in {elapsed:.3f}s")
+print("Converged:", np.mean(~np.isnan(iv)))
+
+print(liquid.to_frame(impliedVol=iv).head())
+
+assert len(liquid) > 0
+assert np.mean(~np.isnan(iv)) > 0.95
+
+# Same vols as the per-row solver, wherever the price pins the vol down
+sample = np.random.default_rng(0).choice(len(liquid), 300, replace=False)
+checked = 0
+
+for i in sample:
+
+    option_type = "call" if liquid.flag[i] > 0 else "put"
+    args = (liquid.spot[i], liquid.strike[i], liquid.T[i], 0.04, iv[i], 0.0, option_type)
+
+    if np.isnan(iv[i]) or black_scholes_greeks(*args)["vega"] < 0.01:
+        continue
+
+    # The per-row solver gives up where Newton steps leave the vega plateau
+    try:
+        expected = implied_volatility(
+            liquid.mid[i], liquid.spot[i], liquid.strike[i], liquid.T[i], 0.04, 0.0, option_type
+        )
+    except RuntimeError:
+        continue
+
+    assert abs(iv[i] - expected) < 1e-4, (i, iv[i], expected)
+    checked += 1
+
+print("Checked against implied_volatility:", checked)
+
+assert checked > 150
+
+
+# ----------------------------
+# Model comparison on one ticker/expiry
+# ----------------------------
+first = frame[(frame["ticker"] == "SYN000") & (frame["expiry"] == frame["expiry"].iloc[0])]
+calls = first[first["optionType"] == "call"].copy()
+
+S = calls["spot"].iloc[0]
+T = calls["T"].iloc[0]
+
+calls["impliedVol"] = option_chain_implied_vol(
+    OptionChain.from_frame(calls), r=0.04
+)
+
+results = compare_models(calls, S, T, 0.04, steps=100)
+
+print(results.head())
+
+assert len(results) == len(calls)
+
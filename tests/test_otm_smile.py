@@ -0,0 +1,78 @@
+import sys
+import os
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.analysis.smile import build_smile
+from src.data.synthetic import SyntheticProvider
+from src.models.implied_vol import implied_volatility_chain
+
+
+provider = SyntheticProvider(as_of="2030-01-02")
+
+ticker = "NVDA"
+expiry = provider.get_expiry_dates(ticker)[5]
+
+S = provider.get_spot_price(ticker)
+r = provider.get_risk_free_rate()
+q = provider.get_dividend_yield(ticker)
+T = (np.datetime64(expiry) - np.datetime64("2030-01-02")).astype(int) / 365
+
+chain = provider.get_option_chain(ticker, expiry)
+
+# Real ITM markets are wide and lean to one side: skew their asks
+call = chain["optionType"] == "call"
+itm = np.where(call, chain["strike"] < S, chain["strike"] > S)
+chain.loc[itm, "ask"] = (chain.loc[itm, "ask"] * 1.03).round(2)
+
+true_iv = chain.drop_duplicates("strike").set_index("strike")["impliedVolatility"]
+
+
+# ----------------------------
+# Calls only (previous behaviour)
+# ----------------------------
+calls = chain[chain["optionType"] == "call"]
+calls = calls[(calls["strike"] / S > 0.7) & (calls["strike"] / S < 1.3)]
+
+start = time.perf_counter()
+calls = implied_volatility_chain(calls, S, T, r, q, option_type="call")
+print(f"Calls only: {calls['impliedVol'].notna().sum()} points in {time.perf_counter() - start:.4f}s")
+
+error = (calls.set_index("strike")["impliedVol"] - true_iv).abs()
+print("  median |error| below spot:", error[error.index < S].median())
+print("  median |error| above spot:", error[error.index >= S].median())
+
+
+# ----------------------------
+# OTM-merged smile
+# ----------------------------
+start = time.perf_counter()
+smile = build_smile(chain, S, T, r, q, moneyness=(0.7, 1.3))
+print(f"OTM merged: {len(smile)} points in {time.perf_counter() - start:.4f}s")
+
+calls_error = error
+error = (smile.set_index("strike")["impliedVol"] - true_iv).abs()
+print("  median |error| below spot:", error[error.index < S].median())
+print("  median |error| above spot:", error[error.index >= S].median())
+
+# One row per strike in the window, sorted, OTM calls above the forward
+# and OTM puts below it
+quoted = chain["strike"][(chain["strike"] / S > 0.7) & (chain["strike"] / S < 1.3)]
+
+assert smile["strike"].is_unique and smile["strike"].is_monotonic_increasing
+assert set(smile["strike"]) <= set(quoted) and len(smile) >= 0.9 * quoted.nunique()
+assert (smile.loc[smile["k"] <= -0.05, "call_weight"] == 0).all()
+assert (smile.loc[smile["k"] >= 0.05, "call_weight"] == 1).all()
+
+# Puts fix the skewed ITM calls below spot, and nothing changes above it
+assert error[error.index < S].median() < 0.1 * calls_error[calls_error.index < S].median()
+assert np.isclose(error[error.index >= S].median(), calls_error[calls_error.index >= S].median())
+
+print(smile[np.abs(smile["k"]) < 0.08])
@@ -0,0 +1,98 @@
+import sys
+import os
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.models.binomial_tree import binomial_greeks_batch, binomial_option_price
+from src.models.black_scholes import price_and_greeks, price_and_greeks_batch
+from src.risk.portfolio import GREEKS, Portfolio
+
+
+# ----------------------------
+# Lattice Greeks converge to Black–Scholes for European exercise
+# ----------------------------
+K = np.array([80.0, 100.0, 120.0])
+
+lattice = binomial_greeks_batch(
+    100, K, 0.5, 0.04, 0.3, 0.01, steps=400, option_type="call", american=False
+)
+closed = price_and_greeks_batch(100, K, 0.5, 0.04, 0.3, 0.01, "call")
+
+for name in ("price",) + GREEKS:
+    print(f"{name:6s} lattice {np.round(lattice[name], 4)}  BS {np.round(closed[name], 4)}")
+    assert np.allclose(lattice[name], closed[name], rtol=0.02, atol=0.01)
+
+
+# ----------------------------
+# Random book across many underlyings
+# ----------------------------
+rng = np.random.default_rng(0)
+
+n = 5000
+names = np.array([f"SYN{i:03d}" for i in range(40)])
+spots = {name: 50.0 + 5 * i for i, name in enumerate(names)}
+vols = {name: 0.2 + 0.01 * i for i, name in enumerate(names)}
+
+underlying = rng.choice(names, n)
+S = np.array([spots[u] for u in underlying])
+
+book = Portfolio(
+    underlying=underlying,
+    strike=np.round(S * rng.uniform(0.8, 1.2, n)),
+    expiry=np.array(["2026-11-20", "2026-12-18", "2027-03-19", "2027-06-18"])[
+        rng.integers(0, 4, n)
+    ],
+    option_type=rng.choice(["call", "put"], n),
+    quantity=rng.integers(-20, 21, n),
+    style=np.where(rng.random(n) < 0.3, "american", "european"),
+    multiplier=100
+)
+
+print(book)
+
+as_of = "2026-10-19"
+
+start = time.perf_counter()
+table = book.aggregate(spots, vols, 0.04, 0.01, as_of=as_of)
+print(f"Aggregated in {time.perf_counter() - start:.3f}s")
+print(table.tail(4))
+
+assert table.loc["TOTAL", "positions"] == n
+assert table.loc["TOTAL", "unpriced"] == 0
+
+
+# ----------------------------
+# Totals match a position-by-position loop
+# ----------------------------
+T = book.T(as_of)
+frame = book.to_frame()
+
+check = np.flatnonzero(frame["underlying"] == names[0])
+delta = 0.0
+
+for i in check:
+
+    args = (S[i], book.strike[i], T[i], 0.04, vols[names[0]], 0.01)
+    option_type = frame["optionType"][i]
+
+    if book.american[i]:
+        h = 0.01 * S[i]
+        up = binomial_option_price(
+            S[i] + h, *args[1:], steps=100, option_type=option_type)
+        down = binomial_option_price(
+            S[i] - h, *args[1:], steps=100, option_type=option_type)
+        unit = (up - down) / (2 * h)
+    else:
+        unit = price_and_greeks(*args, option_type)["delta"]
+
+    delta += unit * book.quantity[i] * 100
+
+print(f"{names[0]} net delta: book {table.loc[names[0], 'delta']:.1f}, loop {delta:.1f}")
+assert abs(table.loc[names[0], "delta"] - delta) < 0.01 * np.abs(book.quantity[check]).sum() * 100
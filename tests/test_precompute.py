@@ -0,0 +1,199 @@
+import sys
+import os
+import threading
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.app.precompute import PrecomputeWorker, ResultStore, freeze, freeze_book
+from src.data import data_scraper
+from src.data.synthetic import SyntheticProvider
+from src.risk.portfolio import Portfolio
+from src.risk.scenarios import scenario_grid
+from src.risk.var import portfolio_var
+
+
+data_scraper.set_provider(SyntheticProvider())
+
+try:
+
+    ticker = "NVDA"
+    expiries = tuple(data_scraper.get_expiry_dates(ticker)[:4])
+
+
+    # ----------------------------
+    # Store: versions and waiting readers
+    # ----------------------------
+    store = ResultStore()
+
+    first = store.put(("analytics", "A"), 1)
+    second = store.put(("analytics", "B"), 2)
+
+    assert (first.version, second.version, store.version) == (1, 2, 2)
+    assert store.get(("analytics", "C")) is None
+    assert store.age(("analytics", "C")) == float("inf")
+
+    waited = []
+    reader = threading.Thread(
+        target=lambda: waited.append(store.wait(("analytics", "C"), timeout=5))
+    )
+    reader.start()
+    time.sleep(0.05)
+    store.put(("analytics", "C"), 3)
+    reader.join()
+
+    assert waited[0].value == 3
+    assert store.wait(("analytics", "D"), timeout=0.01) is None
+
+
+    # ----------------------------
+    # Store and builders: least recently used entries are evicted
+    # ----------------------------
+    store = ResultStore(max_entries=2)
+
+    store.put(("analytics", "A"), 1)
+    store.put(("analytics", "B"), 2)
+    store.get(("analytics", "A"))
+    store.put(("analytics", "C"), 3)
+
+    assert len(store) == 2
+    assert ("analytics", "B") not in store
+    assert store.get(("analytics", "A")).value == 1
+
+    store.discard(("analytics", "A"))
+    assert ("analytics", "A") not in store
+
+    worker = PrecomputeWorker(max_builders=2)
+
+    first = worker.builder(ticker, expiries[:1])
+    worker.builder(ticker, expiries[:2])
+    assert worker.builder(ticker, expiries[:1]) is first
+
+    worker.builder(ticker, expiries[:3])
+    assert len(worker._builders) == 2
+    assert (ticker, expiries[:2]) not in worker._builders
+    assert worker.builder(ticker, expiries[:1]) is first
+
+
+    # ----------------------------
+    # Inline: computed in the caller, then served from the store
+    # ----------------------------
+    worker = PrecomputeWorker(ttl=60)
+
+    start = time.perf_counter()
+    analytics = worker.get("analytics", ticker, expiries, 50)
+    elapsed = time.perf_counter() - start
+
+    assert analytics.error is None
+    assert set(analytics.value["expiry"]) == set(expiries)
+
+    start = time.perf_counter()
+    again = worker.get("analytics", ticker, expiries, 50)
+    cached = time.perf_counter() - start
+
+    print(f"Analytics: first {elapsed:.3f}s, read {1e3 * cached:.3f}ms")
+
+    assert again is analytics
+    assert worker.computations == 1
+
+    surface = worker.get("surface", ticker, expiries)
+    assert surface.error is None
+    assert len(surface.value.expiries) == len(expiries)
+
+    # Risk page jobs take frozen books and per-underlying inputs
+    book = Portfolio(
+        ["NVDA", "NVDA", "AAPL"], [100.0, 110.0, 180.0], list(expiries[:2]) + [expiries[1]],
+        ["call", "put", "call"], [1, -2, 3], style=["european", "american", "european"]
+    )
+    spot = {"NVDA": 105.0, "AAPL": 185.0}
+    vol = {"NVDA": 0.4, "AAPL": 0.25}
+    book_args = (freeze_book(book), freeze(spot), freeze(vol), 0.04, 0.0)
+
+    scenarios = worker.get("scenarios", ticker, *book_args, (5,), 50)
+    assert scenarios.error is None
+    assert np.allclose(
+        scenarios.value["pnl"],
+        scenario_grid(book, spot, vol, 0.04, 0.0, days=[5], steps=50)["pnl"],
+        equal_nan=True
+    )
+    assert worker.get("scenarios", ticker, *book_args, (5,), 50) is scenarios
+
+    risk = worker.get("var", ticker, *book_args, "parametric", "full", 1, 50)
+    assert risk.error is None
+    assert np.isclose(
+        risk.value["var"],
+        portfolio_var(book, spot, vol, 0.04, 0.0, method="parametric", seed=0, workers=1, steps=50)["var"]
+    )
+
+    S = data_scraper.get_spot_price(ticker)
+    hedge = worker.get("hedge", ticker, S, S, 0.25, 0.04, 0.0, "call", 0.3, (0.25, 0.3), 0.0)
+    assert hedge.error is None
+    assert set(hedge.value) == {0.25, 0.3}
+
+    # Failures are stored with the key, for the page to handle
+    failed = worker.get("surface", ticker, ())
+    assert isinstance(failed.error, ValueError)
+
+    try:
+        worker.get("greeks", ticker)
+        raise AssertionError("Unknown kind accepted")
+    except ValueError:
+        pass
+
+
+    # ----------------------------
+    # Background: sessions share one computation, refreshed after the TTL
+    # ----------------------------
+    worker = PrecomputeWorker(ttl=0.5, idle=2.0, poll=0.05).start()
+
+    results = []
+    sessions = [
+        threading.Thread(
+            target=lambda: results.append(worker.get("heston", ticker, expiries[:2], timeout=60))
+        )
+        for _ in range(5)
+    ]
+
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+
+    assert worker.computations == 1
+    assert all(result is results[0] for result in results)
+    print(f"Heston IV RMSE: {results[0].value['iv_rmse']:.4f}")
+
+    # Nothing changes inside the TTL...
+    assert worker.get("heston", ticker, expiries[:2]) is results[0]
+
+    # ...and a newer version replaces the result once it has expired
+    deadline = time.time() + 30
+    while worker.store.get(("heston", ticker, expiries[:2])).version == results[0].version:
+        assert time.time() < deadline, "Result was not refreshed"
+        time.sleep(0.05)
+
+    refreshed = worker.get("heston", ticker, expiries[:2])
+    assert refreshed.version > results[0].version
+    assert refreshed.computed > results[0].computed
+
+    # Keys nobody reads stop being refreshed, and their results go
+    time.sleep(2.5)
+    assert worker.pending() == []
+    assert ("heston", ticker, expiries[:2]) not in worker.store
+    count = worker.computations
+    time.sleep(0.7)
+    assert worker.computations == count
+
+    worker.stop(timeout=5)
+    assert not worker._thread.is_alive()
+
+finally:
+    data_scraper.set_provider(None)
+
+print("Precompute OK")
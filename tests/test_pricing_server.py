@@ -0,0 +1,194 @@
+import sys
+import os
+import json
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.models.binomial_tree import binomial_option_price_batch
+from src.models.black_scholes import price_and_greeks_batch
+from src.models.implied_vol import implied_volatility_batch
+from src.models.monte_carlo import monte_carlo_option_price_batch
+from src.service.pricing_server import parse_request, start_pricing_server
+
+
+def call(path, body=None):
+
+    data = None if body is None else json.dumps(body).encode()
+
+    request = urllib.request.Request(server.base_url + path, data=data)
+
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+rng = np.random.default_rng(0)
+
+n = 2000
+S = 100.0
+K = rng.uniform(60, 140, n)
+T = rng.uniform(0.05, 2.0, n)
+sigma = rng.uniform(0.1, 0.6, n)
+types = np.where(rng.random(n) < 0.5, "call", "put")
+
+contracts = {
+    "S": S,
+    "K": K.tolist(),
+    "T": T.tolist(),
+    "r": 0.04,
+    "sigma": sigma.tolist(),
+    "q": 0.01,
+    "option_type": types.tolist()
+}
+
+
+# ----------------------------
+# Parsing
+# ----------------------------
+columns, options = parse_request("/binomial", {**contracts, "steps": 50})
+
+assert all(values.shape == (n,) for values in columns.values())
+assert options == {"steps": 50}
+
+for body, message in (
+    ({"S": 100}, "Missing inputs"),
+    ({**contracts, "K": [1, 2, 3]}, "different lengths"),
+    ({**contracts, "option_type": "straddle"}, "Invalid option_type"),
+    ({**contracts, "sigma": "high"}, "Invalid sigma")
+):
+    try:
+        parse_request("/bs", body)
+        raise AssertionError(f"Accepted {message}")
+    except ValueError as e:
+        assert message in str(e), e
+
+
+server = start_pricing_server(workers=1, interval=0.02)
+
+try:
+
+    # ----------------------------
+    # Endpoints match the library
+    # ----------------------------
+    assert call("/health") == (200, {"status": "ok"})
+
+    status, bs = call("/bs", contracts)
+    expected = price_and_greeks_batch(S, K, T, 0.04, sigma, 0.01, types)
+
+    assert status == 200
+    for name in ("price", "delta", "gamma", "vega", "theta", "rho"):
+        assert np.allclose(bs[name], expected[name], rtol=1e-12, atol=1e-12), name
+
+    status, iv = call("/iv", {**contracts, "price": bs["price"]})
+    iv = np.array(iv["impliedVol"], dtype=float)
+
+    # Recovered wherever the price is sensitive to vol
+    sensitive = expected["vega"] > 0.01
+
+    assert status == 200
+    assert np.allclose(
+        iv,
+        implied_volatility_batch(expected["price"], S, K, T, 0.04, 0.01, types),
+        equal_nan=True
+    )
+    assert np.allclose(iv[sensitive], sigma[sensitive], atol=1e-4)
+
+    status, american = call("/binomial", {**contracts, "steps": 50})
+    assert np.allclose(
+        american["price"],
+        binomial_option_price_batch(S, K, T, 0.04, sigma, 0.01, steps=50, option_type=types)
+    )
+
+    status, mc = call("/mc", {**contracts, "simulations": 4000, "seed": 7})
+    reference = monte_carlo_option_price_batch(
+        S, K, T, 0.04, sigma, 0.01, option_type=types, simulations=4000, seed=7
+    )
+    assert np.allclose(mc["price"], reference["price"])
+    assert np.allclose(mc["std_error"], reference["std_error"])
+
+    # Undefined results are null, not NaN
+    status, iv = call("/iv", {"price": 500.0, "S": 100, "K": 100, "T": 1, "r": 0.0})
+    assert status == 200 and iv["impliedVol"] == [None]
+
+    # Errors
+    assert call("/bs", {"S": 100})[0] == 400
+    assert call("/mc", {**contracts, "simulations": -5})[0] == 400
+    assert call("/nope", {})[0] == 404
+    assert call("/bs")[0] == 405
+
+    # Malformed or negative Content-Length
+    for length in ("abc", "-5", "+5", ""):
+        with socket.create_connection((server.host, server.port), timeout=10) as conn:
+            conn.sendall(
+                f"POST /bs HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode()
+            )
+            assert conn.recv(1024).startswith(b"HTTP/1.1 400"), length
+
+    # ----------------------------
+    # Concurrent requests share kernel calls
+    # ----------------------------
+    before = server.stats()["/bs"]
+
+    results = {}
+
+    def client(i):
+        results[i] = call("/bs", {**contracts, "K": K[i::50].tolist(), "T": T[i::50].tolist(),
+                                  "sigma": sigma[i::50].tolist(), "option_type": types[i::50].tolist()})
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(50)]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    after = server.stats()["/bs"]
+    batches = after["batches"] - before["batches"]
+
+    print(f"50 concurrent requests in {elapsed:.3f}s, {batches} kernel calls")
+
+    assert batches < 25
+    assert after["contracts"] - before["contracts"] == n
+
+    # Every client got its own contracts back
+    for i, (status, payload) in results.items():
+        assert status == 200
+        assert np.allclose(payload["price"], expected["price"][i::50])
+
+    # ----------------------------
+    # Latency histograms
+    # ----------------------------
+    status, stats = call("/stats")
+
+    assert status == 200
+    assert stats["/bs"]["count"] == 51
+    assert stats["/bs"]["buckets"]["+Inf"] == 51
+    assert stats["/mc"]["count"] == 1
+
+    cumulative = list(stats["/bs"]["buckets"].values())
+    assert cumulative == sorted(cumulative)
+
+    print({
+        path: (entry["count"], entry["p50_ms"], entry["p99_ms"])
+        for path, entry in stats.items()
+    })
+
+finally:
+    server.stop(timeout=10)
+
+print("Pricing server OK")
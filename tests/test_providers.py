@@ -0,0 +1,127 @@
+import sys
+import os
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+
+from src.data import data_scraper
+from src.data.providers import HTTPProvider, MarketDataProvider
+from src.data.snapshots import SnapshotProvider, write_snapshot
+from src.data.stub_server import start_stub_server
+
+
+# ----------------------------
+# Small in-memory provider to record from
+# ----------------------------
+class StaticProvider(MarketDataProvider):
+
+    def get_spot_price(self, ticker):
+        return 100.0
+
+    def get_expiry_dates(self, ticker):
+        return ["2030-01-18", "2030-06-21"]
+
+    def get_option_chain(self, ticker, expiry_date):
+        strikes = np.arange(80.0, 125.0, 5.0)
+        frames = []
+        for option_type in ["call", "put"]:
+            frames.append(pd.DataFrame({
+                "strike": strikes,
+                "bid": 1.0,
+                "ask": 1.2,
+                "lastPrice": 1.1,
+                "volume": 10,
+                "optionType": option_type
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+    def get_risk_free_rate(self):
+        return 0.05
+
+    def get_dividend_yield(self, ticker):
+        return 0.01
+
+    def get_historical_data(self, ticker, period="1y"):
+        dates = pd.bdate_range("2028-01-03", periods=600)
+        close = 100 * np.exp(np.cumsum(np.full(len(dates), 0.0005)))
+        return pd.DataFrame({
+            "Date": dates,
+            "Open": close,
+            "High": close,
+            "Low": close,
+            "Close": close,
+            "Volume": 1000
+        })
+
+
+# A provider missing any method fails at construction, not on first use
+class SpotOnlyProvider(MarketDataProvider):
+
+    def get_spot_price(self, ticker):
+        return 100.0
+
+
+try:
+    SpotOnlyProvider()
+    raise AssertionError("Incomplete provider was instantiated")
+except TypeError as e:
+    assert "get_option_chain" in str(e)
+
+
+root = tempfile.mkdtemp()
+
+write_snapshot(StaticProvider(), ["TEST"], root, as_of="2030-01-02")
+
+snapshot = SnapshotProvider(root)
+
+print("Snapshot date:", snapshot.as_of)
+print("Spot:", snapshot.get_spot_price("TEST"))
+print("Expiries:", snapshot.get_expiry_dates("TEST"))
+print("6mo history rows:", len(snapshot.get_historical_data("TEST", "6mo")))
+
+assert str(snapshot.as_of)[:10] == "2030-01-02"
+assert snapshot.get_spot_price("TEST") == 100.0
+assert list(snapshot.get_expiry_dates("TEST")) == ["2030-01-18", "2030-06-21"]
+assert 0 < len(snapshot.get_historical_data("TEST", "6mo")) < 600
+
+
+# ----------------------------
+# Same data through the local stand-in server
+# ----------------------------
+server = start_stub_server(snapshot)
+
+data_scraper.set_provider(HTTPProvider(server.base_url))
+
+try:
+
+    print("Server:", server.base_url)
+    print("Spot:", data_scraper.get_spot_price("TEST"))
+    print("Rate:", data_scraper.get_risk_free_rate(fallback=None))
+    print("Dividend:", data_scraper.get_dividend_yield("TEST"))
+    print("Vol 30d:", data_scraper.calculate_historical_volatility("TEST", 30))
+
+    chain = data_scraper.get_option_chain("TEST", "2030-01-18")
+
+    print(chain.head())
+
+    assert data_scraper.get_spot_price("TEST") == 100.0
+    assert data_scraper.get_risk_free_rate(fallback=None) == 0.05
+    assert data_scraper.get_dividend_yield("TEST") == 0.01
+
+    # A constant drift has no volatility
+    assert data_scraper.calculate_historical_volatility("TEST", 30) < 1e-6
+
+    assert len(chain) == 18
+    assert (chain["bid"] == 1.0).all() and (chain["ask"] == 1.2).all()
+    assert sorted(set(chain["optionType"])) == ["call", "put"]
+
+finally:
+    server.shutdown()
+    data_scraper.set_provider(None)
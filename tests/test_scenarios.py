@@ -0,0 +1,144 @@
+import sys
+import os
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.data.option_chain import OptionChain
+from src.data.synthetic import iter_synthetic_chains
+from src.risk.portfolio import Portfolio
+from src.risk.scenarios import pnl_table, scenario_grid, spot_ladder
+
+
+# ----------------------------
+# 10k-position book across 40 underlyings
+# ----------------------------
+rng = np.random.default_rng(0)
+
+n = 10000
+names = np.array([f"SYN{i:03d}" for i in range(40)])
+spots = {name: 50.0 + 5 * i for i, name in enumerate(names)}
+
+underlying = rng.choice(names, n)
+S = np.array([spots[u] for u in underlying])
+
+book = Portfolio(
+    underlying=underlying,
+    strike=np.round(S * rng.uniform(0.8, 1.2, n)),
+    expiry=np.array(["2026-11-20", "2026-12-18", "2027-03-19", "2027-06-18"])[
+        rng.integers(0, 4, n)
+    ],
+    option_type=rng.choice(["call", "put"], n),
+    quantity=rng.integers(-20, 21, n),
+    style=np.where(rng.random(n) < 0.3, "american", "european"),
+    multiplier=100
+)
+
+as_of = "2026-10-19"
+market = (spots, 0.3, 0.04, 0.01)
+
+scenario_grid(book, *market, as_of=as_of)
+
+start = time.perf_counter()
+result = scenario_grid(book, *market, as_of=as_of)
+elapsed = time.perf_counter() - start
+
+print(book)
+print(f"21 x 21 grid in {elapsed:.3f}s")
+assert elapsed < 1.0
+
+table = pnl_table(result)
+print(table.iloc[::5, ::5].round(0))
+
+# The unshocked scenario is the base valuation
+assert abs(table.loc[0.0, 0.0]) < 1e-6
+
+
+# ----------------------------
+# Grid points match a full revaluation
+# ----------------------------
+european = Portfolio.from_frame(book.to_frame().assign(style="european"))
+
+grid = scenario_grid(european, *market, as_of=as_of)
+base = european.exposures(*market, as_of=as_of)["value"].sum()
+
+for i, j in [(0, 20), (15, 15), (20, 0)]:
+    shocked = european.exposures(
+        {k: v * (1 + grid["spot_shocks"][i]) for k, v in spots.items()},
+        0.3 + grid["vol_shocks"][j], 0.04, 0.01, as_of=as_of
+    )["value"].sum()
+    print(f"spot {grid['spot_shocks'][i]:+.2f} vol {grid['vol_shocks'][j]:+.2f}: "
+          f"grid {grid['pnl'][i, j, 0, 0]:.2f}  full {shocked - base:.2f}")
+    assert np.isclose(grid["pnl"][i, j, 0, 0], shocked - base, rtol=1e-9, atol=1e-6)
+
+
+# ----------------------------
+# Chunking does not change the result
+# ----------------------------
+small = scenario_grid(book, *market, as_of=as_of, max_elements=50_000)
+assert np.allclose(small["by_underlying"], result["by_underlying"])
+
+ladder = spot_ladder(result)
+assert np.allclose(ladder.loc["TOTAL"], table.loc[0.0])
+
+
+# ----------------------------
+# Time and rate axes, and a chain instead of a book
+# ----------------------------
+decay = scenario_grid(
+    book, *market, as_of=as_of,
+    spot_shocks=[0.0], vol_shocks=[0.0], days=[0, 7, 30, 90],
+    rate_shocks=[-0.01, 0.0, 0.01]
+)
+print("Theta ladder (days 0, 7, 30, 90):", np.round(decay["pnl"][0, 0, :, 1], 0))
+
+frame = next(iter_synthetic_chains(["SYN001", "SYN002"], r=0.04, chunk_size=1_000_000))
+chain = OptionChain.from_frame(frame)
+
+chain_grid = scenario_grid(chain, vol=0.3, r=0.04)
+print("Chain underlyings:", list(chain_grid["underlyings"]),
+      "long-vol P&L at +10 points:", round(pnl_table(chain_grid).iloc[-1, 10], 2))
+assert (pnl_table(chain_grid).iloc[-1] > 0).all()
+
+
+# ----------------------------
+# Positions without a base value are skipped, not spread as NaN
+# ----------------------------
+gappy = scenario_grid(book, {**spots, "SYN000": np.nan}, *market[1:], as_of=as_of)
+
+missing = np.flatnonzero(underlying == "SYN000")
+kept = result["underlyings"] != "SYN000"
+
+assert np.array_equal(gappy["skipped"], missing)
+assert result["skipped"].size == 0
+assert np.isfinite(gappy["pnl"]).all()
+assert np.allclose(gappy["by_underlying"][kept], result["by_underlying"][kept])
+assert (gappy["by_underlying"][~kept] == 0).all()
+
+
+# ----------------------------
+# Lattice repricing past expiry is intrinsic value
+# ----------------------------
+puts = Portfolio(["SYN001"] * 3, [50.0, 55.0, 60.0], "2026-11-20", "put", 1, style="american")
+
+expiring = scenario_grid(
+    puts, {"SYN001": 55.0}, 0.3, 0.04, 0.01, as_of=as_of,
+    vol_shocks=[0.0], days=[0, 60], american="lattice"
+)
+
+base_value = expiring["base_value"]
+intrinsic = np.array([
+    np.maximum([50.0, 55.0, 60.0] - 55.0 * (1 + shock), 0.0).sum()
+    for shock in expiring["spot_shocks"]
+])
+
+assert np.isfinite(expiring["pnl"]).all()
+assert np.allclose(expiring["pnl"][:, 0, 1, 0], intrinsic - base_value)
+
+print("Scenarios OK")
@@ -0,0 +1,180 @@
+import sys
+import os
+import asyncio
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+
+from src.data.streaming import (
+    LiveOptionTable,
+    OptionTick,
+    QuoteStream,
+    ReplayFeed,
+    SpotTick,
+    StreamCache,
+    SyntheticFeed
+)
+from src.data.synthetic import iter_synthetic_chains
+from src.models.implied_vol import implied_volatility_batch
+
+
+tickers = [f"SYN{i:02d}" for i in range(20)]
+
+frame = pd.concat(
+    list(iter_synthetic_chains(tickers, symbols=True)), ignore_index=True
+)
+
+start = time.perf_counter()
+table = LiveOptionTable(frame, 0.04, 0.0)
+print(f"{table} built in {time.perf_counter() - start:.3f}s")
+
+# Rates and carries may also be given per row, e.g. implied per expiry
+carry = np.linspace(0.0, 0.03, len(frame))
+per_row = LiveOptionTable(frame, 0.04, carry)
+assert np.array_equal(per_row.q, carry)
+assert (per_row.r == 0.04).all()
+
+
+# ----------------------------
+# Coalescing: the last tick per contract and spot wins
+# ----------------------------
+a, b = table.contracts[100], table.contracts[5000]
+ticker = str(table.tickers[3])
+untouched = table.snapshot()
+
+ticks = [
+    OptionTick(a, 1.0, 1.2),
+    OptionTick(b, 2.0, 2.2),
+    OptionTick(a, 1.1, 1.3),
+    SpotTick(ticker, 100.0),
+    SpotTick(ticker, table.spots[3] * 1.01)
+]
+
+stream = QuoteStream(table, ReplayFeed(ticks), interval=0.05)
+asyncio.run(stream.run())
+
+assert len(stream.batches) == 1
+batch = stream.batches[0]
+assert (batch["ticks"], batch["quotes"], batch["spots"]) == (5, 2, 1)
+
+live = table.snapshot()
+
+assert live.loc[100, "bid"] == 1.1 and live.loc[100, "ask"] == 1.3
+assert np.isclose(live.loc[live["ticker"] == ticker, "spot"], untouched.loc[untouched["ticker"] == ticker, "spot"] * 1.01).all()
+
+# Only the quoted contracts and the moved underlying were recomputed
+changed = np.flatnonzero((live["updated"] != untouched["updated"]).to_numpy())
+expected = np.union1d(np.flatnonzero(live["ticker"] == ticker), [100, 5000])
+
+assert np.array_equal(changed, expected)
+assert batch["rows"] == expected.size
+
+# Recomputed values match a cold full recompute
+iv = implied_volatility_batch(
+    live["mid"], live["spot"], live["strike"], live["T"], 0.04, 0.0,
+    live["optionType"].to_numpy()
+)
+ok = np.isfinite(iv)
+assert np.allclose(live["impliedVol"].to_numpy()[ok], iv[ok], atol=1e-5)
+
+print("Coalescing / touched rows OK")
+
+
+# ----------------------------
+# Synthetic feed: batch latency
+# ----------------------------
+stream = QuoteStream(table, SyntheticFeed(table, n_ticks=20000, rate=None, seed=1))
+
+start = time.perf_counter()
+asyncio.run(stream.run())
+elapsed = time.perf_counter() - start
+
+stats = stream.stats()
+print(f"20000 ticks in {elapsed:.2f}s:", stats)
+
+assert stats["ticks"] == 20000
+assert stats["p99_ms"] < 50
+
+
+# ----------------------------
+# Background thread with concurrent readers
+# ----------------------------
+stream = QuoteStream(table, SyntheticFeed(table, n_ticks=10 ** 9, rate=2000, seed=2)).start()
+
+versions = []
+for _ in range(5):
+    time.sleep(0.1)
+    versions.append(table.version)
+
+stream.stop(timeout=5)
+
+assert not stream._thread.is_alive()
+assert versions == sorted(versions) and versions[-1] > versions[0]
+
+# A finite feed ends on its own; stopping it afterwards is harmless
+stream = QuoteStream(table, SyntheticFeed(table, n_ticks=50, seed=3)).start()
+stream._thread.join(timeout=10)
+
+assert not stream._thread.is_alive()
+stream.stop(timeout=5)
+
+# Stopping straight after starting, before the loop is up
+for seed in range(5):
+    quick = QuoteStream(table, SyntheticFeed(table, n_ticks=10 ** 6, seed=seed)).start()
+    quick.stop(timeout=3)
+    assert not quick._thread.is_alive()
+
+# Bounded queue and latency window, with running totals
+bounded = QuoteStream(
+    table, SyntheticFeed(table, n_ticks=5000, rate=None, seed=5),
+    interval=0.0, max_queued=10, max_stats=20
+)
+asyncio.run(bounded.run())
+
+assert bounded._queue.maxsize == 10
+assert len(bounded.batches) == 20
+assert bounded.stats()["ticks"] == 5000
+assert bounded.stats()["batches"] > 20
+
+print("Background stream OK")
+
+
+# ----------------------------
+# Stream cache: least recently used and expired streams are stopped
+# ----------------------------
+opened = []
+
+def open_stream(key):
+    stream = QuoteStream(table, SyntheticFeed(table, n_ticks=10 ** 9, rate=100, seed=key)).start()
+    opened.append(stream)
+    return stream
+
+cache = StreamCache(open_stream, max_streams=2, ttl=0.5)
+
+first = cache.get(1)
+assert cache.get(1) is first
+cache.get(2)
+cache.get(1)
+cache.get(3)
+
+# Key 2 was the least recently used
+assert len(cache) == 2 and not opened[1]._thread.is_alive()
+assert first._thread.is_alive()
+
+time.sleep(0.6)
+fresh = cache.get(1)
+
+assert fresh is not first and not first._thread.is_alive()
+assert not opened[2]._thread.is_alive()
+
+cache.stop()
+assert len(cache) == 0 and not any(s._thread.is_alive() for s in opened)
+
+print("Stream cache OK")
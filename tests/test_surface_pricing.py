@@ -0,0 +1,90 @@
+import sys
+import os
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.data.synthetic import SyntheticProvider
+from src.data.data_scraper import set_provider, time_to_expiry
+from src.models.black_scholes import black_scholes_price, black_scholes_price_batch
+from src.models.binomial_tree import binomial_option_price
+from src.models.implied_vol import implied_volatility_chain
+from src.models.monte_carlo import monte_carlo_option_price
+from src.models.vol_surface import SplineVolSurface, fit_volatility_surface
+
+
+provider = SyntheticProvider()
+set_provider(provider)
+
+try:
+
+    ticker = "NVDA"
+
+    S = provider.get_spot_price(ticker)
+    r = provider.get_risk_free_rate()
+    q = provider.get_dividend_yield(ticker)
+
+    strikes, maturities, ivs = [], [], []
+
+    for expiry in provider.get_expiry_dates(ticker)[:8]:
+
+        T = time_to_expiry(expiry)
+        chain = provider.get_option_chain(ticker, expiry)
+
+        calls = implied_volatility_chain(
+            chain[chain["optionType"] == "call"], S, T, r, q
+        )
+
+        strikes.append(calls["strike"].to_numpy())
+        maturities.append(np.full(len(calls), T))
+        ivs.append(calls["impliedVol"].to_numpy())
+
+    surface = SplineVolSurface.from_surface(
+        fit_volatility_surface(
+            np.concatenate(strikes),
+            np.concatenate(maturities),
+            np.concatenate(ivs),
+            S, r=r, q=q
+        )
+    )
+
+    print(surface)
+
+
+    # ----------------------------
+    # Single contract through every pricer
+    # ----------------------------
+    K = round(S * 0.95)
+    T = 0.3
+
+    print("Surface vol:", float(surface.implied_vol(K, T)))
+    print("Black–Scholes:", black_scholes_price(S, K, T, r, surface, q, "put"))
+    print("Binomial:", binomial_option_price(S, K, T, r, surface, q, steps=200, option_type="put"))
+    print("Monte Carlo:", monte_carlo_option_price(S, K, T, r, surface, option_type="put")["price"])
+
+
+    # ----------------------------
+    # A whole book in one vectorized lookup
+    # ----------------------------
+    rng = np.random.default_rng(0)
+    n = 200_000
+
+    book_K = S * np.exp(rng.uniform(-0.4, 0.4, n))
+    book_T = rng.uniform(0.02, 1.5, n)
+    book_type = np.where(rng.random(n) < 0.5, "call", "put")
+
+    start = time.perf_counter()
+    prices = black_scholes_price_batch(S, book_K, book_T, r, surface, q, book_type)
+    elapsed = time.perf_counter() - start
+
+    print(f"{n} contracts priced off the surface in {elapsed:.3f}s")
+    print("NaN prices:", int(np.isnan(prices).sum()))
+
+finally:
+    set_provider(None)
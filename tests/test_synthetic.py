@@ -0,0 +1,83 @@
+import sys
+import os
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.data.providers import MarketDataError
+from src.data.synthetic import SyntheticProvider, iter_synthetic_chains
+from src.models.black_scholes import black_scholes_price_batch
+
+
+provider = SyntheticProvider(as_of="2030-01-02")
+
+ticker = "NVDA"
+S = provider.get_spot_price(ticker)
+r = provider.get_risk_free_rate()
+q = provider.get_dividend_yield(ticker)
+
+expiry = provider.get_expiry_dates(ticker)[3]
+
+chain = provider.get_option_chain(ticker, expiry)
+
+print("Spot:", S)
+print("Expiry:", expiry)
+print(chain.head())
+
+# A provider restricted to some tickers rejects the others like any provider
+try:
+    SyntheticProvider(tickers=["NVDA"]).get_spot_price("AAPL")
+    raise AssertionError("Unknown ticker accepted")
+except MarketDataError:
+    pass
+
+
+# ----------------------------
+# Quotes bracket the arbitrage-free price
+# ----------------------------
+T = (np.datetime64(expiry) - np.datetime64("2030-01-02")).astype(int) / 365
+
+model = black_scholes_price_batch(
+    S, chain["strike"], T, r, chain["impliedVolatility"], q,
+    chain["optionType"]
+)
+
+inside = (chain["bid"] <= model + 1e-9) & (model <= chain["ask"] + 1e-9)
+
+print("Model inside [bid, ask]:", bool(inside.all()))
+
+assert inside.all()
+assert (chain["bid"] >= 0).all() and (chain["bid"] <= chain["ask"]).all()
+
+
+# ----------------------------
+# Streaming many tickers in chunks
+# ----------------------------
+tickers = [f"SYN{i:03d}" for i in range(200)]
+
+start = time.perf_counter()
+rows = 0
+chunks = 0
+sizes = []
+seen = set()
+
+for chunk in iter_synthetic_chains(tickers, n_strikes=61, chunk_size=100_000):
+    rows += len(chunk)
+    chunks += 1
+    sizes.append(len(chunk))
+    seen.update(chunk["ticker"].unique())
+
+elapsed = time.perf_counter() - start
+
+print(f"{rows} contracts in {chunks} chunks, {rows / elapsed:,.0f} rows/s")
+
+# Full chunks until the last, and every ticker streamed
+assert all(size == 100_000 for size in sizes[:-1]) and 0 < sizes[-1] <= 100_000
+assert seen == set(tickers)
+
@@ -0,0 +1,177 @@
+import sys
+import os
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+
+from src.risk.portfolio import Portfolio
+from src.risk.scenarios import scenario_positions
+from src.risk.var import (
+    delta_gamma_pnl,
+    full_revaluation_pnl,
+    horizon_returns,
+    parametric_returns,
+    portfolio_var,
+    var_es
+)
+
+
+# ----------------------------
+# 2k-position book on 10 correlated underlyings
+# ----------------------------
+rng = np.random.default_rng(1)
+
+n = 2000
+names = np.array([f"SYN{i:02d}" for i in range(10)])
+spots = {name: 50.0 + 10 * i for i, name in enumerate(names)}
+
+underlying = rng.choice(names, n)
+S = np.array([spots[u] for u in underlying])
+
+book = Portfolio(
+    underlying=underlying,
+    strike=np.round(S * rng.uniform(0.85, 1.15, n)),
+    expiry=rng.choice([0.1, 0.25, 0.5, 1.0], n),
+    option_type=rng.choice(["call", "put"], n),
+    quantity=rng.integers(-10, 11, n),
+    style=np.where(rng.random(n) < 0.2, "american", "european"),
+    multiplier=100
+)
+
+vols = {name: 0.2 + 0.01 * i for i, name in enumerate(names)}
+
+# 500 days of daily returns, pairwise correlation 0.5
+corr = np.full((10, 10), 0.5) + 0.5 * np.eye(10)
+daily = rng.multivariate_normal(np.zeros(10), corr * 0.015 ** 2, 500)
+returns = pd.DataFrame(daily, columns=names)
+
+
+# ----------------------------
+# Horizon returns are overlapping sums
+# ----------------------------
+moves = horizon_returns(returns, 5)
+
+assert moves.shape == (496, 10)
+assert np.allclose(moves[3], daily[3:8].sum(axis=0))
+
+print("Horizon returns OK")
+
+
+# ----------------------------
+# Parametric scenarios reproduce the covariance
+# ----------------------------
+draws = parametric_returns(returns, 200000, horizon=4, seed=0)
+
+assert np.allclose(np.cov(draws, rowvar=False), 4 * np.cov(daily, rowvar=False), atol=2e-5)
+
+print("Parametric covariance OK")
+
+
+# ----------------------------
+# Full revaluation: pool equals inline, chunking is exact
+# ----------------------------
+positions = scenario_positions(book, spots, vols, 0.04, 0.0)
+moves = parametric_returns(returns, 4000, seed=2)
+
+start = time.perf_counter()
+inline = full_revaluation_pnl(positions, moves, workers=1)
+elapsed = time.perf_counter() - start
+
+print(f"Full revaluation: {n} positions x {len(moves)} scenarios in {elapsed:.3f}s")
+
+pooled = full_revaluation_pnl(positions, moves, workers=2)
+small = full_revaluation_pnl(positions, moves, workers=1, max_elements=50000)
+
+assert np.allclose(inline, pooled, rtol=1e-12, atol=1e-8)
+assert np.allclose(inline, small, rtol=1e-12, atol=1e-8)
+
+# No move, no time: no P&L
+still = full_revaluation_pnl(positions, np.zeros((3, 10)), horizon=0, workers=1)
+assert np.allclose(still, 0.0, atol=1e-6)
+
+print("Pool / chunk independence OK")
+
+
+# ----------------------------
+# Delta-gamma tracks full revaluation for small moves
+# ----------------------------
+approx = delta_gamma_pnl(positions, moves)
+
+scale = np.abs(inline).mean()
+error = np.abs(approx - inline).mean() / scale
+
+print(f"Delta-gamma mean relative error: {error:.4f}")
+assert error < 0.05
+
+full = portfolio_var(book, spots, vols, 0.04, returns=returns, method="parametric",
+                     n_scenarios=4000, seed=2, workers=1)
+quick = portfolio_var(book, spots, vols, 0.04, returns=returns, method="parametric",
+                      mode="delta_gamma", n_scenarios=4000, seed=2)
+
+print(f"VaR full {full['var']:,.0f} ({full['seconds']:.3f}s), "
+      f"delta-gamma {quick['var']:,.0f} ({quick['seconds']:.3f}s)")
+
+assert abs(quick["var"] - full["var"]) / full["var"] < 0.05
+assert full["var_ci"][0] <= full["var"] <= full["var_ci"][1]
+assert full["es_ci"][0] <= full["es"] <= full["es_ci"][1]
+assert full["es"] >= full["var"]
+
+
+# ----------------------------
+# Positions without a vol are skipped, as in scenario_grid
+# ----------------------------
+gappy = {**vols, "SYN00": np.nan}
+rest = Portfolio.from_frame(book.to_frame()[underlying != "SYN00"])
+
+for mode in ("full", "delta_gamma"):
+
+    skipping = portfolio_var(book, spots, gappy, 0.04, returns=returns, mode=mode, workers=1)
+    reference = portfolio_var(rest, spots, vols, 0.04, returns=returns, mode=mode, workers=1)
+
+    assert np.array_equal(skipping["skipped"], np.flatnonzero(underlying == "SYN00"))
+    assert np.isclose(skipping["var"], reference["var"])
+    assert reference["skipped"].size == 0
+
+
+# ----------------------------
+# Linear book: parametric VaR matches the normal formula
+# ----------------------------
+# Deep in-the-money, near-expiry calls behave like stock
+linear = Portfolio(["SYN00"], [1.0], [0.01], ["call"], [1000])
+
+result = portfolio_var(linear, spots, vols, 0.0, returns=returns, method="parametric",
+                       mode="delta_gamma", n_scenarios=200000, seed=3, horizon=1)
+
+# Log returns are normal, so the 1% loss is S (1 - exp(-z sd))
+z = 2.3263478740408408
+expected = 1000 * spots["SYN00"] * -np.expm1(-z * returns["SYN00"].std())
+
+print(f"Linear VaR {result['var']:.2f} vs normal {expected:.2f}")
+assert abs(result["var"] - expected) / expected < 0.01
+
+
+# ----------------------------
+# Risk measures on a known distribution
+# ----------------------------
+pnl = np.random.default_rng(4).standard_normal(400000)
+measures = var_es(pnl, 0.975)
+
+# Standard normal: VaR 1.95996, ES phi(z) / 0.025 = 2.33780
+assert abs(measures["var"] - 1.95996) < 0.02
+assert abs(measures["es"] - 2.33780) < 0.02
+assert measures["es_ci"][0] < 2.33780 < measures["es_ci"][1]
+assert measures["var_ci"][0] < 1.95996 < measures["var_ci"][1]
+
+# Interval bounds are the lo-th and hi-th smallest losses: 1000 losses
+# of 1..1000 at 99% give ranks 983 and 997
+ranks = var_es(-np.arange(1.0, 1001.0), 0.99)["var_ci"]
+assert ranks == (983.0, 997.0), ranks
+
+print("VaR / ES OK")
@@ -0,0 +1,72 @@
+import sys
+import os
+import time
+
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.data.synthetic import SyntheticProvider
+from src.data.data_scraper import set_provider, time_to_expiry
+from src.models.implied_vol import implied_volatility_chain
+from src.models.vol_surface import fit_volatility_surface
+
+
+provider = SyntheticProvider()
+set_provider(provider)
+
+try:
+
+    ticker = "NVDA"
+
+    S = provider.get_spot_price(ticker)
+    r = provider.get_risk_free_rate()
+    q = provider.get_dividend_yield(ticker)
+
+    strikes, maturities, ivs = [], [], []
+
+    for expiry in provider.get_expiry_dates(ticker)[:6]:
+
+        T = time_to_expiry(expiry)
+        chain = provider.get_option_chain(ticker, expiry)
+
+        calls = implied_volatility_chain(
+            chain[chain["optionType"] == "call"], S, T, r, q, option_type="call"
+        )
+
+        strikes.append(calls["strike"].to_numpy())
+        maturities.append(np.full(len(calls), T))
+        ivs.append(calls["impliedVol"].to_numpy())
+
+    strikes = np.concatenate(strikes)
+    maturities = np.concatenate(maturities)
+    ivs = np.concatenate(ivs)
+
+
+    for model in ["svi", "ssvi"]:
+
+        start = time.perf_counter()
+        surface = fit_volatility_surface(strikes, maturities, ivs, S, r=r, q=q, model=model)
+        elapsed = time.perf_counter() - start
+
+        residual = surface.implied_vol(strikes, maturities) - ivs
+
+        print(surface, f"calibrated in {elapsed:.3f}s")
+        print("RMSE:", np.sqrt(np.nanmean(residual ** 2)))
+        print("Arbitrage check:", surface.arbitrage_report())
+
+        grid_K = np.linspace(0.8 * S, 1.2 * S, 100)
+        grid_T = np.linspace(0.02, 1.0, 100)
+
+        start = time.perf_counter()
+        grid = surface.grid(grid_K, grid_T)
+        elapsed = time.perf_counter() - start
+
+        print(f"100x100 grid in {elapsed * 1e6:.0f} us, NaNs: {np.isnan(grid).sum()}")
+
+finally:
+    set_provider(None)